@@ -3,10 +3,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
+import json
 import asyncio
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
@@ -128,18 +129,21 @@ async def health_check():
 
 # ==================== AUTHENTICATION ENDPOINTS ====================
 
+# User fields read by the auth endpoints
+USER_COLUMNS = 'id, username, password_hash, email, full_name, student_level, is_active'
+
 @app.post("/api/auth/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
     """Login endpoint - verify username and password."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         import secrets
         from datetime import datetime, timedelta
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
         # Find user by username
-        result = db.client.table('users').select('*').eq('username', request.username).execute()
+        result = await db.table('users').select(USER_COLUMNS).eq('username', request.username).execute()
         
         if not result.data or len(result.data) == 0:
             return LoginResponse(
@@ -168,14 +172,14 @@ async def login(request: LoginRequest):
         expires_at = datetime.now() + timedelta(days=7)  # 7 day session
         
         # Create session
-        db.client.table('user_sessions').insert({
+        await db.table('user_sessions').insert({
             'user_id': user['id'],
             'session_token': session_token,
             'expires_at': expires_at.isoformat()
         }).execute()
         
         # Update last login
-        db.client.table('users').update({
+        await db.table('users').update({
             'last_login': datetime.now().isoformat()
         }).eq('id', user['id']).execute()
         
@@ -204,13 +208,13 @@ async def login(request: LoginRequest):
 async def verify_token(request: VerifyTokenRequest):
     """Verify session token and return user info."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         from datetime import datetime
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
         # Find session
-        result = db.client.table('user_sessions').select('*').eq('session_token', request.token).execute()
+        result = await db.table('user_sessions').select('id, user_id, expires_at').eq('session_token', request.token).execute()
         
         if not result.data or len(result.data) == 0:
             return {"valid": False, "message": "Invalid token"}
@@ -232,7 +236,7 @@ async def verify_token(request: VerifyTokenRequest):
             return {"valid": False, "message": "Token expired"}
         
         # Get user info
-        user_result = db.client.table('users').select('*').eq('id', session['user_id']).execute()
+        user_result = await db.table('users').select(USER_COLUMNS).eq('id', session['user_id']).execute()
         
         if not user_result.data or len(user_result.data) == 0:
             return {"valid": False, "message": "User not found"}
@@ -240,7 +244,7 @@ async def verify_token(request: VerifyTokenRequest):
         user = user_result.data[0]
         
         # Update last activity
-        db.client.table('user_sessions').update({
+        await db.table('user_sessions').update({
             'last_activity': datetime.now().isoformat()
         }).eq('id', session['id']).execute()
         
@@ -267,14 +271,14 @@ async def verify_token(request: VerifyTokenRequest):
 async def register(request: RegisterRequest):
     """Register a new user."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         import secrets
         from datetime import datetime, timedelta
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
         # Check if username already exists
-        existing = db.client.table('users').select('id').eq('username', request.username).execute()
+        existing = await db.table('users').select('id').eq('username', request.username).execute()
         if existing.data:
             return LoginResponse(
                 success=False,
@@ -291,7 +295,7 @@ async def register(request: RegisterRequest):
             'is_active': True
         }
         
-        result = db.client.table('users').insert(user_data).execute()
+        result = await db.table('users').insert(user_data).execute()
         
         if not result.data:
             return LoginResponse(
@@ -306,7 +310,7 @@ async def register(request: RegisterRequest):
         expires_at = datetime.now() + timedelta(days=7)
         
         # Create session
-        db.client.table('user_sessions').insert({
+        await db.table('user_sessions').insert({
             'user_id': user['id'],
             'session_token': session_token,
             'expires_at': expires_at.isoformat()
@@ -337,9 +341,9 @@ async def register(request: RegisterRequest):
 async def logout(request: Dict[str, Any]):
     """Logout - invalidate session token."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         
-        db = SupabaseManager()
+        db = await get_async_database()
         token = request.get('token')
         
         if not token:
@@ -347,7 +351,7 @@ async def logout(request: Dict[str, Any]):
         
         # Delete session (ignore if already deleted)
         try:
-            db.client.table('user_sessions').delete().eq('session_token', token).execute()
+            await db.table('user_sessions').delete().eq('session_token', token).execute()
         except Exception:
             pass  # Session might already be deleted
         
@@ -358,19 +362,18 @@ async def logout(request: Dict[str, Any]):
 # Chat endpoint
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
-    """Chat with Agentic RAG bot - OPTIMIZED with timeout."""
+    """Chat with Agentic RAG bot - runs the graph natively on the event loop."""
     try:
         # Import here to avoid blocking startup
-        from db_integration.agentic_rag import AgenticRAGChatbot
+        from db_integration.agentic_rag import get_chatbot
 
-        # Define blocking function to run in thread
-        def run_chat():
-            bot = AgenticRAGChatbot()
-            return bot.chat(request.message, student_level=request.student_level)
-
-        # Run in thread pool - NO TIMEOUT, let it take as long as needed
+        # Shared instance: graph, LLM client and DB pool are built once per worker
+        # (normally already warmed at startup; built off-loop if not)
         loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(executor, run_chat)
+        bot = await loop.run_in_executor(executor, get_chatbot)
+
+        # Awaiting the LLM/embedding calls frees the loop for other requests
+        response = await bot.achat(request.message, student_level=request.student_level)
 
         return ChatResponse(
             response=response,
@@ -383,6 +386,36 @@ async def chat(request: ChatRequest):
             student_level=request.student_level
         )
 
+# Streaming chat endpoint (Server-Sent Events)
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with Agentic RAG bot, streaming progress and tokens as Server-Sent Events.
+    
+    Emits ``node`` events as analyze / plan_search / retrieve complete, then
+    ``token`` events from the final LLM call and a closing ``done`` event.
+    """
+    from db_integration.agentic_rag import get_chatbot
+
+    async def event_stream():
+        try:
+            loop = asyncio.get_event_loop()
+            bot = await loop.run_in_executor(executor, get_chatbot)
+            async for event in bot.astream_chat(request.message, student_level=request.student_level):
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+        except Exception as e:
+            error = {"event": "error", "message": str(e)}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies (nginx) from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 # Discovery endpoint
 @app.post("/api/discover", response_model=DiscoveryResponse)
 async def discover_resources(request: DiscoveryRequest):
@@ -426,14 +459,15 @@ async def discover_resources(request: DiscoveryRequest):
 async def get_skills(category: Optional[str] = None, limit: int = 50):
     """Get IT skills from database."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
+        query = db.table('it_skills').select('*')
         if category and category != "All Categories":
-            skills = db.get_top_skills(category=category, limit=limit)
-        else:
-            skills = db.get_top_skills(limit=limit)
+            query = query.eq('category', category)
+        result = await query.order('demand_score', desc=True).limit(limit).execute()
+        skills = result.data or []
         
         return SkillsResponse(
             skills=skills,
@@ -447,31 +481,28 @@ async def get_skills(category: Optional[str] = None, limit: int = 50):
 async def get_analytics(student_level: str = "Junior"):
     """Get analytics and recommendations."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
+        from db_integration.supabase_client import SKILL_SUMMARY_COLUMNS
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
-        # Get trending skills using the view instead of TrendAnalyzer
-        try:
-            trending_skills = db.client.table('skill_trend_summary').select('*').limit(10).execute()
-            trending_skills = trending_skills.data if trending_skills.data else []
-        except Exception as e:
-            print(f"Trend analysis error: {e}")
-            trending_skills = []
-        
-        # Get all skills
-        try:
-            all_skills = db.get_top_skills(limit=100)
-        except Exception as e:
-            print(f"Get skills error: {e}")
-            all_skills = []
-        
-        # Get resources
-        try:
-            resources = db.get_all_resources(limit=100)
-        except Exception as e:
-            print(f"Get resources error: {e}")
-            resources = []
+        async def fetch(label, query):
+            try:
+                result = await query.execute()
+                return result.data or []
+            except Exception as e:
+                print(f"{label} error: {e}")
+                return []
+        
+        # Trending skills (from the view), all skills and resources, fetched concurrently
+        trending_skills, all_skills, resources = await asyncio.gather(
+            fetch("Trend analysis", db.table('skill_trend_summary').select('*').limit(10)),
+            fetch("Get skills", db.table('it_skills').select(SKILL_SUMMARY_COLUMNS)
+                  .order('demand_score', desc=True).limit(100)),
+            # Only the category is used (for the stats)
+            fetch("Get resources", db.table('learning_resources').select('category')
+                  .order('relevance_score', desc=True).limit(100))
+        )
         
         # Calculate stats
         categories = {}
@@ -543,18 +574,20 @@ async def generate_charts(student_level: str = "Junior"):
 async def get_resources(category: Optional[str] = None, limit: int = 50):
     """Get learning resources from database."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
         if category and category != "All Categories":
-            resources = db.client.table('learning_resources').select('*').eq('category', category).limit(limit).execute()
+            query = db.table('learning_resources').select('*').eq('category', category)
         else:
-            resources = db.get_all_resources(limit=limit)
+            query = db.table('learning_resources').select('*').order('relevance_score', desc=True)
+        result = await query.limit(limit).execute()
+        resources = result.data or []
         
         return {
-            "resources": resources if isinstance(resources, list) else resources.data,
-            "total": len(resources if isinstance(resources, list) else resources.data)
+            "resources": resources,
+            "total": len(resources)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resources error: {str(e)}")
@@ -711,30 +744,31 @@ async def update_settings(settings: Dict[str, Any]):
         
         db = SupabaseManager()
         
-        # Save to database
-        for category, values in settings.items():
-            if isinstance(values, dict):
-                for key, value in values.items():
-                    # Handle nested config (like content_scraper)
-                    if isinstance(value, dict):
-                        for nested_key, nested_value in value.items():
+        # Save to database in one transaction: all settings or none
+        with db.transaction():
+            for category, values in settings.items():
+                if isinstance(values, dict):
+                    for key, value in values.items():
+                        # Handle nested config (like content_scraper)
+                        if isinstance(value, dict):
+                            for nested_key, nested_value in value.items():
+                                db.client.table('system_settings').upsert({
+                                    'category': category,
+                                    'key': f"{key}.{nested_key}",
+                                    'value': json.dumps(nested_value) if isinstance(nested_value, (list, dict)) else nested_value,
+                                    'data_type': 'string' if isinstance(nested_value, str) else 
+                                                'integer' if isinstance(nested_value, int) else
+                                                'float' if isinstance(nested_value, float) else 'boolean'
+                                }, on_conflict='key').execute()
+                        else:
                             db.client.table('system_settings').upsert({
                                 'category': category,
-                                'key': f"{key}.{nested_key}",
-                                'value': json.dumps(nested_value) if isinstance(nested_value, (list, dict)) else nested_value,
-                                'data_type': 'string' if isinstance(nested_value, str) else 
-                                            'integer' if isinstance(nested_value, int) else
-                                            'float' if isinstance(nested_value, float) else 'boolean'
-                            }).execute()
-                    else:
-                        db.client.table('system_settings').upsert({
-                            'category': category,
-                            'key': key,
-                            'value': json.dumps(value) if isinstance(value, (list, dict)) else value,
-                            'data_type': 'string' if isinstance(value, str) else 
-                                        'integer' if isinstance(value, int) else
-                                        'float' if isinstance(value, float) else 'boolean'
-                        }).execute()
+                                'key': key,
+                                'value': json.dumps(value) if isinstance(value, (list, dict)) else value,
+                                'data_type': 'string' if isinstance(value, str) else 
+                                            'integer' if isinstance(value, int) else
+                                            'float' if isinstance(value, float) else 'boolean'
+                            }, on_conflict='key').execute()
         
         return {"status": "success", "message": "Settings updated"}
     except Exception as e:
@@ -832,20 +866,20 @@ async def test_agent_access(request: Dict[str, Any]):
 async def admin_health():
     """Admin system health check."""
     try:
-        from db_integration.supabase_client import SupabaseManager
+        from db_integration.async_database_adapter import get_async_database
         import os
         
-        db = SupabaseManager()
+        db = await get_async_database()
         
         # Check database connection using a table we know exists
         # Try learning_resources first (from main schema)
         try:
-            db.client.table('learning_resources').select('id').limit(1).execute()
+            await db.table('learning_resources').select('id').limit(1).execute()
             database_status = "connected"
         except:
             # If learning_resources doesn't exist, try it_skills
             try:
-                db.client.table('it_skills').select('id').limit(1).execute()
+                await db.table('it_skills').select('id').limit(1).execute()
                 database_status = "connected"
             except:
                 database_status = "disconnected"
@@ -866,6 +900,116 @@ async def admin_health():
             "error": str(e)
         }
 
+@app.get("/api/admin/performance")
+async def admin_performance():
+    """Runtime performance counters (connection pool, caches, intent classifier)."""
+    try:
+        from db_integration.database_adapter import DatabaseAdapter
+        from db_integration.embedding_cache import get_query_embeddings
+        from db_integration.response_cache import get_response_cache
+        from db_integration.intent_classifier import get_intent_classifier
+        from db_integration.vector_index import get_vector_index, use_memory_index
+        
+        db = DatabaseAdapter()
+        response_cache = get_response_cache()
+        return {
+            "database_pool": db.pool_stats(),
+            "embedding_cache": get_query_embeddings().stats(),
+            "response_cache": response_cache.stats() if response_cache else {"enabled": False},
+            "intent_classifier": get_intent_classifier().stats(),
+            "vector_index": {
+                kind: get_vector_index(kind).stats() for kind in ("skills", "resources")
+            } if use_memory_index() else {"backend": "postgres"}
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting performance stats: {str(e)}")
+
+@app.get("/api/admin/query-stats")
+async def admin_query_stats(limit: int = 50):
+    """Per-statement query latency histograms, slow-query log and captured plans."""
+    from db_integration.query_stats import get_query_stats
+
+    stats = get_query_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats.snapshot(limit=limit)}
+
+@app.post("/api/admin/query-stats/reset")
+async def reset_query_stats():
+    """Clear the collected query statistics."""
+    from db_integration.query_stats import get_query_stats
+
+    stats = get_query_stats()
+    if stats is not None:
+        stats.reset()
+    return {"success": True}
+
+@app.on_event("startup")
+async def warm_chatbot():
+    """Build the shared chatbot (compiled graph + clients) before the first request."""
+    try:
+        from db_integration.agentic_rag import get_chatbot
+        
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(executor, get_chatbot)
+    except Exception as e:
+        # Chat falls back to lazy construction on first request
+        print(f"Chatbot warm-up skipped: {e}")
+
+@app.on_event("startup")
+async def check_embedding_models():
+    """Warn when stored embeddings came from a different model than queries use.
+
+    Semantic search only matches rows embedded with the current model, so
+    until they are re-embedded (setup_chatbot.py) those rows are invisible.
+    """
+    try:
+        from db_integration.embedding_cache import embedding_label
+        from db_integration.supabase_client import SupabaseManager
+
+        def count_stale():
+            db = SupabaseManager()
+            label = embedding_label()
+            stale = {}
+            for table, key in (("skill_embeddings", "skill_id"), ("resource_embeddings", "resource_id")):
+                rows = db.iter_rows(table, f"{key}, embedding_model", key=key)
+                stale[table] = sum(1 for row in rows if row.get("embedding_model") != label)
+            return label, stale
+
+        loop = asyncio.get_event_loop()
+        label, stale = await loop.run_in_executor(executor, count_stale)
+        for table, count in stale.items():
+            if count:
+                print(f"WARNING: {count} rows in {table} were not embedded with {label} and are "
+                      f"excluded from semantic search; run setup_chatbot.py to re-embed them")
+    except Exception as e:
+        print(f"Embedding model check skipped: {e}")
+
+@app.on_event("startup")
+async def load_vector_indexes():
+    """Load the in-process vector indexes when VECTOR_SEARCH_BACKEND=memory."""
+    try:
+        from db_integration.vector_index import get_vector_index, use_memory_index
+        
+        if not use_memory_index():
+            return
+        loop = asyncio.get_event_loop()
+        for kind in ("skills", "resources"):
+            index = get_vector_index(kind)
+            await loop.run_in_executor(executor, index.maybe_refresh)
+            print(f"Loaded {kind} vector index: {index.stats()['rows']} rows")
+    except Exception as e:
+        # Searches load the index lazily (or fall back) on first use
+        print(f"Vector index warm-up skipped: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_database_pool():
+    """Close pooled database connections when the worker stops."""
+    from db_integration.database_adapter import close_connection_pool
+    from db_integration.async_database_adapter import close_async_connection_pool
+    close_connection_pool()
+    await close_async_connection_pool()
+
 # Serve static files (charts)
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
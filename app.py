@@ -150,8 +150,8 @@ if page == "🏠 Home":
         db = SupabaseManager()
         
         # Get stats
-        resources = db.get_all_resources(limit=1000)
-        skills = db.get_top_skills(limit=1000)
+        resources = db.get_all_resources(limit=1000, columns='id')
+        skills = db.get_top_skills(limit=1000, columns='id, demand_score')
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -0,0 +1 @@
+"""Benchmarks for the GenAI Learning Assistant backend."""
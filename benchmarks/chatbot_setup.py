@@ -0,0 +1,79 @@
+"""Benchmark: per-request AgenticRAGChatbot construction vs. the shared instance.
+
+Run from the project root:
+    python -m benchmarks.chatbot_setup [iterations]
+
+No LLM or embedding calls are made; only object construction is timed.
+"""
+
+import sys
+import time
+import statistics
+from langchain_openai import ChatOpenAI
+from db_integration.agentic_rag import AgenticRAGChatbot, get_chatbot
+from db_integration.supabase_client import SupabaseManager
+import config
+
+
+def time_call(fn, iterations: int) -> list:
+    """Time ``fn`` over several iterations.
+    
+    Args:
+        fn: Zero-argument callable
+        iterations: Number of runs
+        
+    Returns:
+        Per-call durations in milliseconds
+    """
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def report(name: str, durations: list):
+    """Print summary statistics for one measurement."""
+    print(f"  {name:<38} mean {statistics.mean(durations):8.2f} ms   "
+          f"p50 {statistics.median(durations):8.2f} ms   max {max(durations):8.2f} ms")
+
+
+def main():
+    """Run the setup-cost benchmark."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    
+    print("\n" + "="*80)
+    print(f"Chatbot setup cost ({iterations} iterations)")
+    print("="*80)
+    
+    # Warm imports and the shared DB pool so the first sample isn't skewed
+    bot = get_chatbot()
+    
+    print("\nComponents built by AgenticRAGChatbot.__init__:")
+    report("SupabaseManager()", time_call(SupabaseManager, iterations))
+    if bot.db.use_adapter:
+        # What every request paid before the shared connection pool existed
+        pool = bot.db.client.pool
+        report("psycopg2.connect() (unpooled)", time_call(
+            lambda: pool._connect().close(), iterations
+        ))
+    report("ChatOpenAI()", time_call(
+        lambda: ChatOpenAI(model=config.LLM_MODEL, temperature=0.7, api_key=config.OPENAI_API_KEY),
+        iterations
+    ))
+    report("StateGraph compile", time_call(bot._build_graph, iterations))
+    
+    print("\nPer chat request:")
+    per_request = time_call(AgenticRAGChatbot, iterations)
+    shared = time_call(get_chatbot, iterations)
+    report("AgenticRAGChatbot() (old behaviour)", per_request)
+    report("get_chatbot() (shared instance)", shared)
+    
+    saved = statistics.mean(per_request) - statistics.mean(shared)
+    print(f"\nSetup cost removed per request: {saved:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
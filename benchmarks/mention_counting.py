@@ -0,0 +1,96 @@
+"""Benchmark: trend mention counting in DataLoader.
+
+Run from the project root:
+    python -m benchmarks.mention_counting [resources] [skills] [topics]
+
+Compares the previous per-skill scans (lowercase every document once per
+skill) with ``tally_skill_signals`` (one compiled matcher, one pass per
+document) on synthetic data, 10k resources x 500 skills by default, and
+checks that both give the same counts. No database or API calls.
+"""
+
+import random
+import sys
+import time
+
+from db_integration.data_loader import tally_skill_signals
+from db_integration.skill_extractor import IT_SKILLS_TAXONOMY
+
+
+FILLER = ("learn build deploy guide tutorial practical introduction advanced course project "
+          "team data model service scale production beginner example workflow tools").split()
+
+
+def make_skills(count: int, rng: random.Random):
+    """Taxonomy skills plus generated two-word names up to ``count``."""
+    skills = list(dict.fromkeys(s for names in IT_SKILLS_TAXONOMY.values() for s in names))
+    while len(skills) < count:
+        name = f"{rng.choice(FILLER).title()}{rng.randint(1, 999)} {rng.choice(FILLER).title()}"
+        if name not in skills:
+            skills.append(name)
+    return skills[:count]
+
+
+def make_documents(count: int, skills, rng: random.Random, with_metrics: bool = False):
+    """Documents whose titles and descriptions mix filler words and skill names."""
+    documents = []
+    for i in range(count):
+        words = rng.choices(FILLER, k=30) + rng.sample(skills, 3)
+        rng.shuffle(words)
+        document = {'title': " ".join(words[:8]), 'description': " ".join(words[8:])}
+        if with_metrics:
+            document['metrics'] = {'stars': rng.randint(0, 5000), 'estimated_posts': rng.randint(0, 500)}
+        documents.append(document)
+    return documents
+
+
+def previous_tallies(skill_names, resources, topics):
+    """The per-skill loops load_report used before (reference implementation)."""
+    tallies = {}
+    for skill_name in skill_names:
+        mentions = sum(1 for r in resources
+                       if skill_name.lower() in f"{r.get('title', '')} {r.get('description', '')}".lower())
+        github_stars = sum(t.get('metrics', {}).get('stars', 0)
+                           for t in topics
+                           if skill_name.lower() in t.get('title', '').lower())
+        linkedin_posts = sum(t.get('metrics', {}).get('estimated_posts', 0)
+                             for t in topics
+                             if skill_name.lower() in t.get('title', '').lower() or
+                                skill_name.lower() in t.get('description', '').lower())
+        tallies[skill_name] = {'mentions': mentions, 'github_stars': github_stars,
+                               'linkedin_posts': linkedin_posts}
+    return tallies
+
+
+def main():
+    """Run the mention counting benchmark."""
+    resource_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    skill_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    topic_count = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    rng = random.Random(0)
+    skills = make_skills(skill_count, rng)
+    resources = make_documents(resource_count, skills, rng)
+    topics = make_documents(topic_count, skills, rng, with_metrics=True)
+
+    print("\n" + "="*80)
+    print(f"Mention counting ({len(resources)} resources, {len(skills)} skills, {len(topics)} topics)")
+    print("="*80)
+
+    start = time.perf_counter()
+    expected = previous_tallies(skills, resources, topics)
+    previous = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = tally_skill_signals(skills, resources, topics)
+    single_pass = time.perf_counter() - start
+
+    print(f"\n  per-skill scans (previous)   {previous * 1000:>10.1f} ms")
+    print(f"  single-pass matcher          {single_pass * 1000:>10.1f} ms")
+    print(f"  speedup                      {previous / single_pass:>10.1f}x")
+    print(f"  counts identical             {'yes' if actual == expected else 'NO'}")
+    return 0 if actual == expected else 1
+
+
+if __name__ == "__main__":
+    exit(main())
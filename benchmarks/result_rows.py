@@ -0,0 +1,111 @@
+"""Benchmark: result row representation and column projection.
+
+Run from the project root (Docker PostgreSQL only):
+    python -m benchmarks.result_rows [rows] [runs]
+
+Fills a scratch table shaped like ``learning_resources`` (100k rows by
+default, dropped afterwards) and compares the old result path (RealDictRow
+copied into a dict per row) with tuple rows wrapped in ``PostgresResult``,
+with and without materializing ``.data``, and ``select('*')`` against a
+two-column projection. Reports median latency and peak Python memory.
+"""
+
+import statistics
+import sys
+import time
+import tracemalloc
+
+from db_integration.database_adapter import DatabaseAdapter, PostgresResult, get_connection_pool
+
+
+TABLE = 'benchmark_result_rows'
+
+
+def create_table(pool, rows: int):
+    """Create and fill the scratch table."""
+    with pool.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(f"""
+            CREATE TABLE {TABLE} AS
+            SELECT gen_random_uuid() AS id,
+                   'Resource title number ' || i AS title,
+                   'https://example.com/resources/' || i AS url,
+                   repeat('Learning resource description text. ', 4) AS description,
+                   (ARRAY['tutorial', 'course', 'article', 'video', 'documentation'])[1 + i %% 5] AS category,
+                   'Other' AS source,
+                   round((i %% 100) / 100.0, 2)::numeric(3,2) AS relevance_score,
+                   now() AS created_at,
+                   now() AS updated_at
+            FROM generate_series(1, %s) AS i
+        """, (rows,))
+
+
+def measure(fn, runs: int):
+    """Median seconds and peak traced bytes of ``fn``."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(durations), peak
+
+
+def main():
+    """Run the result representation benchmark."""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    db = DatabaseAdapter()
+    if db.use_supabase:
+        print("This benchmark needs the Docker PostgreSQL backend (USE_SUPABASE=false).")
+        return 1
+    pool = get_connection_pool()
+    create_table(pool, rows)
+
+    def dict_copy():
+        # Previous PostgresResult: RealDictRow per row, then a dict copy of each
+        with pool.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {TABLE}")
+            return [dict(row) for row in cursor.fetchall()]
+
+    def tuple_rows(columns='*', materialize=False):
+        def run():
+            with pool.cursor(cursor_factory=None) as cursor:
+                cursor.execute(f"SELECT {columns} FROM {TABLE}")
+                result = PostgresResult(cursor.fetchall(), [c[0] for c in cursor.description])
+            if materialize:
+                result.data
+            return result
+        return run
+
+    cases = [
+        ("select('*'), dict rows (previous)", dict_copy),
+        ("select('*'), tuple rows", tuple_rows()),
+        ("select('*'), tuple rows + .data", tuple_rows(materialize=True)),
+        ("select('id, category'), tuple rows + .data", tuple_rows('id, category', materialize=True)),
+        ("adapter select('id, category').execute().data",
+         lambda: db.table(TABLE).select('id, category').execute().data),
+    ]
+
+    try:
+        print("\n" + "="*80)
+        print(f"Result rows ({rows} rows, median of {runs} runs)")
+        print("="*80)
+        print(f"\n  {'case':<48} {'median ms':>10} {'peak MB':>9}")
+        for label, fn in cases:
+            seconds, peak = measure(fn, runs)
+            print(f"  {label:<48} {seconds * 1000:>10.1f} {peak / 1e6:>9.1f}")
+    finally:
+        with pool.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,102 @@
+"""Benchmark: reduced embedding dimensions and quantized in-memory storage.
+
+Run from the project root:
+    python -m benchmarks.vector_compression [k] [queries]
+
+Loads the stored skill and resource embeddings, then for each dimension
+(truncated and re-normalized, as ``manage_vectors.py reproject`` does) and
+each in-memory precision reports index size, search latency and recall@k
+against exact full-precision search. Queries are catalog vectors with small
+random noise, so no embedding API calls are made.
+"""
+
+import json
+import sys
+import time
+import statistics
+
+import numpy as np
+
+from db_integration.supabase_client import SupabaseManager
+from db_integration.vector_index import PRECISIONS, quantize, similarity_scores, truncate_embeddings
+
+
+# Candidate dimensions (only those below the stored size are tried)
+DIMENSIONS = [1024, 768, 512, 256]
+
+# Standard deviation of the per-component noise added to query vectors
+QUERY_NOISE = 0.01
+
+
+def load_catalog_vectors() -> np.ndarray:
+    """All stored skill and resource embeddings as unit float32 rows."""
+    db = SupabaseManager()
+    vectors = []
+    for table, key in (('skill_embeddings', 'skill_id'), ('resource_embeddings', 'resource_id')):
+        for row in db.iter_rows(table, f"{key}, embedding", key=key):
+            if row.get('embedding') is not None:
+                value = row['embedding']
+                vectors.append(json.loads(value) if isinstance(value, str) else value)
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return truncate_embeddings(matrix, matrix.shape[1])
+
+
+def top_k(matrix: np.ndarray, scales, query: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` best rows for one query."""
+    scores = similarity_scores(matrix, scales, query)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def main():
+    """Run the compression benchmark."""
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    catalog = load_catalog_vectors()
+    if not len(catalog):
+        print("No stored embeddings found; run setup_chatbot.py first.")
+        return 1
+    rows, full_dimensions = catalog.shape
+    k = min(k, rows)
+
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, rows, size=query_count)
+    queries = catalog[picks] + rng.normal(0, QUERY_NOISE, size=(query_count, full_dimensions)).astype(np.float32)
+    queries = truncate_embeddings(queries, full_dimensions)
+
+    print("\n" + "="*80)
+    print(f"Embedding compression ({rows} vectors, {full_dimensions} dims, "
+          f"{query_count} queries, recall@{k})")
+    print("="*80)
+
+    exact = [set(top_k(catalog, None, query, k)) for query in queries]
+
+    print(f"\n  {'dims':>5} {'precision':<9} {'memory':>10} {'pgvector/row':>13} "
+          f"{'mean ms':>8} {'p95 ms':>8} {f'recall@{k}':>10}")
+    for dimensions in [full_dimensions] + [d for d in DIMENSIONS if d < full_dimensions]:
+        reduced = truncate_embeddings(catalog, dimensions)
+        reduced_queries = truncate_embeddings(queries, dimensions)
+        for precision in PRECISIONS:
+            matrix, scales = quantize(reduced, precision)
+            size = matrix.nbytes + (scales.nbytes if scales is not None else 0)
+
+            durations = []
+            recalls = []
+            for query, truth in zip(reduced_queries, exact):
+                start = time.perf_counter()
+                found = top_k(matrix, scales, query, k)
+                durations.append((time.perf_counter() - start) * 1000)
+                recalls.append(len(truth.intersection(found)) / k)
+
+            p95 = sorted(durations)[int(0.95 * (len(durations) - 1))]
+            # pgvector stores 4 bytes per dimension plus an 8-byte header
+            print(f"  {dimensions:>5} {precision:<9} {size / 1024:>8.1f}KB {4 * dimensions + 8:>11}B "
+                  f"{statistics.mean(durations):>8.3f} {p95:>8.3f} {statistics.mean(recalls):>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
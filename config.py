@@ -19,6 +19,65 @@ MAX_SEARCH_RESULTS = 10
 MAX_TREND_ITEMS = 15
 CONTENT_TYPES = ["tutorial", "course", "article", "video", "documentation"]
 
+# Agentic RAG retrieval: branches run concurrently (at most
+# RAG_RETRIEVAL_CONCURRENCY at once per chat request); a branch slower than the
+# timeout (seconds) is dropped and contributes no results
+RAG_RETRIEVAL_TIMEOUT = float(os.getenv("RAG_RETRIEVAL_TIMEOUT", "8"))
+RAG_RETRIEVAL_CONCURRENCY = int(os.getenv("RAG_RETRIEVAL_CONCURRENCY", "6"))
+
+# Local intent classifier: below this confidence the analyze_query LLM call is used
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+
+# Semantic chatbot answer cache: answers per student level, lifetime (seconds),
+# and the maximum cosine distance between two queries for a hit
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_DISTANCE = float(os.getenv("RESPONSE_CACHE_MAX_DISTANCE", "0.08"))
+
+# Semantic search backend: "postgres" (pgvector RPCs) or "memory" (in-process
+# NumPy index loaded from the embedding tables and refreshed via updated_at)
+VECTOR_SEARCH_BACKEND = os.getenv("VECTOR_SEARCH_BACKEND", "postgres").lower()
+VECTOR_INDEX_REFRESH_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "60"))
+VECTOR_INDEX_FULL_RELOAD_SECONDS = float(os.getenv("VECTOR_INDEX_FULL_RELOAD_SECONDS", "3600"))
+# Incremental refreshes re-read rows this far behind the newest updated_at seen:
+# updated_at is the writing transaction's start time, so a row can commit after
+# newer ones were already loaded. Keep it above the longest write transaction
+VECTOR_INDEX_REFRESH_OVERLAP_SECONDS = float(os.getenv("VECTOR_INDEX_REFRESH_OVERLAP_SECONDS", "300"))
+# In-memory index storage: "float32", "float16" (half the memory) or "int8" (a quarter)
+VECTOR_INDEX_PRECISION = os.getenv("VECTOR_INDEX_PRECISION", "float32").lower()
+
+# Embedding size for text-embedding-3 models (0 = model default, 1536 for -small).
+# Changing it requires `python manage_vectors.py reproject --dimensions N`
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+
+# Query embedding cache: in-memory entries, and an optional SQLite file so
+# cached embeddings survive restarts (empty path keeps them in memory only)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+# Embedding generation: rows per embed_documents call / multi-row upsert, and
+# how many batches run at once
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# LLM skill extraction during report loading: parallel calls, and a SQLite file
+# caching answers by model + text so re-loading resources makes no calls
+# (empty path keeps the cache in memory only)
+SKILL_EXTRACTION_CONCURRENCY = int(os.getenv("SKILL_EXTRACTION_CONCURRENCY", "4"))
+SKILL_EXTRACTION_CACHE_PATH = os.getenv("SKILL_EXTRACTION_CACHE_PATH", ".cache/skill_extraction.sqlite3")
+# Uncached texts are packed into numbered multi-item prompts: at most
+# BATCH_SIZE items and BATCH_TOKENS tokens of resource text each (0 = one per call)
+SKILL_EXTRACTION_BATCH_TOKENS = int(os.getenv("SKILL_EXTRACTION_BATCH_TOKENS", "2000"))
+SKILL_EXTRACTION_BATCH_SIZE = int(os.getenv("SKILL_EXTRACTION_BATCH_SIZE", "20"))
+
+# Query instrumentation (GET /api/admin/query-stats): statements at or above
+# SLOW_QUERY_MS are logged; SELECTs at or above QUERY_EXPLAIN_MS (0 = off) get
+# an EXPLAIN (ANALYZE, BUFFERS) plan captured, which re-runs the query
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_EXPLAIN_MS = float(os.getenv("QUERY_EXPLAIN_MS", "0"))
+
 # API Endpoints
 GITHUB_TRENDING_URL = "https://api.github.com/search/repositories"
 GITHUB_TOPICS_URL = "https://api.github.com/search/topics"
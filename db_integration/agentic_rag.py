@@ -1,16 +1,32 @@
 """Agentic RAG system with LLM-driven query planning and refinement - FIXED VERSION."""
 
-from typing import List, Dict, Any, TypedDict
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Any, TypedDict, Optional, Iterator, AsyncIterator
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
-from db_integration.supabase_client import SupabaseManager
+from db_integration.supabase_client import RESOURCE_SUMMARY_COLUMNS, SKILL_SUMMARY_COLUMNS, SupabaseManager
+from db_integration.async_database_adapter import AsyncDatabaseAdapter, get_async_database
+from db_integration.vector_index import get_vector_index, use_memory_index
+from db_integration.embedding_cache import embedding_label, get_query_embeddings
+from db_integration.response_cache import get_response_cache
+from db_integration.intent_classifier import get_intent_classifier
 import config
 import json
 
 
+GENERATION_ERROR_RESPONSE = (
+    "I apologize, but I encountered an error while processing your request. "
+    "Please try rephrasing your question or contact support if the issue persists."
+)
+
+
 class AgenticRAGState(TypedDict):
     """State for agentic RAG workflow."""
     user_query: str
@@ -26,30 +42,17 @@ class AgenticRAGState(TypedDict):
     refinement_count: int  # Track refinement iterations
 
 
-@tool
-def analyze_query(query: str, student_level: str) -> Dict[str, Any]:
-    """Analyze user query to determine intent and required information.
+QUERY_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Analyze query intent. Return ONLY valid JSON with no markdown formatting: {{"intent": "<skill_discovery|resource_finding|career_advice|comparison|trend_analysis>", "entities": ["<skills/tech>"], "context_needs": ["skills"]}}"""),
+    ("user", "Query: {query}\nLevel: {level}")
+])
 
-    Args:
-        query: User's question
-        student_level: Student's current level
-
-    Returns:
-        Query analysis with intent, entities, and search strategy
-    """
-    # Use faster, cheaper model for simple analysis
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3, max_tokens=200)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """Analyze query intent. Return ONLY valid JSON with no markdown formatting: {"intent": "<skill_discovery|resource_finding|career_advice|comparison|trend_analysis>", "entities": ["<skills/tech>"], "context_needs": ["skills"]}"""),
-        ("user", "Query: {query}\nLevel: {level}")
-    ])
 
+def _parse_query_analysis(content: str) -> Dict[str, Any]:
+    """Parse the analysis LLM output, falling back to a broad search on bad JSON."""
     try:
-        response = llm.invoke(prompt.format_messages(query=query, level=student_level))
-        
         # Clean response content - remove markdown code blocks if present
-        content = response.content.strip()
+        content = content.strip()
         if content.startswith("```json"):
             content = content[7:]  # Remove ```json
         if content.startswith("```"):
@@ -70,17 +73,67 @@ def analyze_query(query: str, student_level: str) -> Dict[str, Any]:
             
     except Exception as e:
         print(f"Warning: Failed to parse query analysis: {e}")
-        # Fallback parsing
-        analysis = {
-            "intent": "skill_discovery",
-            "entities": [],
-            "search_strategy": "broad_search",
-            "context_needs": ["skills", "resources"]
-        }
+        analysis = _fallback_query_analysis()
 
     return analysis
 
 
+def _fallback_query_analysis() -> Dict[str, Any]:
+    """Broad-search analysis used when the LLM call or parsing fails."""
+    return {
+        "intent": "skill_discovery",
+        "entities": [],
+        "search_strategy": "broad_search",
+        "context_needs": ["skills", "resources"]
+    }
+
+
+# Query analysis model (faster, cheaper model for simple analysis), created on first use
+_analysis_llm: Optional[ChatOpenAI] = None
+_analysis_llm_lock = threading.Lock()
+
+
+def _get_analysis_llm() -> ChatOpenAI:
+    """Get or create the shared ChatOpenAI client used by ``analyze_query``."""
+    global _analysis_llm
+    if _analysis_llm is None:
+        with _analysis_llm_lock:
+            if _analysis_llm is None:
+                _analysis_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3, max_tokens=200)
+    return _analysis_llm
+
+
+@tool
+def analyze_query(query: str, student_level: str) -> Dict[str, Any]:
+    """Analyze user query to determine intent and required information.
+
+    Args:
+        query: User's question
+        student_level: Student's current level
+
+    Returns:
+        Query analysis with intent, entities, and search strategy
+    """
+    try:
+        response = _get_analysis_llm().invoke(QUERY_ANALYSIS_PROMPT.format_messages(query=query, level=student_level))
+    except Exception as e:
+        print(f"Warning: Failed to parse query analysis: {e}")
+        return _fallback_query_analysis()
+
+    return _parse_query_analysis(response.content)
+
+
+async def aanalyze_query(query: str, student_level: str) -> Dict[str, Any]:
+    """Async variant of ``analyze_query``."""
+    try:
+        response = await _get_analysis_llm().ainvoke(QUERY_ANALYSIS_PROMPT.format_messages(query=query, level=student_level))
+    except Exception as e:
+        print(f"Warning: Failed to parse query analysis: {e}")
+        return _fallback_query_analysis()
+
+    return _parse_query_analysis(response.content)
+
+
 @tool
 def semantic_search_skills(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """Search for relevant skills using semantic search.
@@ -93,29 +146,71 @@ def semantic_search_skills(query: str, limit: int = 10) -> List[Dict[str, Any]]:
         List of relevant skills
     """
     db = SupabaseManager()
-    embeddings = OpenAIEmbeddings(api_key=config.OPENAI_API_KEY)
+    embeddings = get_query_embeddings()
     
     try:
         query_embedding = embeddings.embed_query(query)
     except Exception as e:
         print(f"Warning: Embedding failed ({e}), using fallback")
-        return db.get_top_skills(limit=limit)
+        return db.get_top_skills(limit=limit, columns=SKILL_SUMMARY_COLUMNS)
     
     try:
-        result = db.client.rpc(
-            'search_similar_skills',
-            {
-                'query_embedding': query_embedding,
-                'match_threshold': 0.6,
-                'match_count': limit
-            }
-        ).execute()
-        
-        return result.data if result.data else []
+        return db.search_similar_skills(query_embedding, match_threshold=0.6, match_count=limit)
     except Exception as e:
         print(f"Warning: Database search failed ({e}), using fallback")
         # Fallback to top skills
-        return db.get_top_skills(limit=limit)
+        return db.get_top_skills(limit=limit, columns=SKILL_SUMMARY_COLUMNS)
+
+
+def _search_skills_multi(db: SupabaseManager, query_embeddings: List[List[float]], limit: int) -> List[Dict[str, Any]]:
+    """Run one batched skill search for several query vectors.
+    
+    Falls back to one ``search_similar_skills`` call per vector if the batched
+    function is not installed yet, then to top skills.
+    """
+    try:
+        return db.search_similar_skills_multi(query_embeddings, match_threshold=0.6, match_count=limit)
+    except Exception as e:
+        print(f"Warning: Batched skill search failed ({e}), searching per query")
+    
+    try:
+        best = {}
+        for query_embedding in query_embeddings:
+            for skill in db.search_similar_skills(query_embedding, match_threshold=0.6, match_count=limit):
+                skill_id = skill.get('skill_id')
+                if skill_id not in best or skill.get('similarity', 0) > best[skill_id].get('similarity', 0):
+                    best[skill_id] = skill
+        
+        return sorted(best.values(), key=lambda x: x.get('similarity', 0), reverse=True)[:limit]
+    except Exception as e:
+        print(f"Warning: Database search failed ({e}), using fallback")
+        return db.get_top_skills(limit=limit, columns=SKILL_SUMMARY_COLUMNS)
+
+
+@tool
+def semantic_search_skills_multi(queries: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+    """Search for skills matching any of several queries in one round trip.
+    
+    All queries are embedded in one call and sent to a single SQL function
+    that returns the union, deduplicated with the best score per skill.
+    
+    Args:
+        queries: Search queries
+        limit: Number of results
+        
+    Returns:
+        List of relevant skills, best match first
+    """
+    db = SupabaseManager()
+    embeddings = get_query_embeddings()
+    
+    try:
+        query_embeddings = embeddings.embed_documents(queries)
+    except Exception as e:
+        print(f"Warning: Embedding failed ({e}), using fallback")
+        return db.get_top_skills(limit=limit, columns=SKILL_SUMMARY_COLUMNS)
+    
+    return _search_skills_multi(db, query_embeddings, limit)
 
 
 @tool
@@ -130,28 +225,172 @@ def semantic_search_resources(query: str, limit: int = 5) -> List[Dict[str, Any]
         List of relevant resources
     """
     db = SupabaseManager()
-    embeddings = OpenAIEmbeddings(api_key=config.OPENAI_API_KEY)
+    embeddings = get_query_embeddings()
     
     try:
         query_embedding = embeddings.embed_query(query)
     except Exception as e:
         print(f"Warning: Embedding failed ({e}), using fallback")
-        return db.get_all_resources(limit=limit)
+        return db.get_all_resources(limit=limit, columns=RESOURCE_SUMMARY_COLUMNS)
     
     try:
-        result = db.client.rpc(
-            'search_similar_resources',
+        return db.search_similar_resources(query_embedding, match_threshold=0.6, match_count=limit)
+    except Exception as e:
+        print(f"Warning: Database search failed ({e}), using fallback")
+        return db.get_all_resources(limit=limit, columns=RESOURCE_SUMMARY_COLUMNS)
+
+
+async def _atop_skills(db: AsyncDatabaseAdapter, limit: int) -> List[Dict[str, Any]]:
+    """Async ``SupabaseManager.get_top_skills`` (summary columns), used as the search fallback."""
+    try:
+        result = await db.table('it_skills')\
+            .select(SKILL_SUMMARY_COLUMNS)\
+            .order('demand_score', desc=True)\
+            .limit(limit)\
+            .execute()
+        return result.data
+    except Exception as e:
+        print(f"Error fetching top skills: {e}")
+        return []
+
+
+async def _atop_resources(db: AsyncDatabaseAdapter, limit: int) -> List[Dict[str, Any]]:
+    """Async ``SupabaseManager.get_all_resources`` (summary columns), used as the search fallback."""
+    try:
+        result = await db.table('learning_resources')\
+            .select(RESOURCE_SUMMARY_COLUMNS)\
+            .order('relevance_score', desc=True)\
+            .limit(limit)\
+            .execute()
+        return result.data
+    except Exception as e:
+        print(f"Error fetching resources: {e}")
+        return []
+
+
+async def _atop_skills_for_students(db: AsyncDatabaseAdapter, limit: int) -> List[Dict[str, Any]]:
+    """Async ``SupabaseManager.get_top_skills_for_students``."""
+    try:
+        result = await db.table('top_skills_for_students').select('*').limit(limit).execute()
+        return result.data
+    except Exception as e:
+        print(f"Error fetching top skills: {e}")
+        return []
+
+
+async def _asearch_similar(db: AsyncDatabaseAdapter, kind: str, query_embedding: List[float],
+                           match_threshold: float, match_count: int) -> List[Dict[str, Any]]:
+    """Async ``SupabaseManager.search_similar_skills`` / ``search_similar_resources`` (kind: skills or resources).
+    
+    Errors are raised so callers can choose their own fallback.
+    """
+    if use_memory_index():
+        # In-process NumPy search; off the event loop like any CPU-bound call
+        try:
+            return await asyncio.to_thread(
+                get_vector_index(kind).search, query_embedding, match_threshold, match_count
+            )
+        except Exception as e:
+            print(f"Warning: In-memory {kind} search failed ({e}), searching the database")
+    
+    result = await db.rpc(
+        f'search_similar_{kind}',
+        {
+            'query_embedding': query_embedding,
+            'match_threshold': match_threshold,
+            'match_count': match_count,
+            'match_model': embedding_label()
+        }
+    ).execute()
+    return result.data if result.data else []
+
+
+async def _asearch_skills_multi(db: AsyncDatabaseAdapter, query_embeddings: List[List[float]],
+                                limit: int) -> List[Dict[str, Any]]:
+    """Async variant of ``_search_skills_multi``."""
+    try:
+        if use_memory_index():
+            try:
+                return await asyncio.to_thread(
+                    get_vector_index('skills').search_many, query_embeddings, 0.6, limit
+                )
+            except Exception as e:
+                print(f"Warning: In-memory skill search failed ({e}), searching the database")
+        result = await db.rpc(
+            'search_similar_skills_multi',
             {
-                'query_embedding': query_embedding,
+                'query_embeddings': query_embeddings,
                 'match_threshold': 0.6,
-                'match_count': limit
+                'match_count': limit,
+                'match_model': embedding_label()
             }
         ).execute()
-        
         return result.data if result.data else []
+    except Exception as e:
+        print(f"Warning: Batched skill search failed ({e}), searching per query")
+    
+    try:
+        best = {}
+        for query_embedding in query_embeddings:
+            for skill in await _asearch_similar(db, 'skills', query_embedding, 0.6, limit):
+                skill_id = skill.get('skill_id')
+                if skill_id not in best or skill.get('similarity', 0) > best[skill_id].get('similarity', 0):
+                    best[skill_id] = skill
+        
+        return sorted(best.values(), key=lambda x: x.get('similarity', 0), reverse=True)[:limit]
+    except Exception as e:
+        print(f"Warning: Database search failed ({e}), using fallback")
+        return await _atop_skills(db, limit)
+
+
+async def asemantic_search_skills(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Async variant of ``semantic_search_skills`` (native async database reads)."""
+    db = await get_async_database()
+    embeddings = get_query_embeddings()
+    
+    try:
+        query_embedding = await embeddings.aembed_query(query)
+    except Exception as e:
+        print(f"Warning: Embedding failed ({e}), using fallback")
+        return await _atop_skills(db, limit)
+    
+    try:
+        return await _asearch_similar(db, 'skills', query_embedding, 0.6, limit)
+    except Exception as e:
+        print(f"Warning: Database search failed ({e}), using fallback")
+        return await _atop_skills(db, limit)
+
+
+async def asemantic_search_skills_multi(queries: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+    """Async variant of ``semantic_search_skills_multi`` (native async database reads)."""
+    db = await get_async_database()
+    embeddings = get_query_embeddings()
+    
+    try:
+        query_embeddings = await embeddings.aembed_documents(queries)
+    except Exception as e:
+        print(f"Warning: Embedding failed ({e}), using fallback")
+        return await _atop_skills(db, limit)
+    
+    return await _asearch_skills_multi(db, query_embeddings, limit)
+
+
+async def asemantic_search_resources(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Async variant of ``semantic_search_resources`` (native async database reads)."""
+    db = await get_async_database()
+    embeddings = get_query_embeddings()
+    
+    try:
+        query_embedding = await embeddings.aembed_query(query)
+    except Exception as e:
+        print(f"Warning: Embedding failed ({e}), using fallback")
+        return await _atop_resources(db, limit)
+    
+    try:
+        return await _asearch_similar(db, 'resources', query_embedding, 0.6, limit)
     except Exception as e:
         print(f"Warning: Database search failed ({e}), using fallback")
-        return db.get_all_resources(limit=limit)
+        return await _atop_resources(db, limit)
 
 
 @tool
@@ -222,8 +461,30 @@ def get_recommendations_for_level(student_level: str, focus_area: str = None) ->
         return db.get_top_skills_for_students(limit=10)
 
 
+async def aget_recommendations_for_level(student_level: str, focus_area: str = None) -> List[Dict[str, Any]]:
+    """Async variant of ``get_recommendations_for_level`` (native async database reads)."""
+    db = await get_async_database()
+    
+    try:
+        result = await db.rpc(
+            'get_recommended_skills_for_query',
+            {
+                'student_level_param': student_level,
+                'focus_area_param': focus_area
+            }
+        ).execute()
+        
+        return result.data if result.data else []
+    except Exception:
+        return await _atop_skills_for_students(db, limit=10)
+
+
 class AgenticRAGChatbot:
-    """Agentic RAG chatbot with multi-step reasoning and refinement."""
+    """Agentic RAG chatbot with multi-step reasoning and refinement.
+    
+    An instance holds no per-conversation state, so a single instance (see
+    ``get_chatbot``) can serve concurrent ``chat`` calls from many threads.
+    """
     
     def __init__(self):
         """Initialize agentic RAG system."""
@@ -241,52 +502,98 @@ class AgenticRAGChatbot:
             get_recommendations_for_level
         ]
         self.graph = self._build_graph()
+        # Same workflow without the final LLM node; streaming runs generation itself
+        self.retrieval_graph = self._build_graph(include_generation=False)
     
-    def _build_graph(self) -> StateGraph:
-        """Build optimized agentic RAG workflow graph."""
+    def _build_graph(self, include_generation: bool = True) -> StateGraph:
+        """Build optimized agentic RAG workflow graph.
+        
+        Args:
+            include_generation: Whether to end with the response generation node
+        """
         workflow = StateGraph(AgenticRAGState)
 
         # Define nodes - OPTIMIZED: Reduced from 7 to 4 nodes
-        workflow.add_node("analyze", self._analyze_node)
+        # Each node has a sync and an async implementation so the same compiled
+        # graph serves invoke() (CLI tools) and ainvoke() (API)
+        workflow.add_node("analyze", RunnableLambda(self._analyze_node, afunc=self._aanalyze_node))
         workflow.add_node("plan_search", self._plan_search_node)
-        workflow.add_node("retrieve", self._retrieve_node)
-        workflow.add_node("generate", self._generate_response_node)  # Combined reason+draft+refine
+        workflow.add_node("retrieve", RunnableLambda(self._retrieve_node, afunc=self._aretrieve_node))
+        if include_generation:
+            # Combined reason+draft+refine
+            workflow.add_node("generate", RunnableLambda(self._generate_response_node, afunc=self._agenerate_response_node))
 
         # Define edges - Simplified linear flow
         workflow.set_entry_point("analyze")
         workflow.add_edge("analyze", "plan_search")
         workflow.add_edge("plan_search", "retrieve")
-        workflow.add_edge("retrieve", "generate")
-        workflow.add_edge("generate", END)
+        if include_generation:
+            workflow.add_edge("retrieve", "generate")
+            workflow.add_edge("generate", END)
+        else:
+            workflow.add_edge("retrieve", END)
 
         return workflow.compile()
     
     def _analyze_node(self, state: AgenticRAGState) -> AgenticRAGState:
-        """Analyze user query to understand intent."""
+        """Analyze user query to understand intent.
+        
+        The local classifier handles most queries; ``analyze_query`` (an LLM
+        call) is only used when it is not confident.
+        """
         print("\n[Agent] Analyzing query...")
         
         try:
-            analysis = analyze_query.invoke({
-                "query": state['user_query'],
-                "student_level": state['student_level']
-            })
-            
-            state['query_analysis'] = analysis
-            state['reasoning_steps'].append(f"Identified intent: {analysis.get('intent', 'unknown')}")
-            
-            print(f"  Intent: {analysis.get('intent')}")
-            print(f"  Entities: {analysis.get('entities')}")
+            classifier = get_intent_classifier()
+            analysis = classifier.classify(state['user_query'])
+            if analysis is None:
+                # Low local confidence: ask the LLM
+                classifier.record_llm_fallback()
+                analysis = analyze_query.invoke({
+                    "query": state['user_query'],
+                    "student_level": state['student_level']
+                })
+            self._record_analysis(state, analysis)
         except Exception as e:
-            print(f"  Error in analysis: {e}")
-            state['query_analysis'] = {
-                "intent": "skill_discovery",
-                "entities": [],
-                "context_needs": ["skills", "resources"]
-            }
-            state['reasoning_steps'].append(f"Analysis failed, using default intent")
+            self._record_analysis_failure(state, e)
+        
+        return state
+    
+    async def _aanalyze_node(self, state: AgenticRAGState) -> AgenticRAGState:
+        """Async variant of ``_analyze_node``."""
+        print("\n[Agent] Analyzing query...")
+        
+        try:
+            classifier = get_intent_classifier()
+            analysis = await classifier.aclassify(state['user_query'])
+            if analysis is None:
+                # Low local confidence: ask the LLM
+                classifier.record_llm_fallback()
+                analysis = await aanalyze_query(state['user_query'], state['student_level'])
+            self._record_analysis(state, analysis)
+        except Exception as e:
+            self._record_analysis_failure(state, e)
         
         return state
     
+    def _record_analysis(self, state: AgenticRAGState, analysis: Dict[str, Any]):
+        """Store a successful query analysis in the workflow state."""
+        state['query_analysis'] = analysis
+        state['reasoning_steps'].append(f"Identified intent: {analysis.get('intent', 'unknown')}")
+        
+        print(f"  Intent: {analysis.get('intent')} (via {analysis.get('source', 'llm')})")
+        print(f"  Entities: {analysis.get('entities')}")
+    
+    def _record_analysis_failure(self, state: AgenticRAGState, error: Exception):
+        """Fall back to the default intent after an analysis error."""
+        print(f"  Error in analysis: {error}")
+        state['query_analysis'] = {
+            "intent": "skill_discovery",
+            "entities": [],
+            "context_needs": ["skills", "resources"]
+        }
+        state['reasoning_steps'].append(f"Analysis failed, using default intent")
+    
     def _plan_search_node(self, state: AgenticRAGState) -> AgenticRAGState:
         """Plan search queries based on analysis."""
         print("\n[Agent] Planning search strategy...")
@@ -325,49 +632,104 @@ class AgenticRAGChatbot:
         return state
     
     def _retrieve_node(self, state: AgenticRAGState) -> AgenticRAGState:
-        """Retrieve relevant data from database."""
+        """Retrieve relevant data from database.
+        
+        The batched skill search (all planned queries in one embedding call and
+        one RPC), the resource search and the level recommendations are independent, so they run concurrently on a
+        pool owned by this request (at most RAG_RETRIEVAL_CONCURRENCY threads),
+        so slow branches of one chat never queue another chat's. A branch that
+        fails or misses the deadline contributes an empty result instead of
+        stalling the answer.
+        """
         print("\n[Agent] Retrieving data...")
         
-        retrieved = {
-            'skills': [],
-            'resources': [],
-            'recommendations': []
-        }
+        # Duplicate planned queries would return identical rows
+        queries = list(dict.fromkeys(state.get('search_queries', [state['user_query']])))
+        branches = [
+            ("skills", semantic_search_skills_multi.invoke, {"queries": queries, "limit": 10}),
+            ("resources", semantic_search_resources.invoke, {"query": state['user_query'], "limit": 5}),
+            ("recommendations", get_recommendations_for_level.invoke, {"student_level": state['student_level']}),
+        ]
         
+        timeout = config.RAG_RETRIEVAL_TIMEOUT
+        deadline = time.monotonic() + timeout
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(config.RAG_RETRIEVAL_CONCURRENCY, len(branches))),
+            thread_name_prefix="rag-retrieve"
+        )
+        results = {}
         try:
-            # Semantic search for skills
-            for query in state.get('search_queries', [state['user_query']]):
-                skills = semantic_search_skills.invoke({"query": query, "limit": 5})
-                retrieved['skills'].extend(skills)
-            
-            # Remove duplicates
-            seen_skills = set()
-            unique_skills = []
-            for skill in retrieved['skills']:
-                skill_id = skill.get('skill_id') or skill.get('id')
-                if skill_id and skill_id not in seen_skills:
-                    seen_skills.add(skill_id)
-                    unique_skills.append(skill)
-            retrieved['skills'] = unique_skills[:10]
-            
-            # Get resources
-            resources = semantic_search_resources.invoke({
-                "query": state['user_query'],
-                "limit": 5
-            })
-            retrieved['resources'] = resources
-            
-            # Get recommendations for student level
-            recs = get_recommendations_for_level.invoke({
-                "student_level": state['student_level']
-            })
-            retrieved['recommendations'] = recs[:5]
-            
-        except Exception as e:
-            print(f"  Error retrieving data: {e}")
-            import traceback
-            traceback.print_exc()
+            futures = [(name, executor.submit(func, args)) for name, func, args in branches]
+            for name, future in futures:
+                try:
+                    results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    # Drops the branch if it has not started; a running call
+                    # finishes on its own thread but is no longer waited for
+                    future.cancel()
+                    print(f"  Retrieval branch '{name}' timed out after {timeout}s, skipping")
+                    results[name] = []
+                except Exception as e:
+                    print(f"  Error in retrieval branch '{name}': {e}")
+                    results[name] = []
+        finally:
+            # Do not block the answer on abandoned branches
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        self._record_retrieved(state, self._combine_retrieved(results))
+        return state
+    
+    async def _aretrieve_node(self, state: AgenticRAGState) -> AgenticRAGState:
+        """Async variant of ``_retrieve_node`` (bounded ``asyncio.gather``)."""
+        print("\n[Agent] Retrieving data...")
+        
+        # Duplicate planned queries would return identical rows
+        queries = list(dict.fromkeys(state.get('search_queries', [state['user_query']])))
+        branches = [
+            ("skills", asemantic_search_skills_multi(queries, limit=10)),
+            ("resources", asemantic_search_resources(state['user_query'], limit=5)),
+            ("recommendations", aget_recommendations_for_level(state['student_level'])),
+        ]
         
+        timeout = config.RAG_RETRIEVAL_TIMEOUT
+        semaphore = asyncio.Semaphore(config.RAG_RETRIEVAL_CONCURRENCY)
+        
+        async def run_branch(name, coro):
+            try:
+                async with semaphore:
+                    return name, await asyncio.wait_for(coro, timeout=timeout)
+            except asyncio.TimeoutError:
+                print(f"  Retrieval branch '{name}' timed out after {timeout}s, skipping")
+            except Exception as e:
+                print(f"  Error in retrieval branch '{name}': {e}")
+            return name, []
+        
+        results = dict(await asyncio.gather(*(run_branch(name, coro) for name, coro in branches)))
+        
+        self._record_retrieved(state, self._combine_retrieved(results))
+        return state
+    
+    def _combine_retrieved(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge per-branch retrieval results."""
+        return {
+            'skills': self._dedupe_skills(results.get('skills') or []),
+            'resources': results.get('resources') or [],
+            'recommendations': (results.get('recommendations') or [])[:5]
+        }
+    
+    def _dedupe_skills(self, skills: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remove duplicate skills across search queries, keeping the top 10."""
+        seen_skills = set()
+        unique_skills = []
+        for skill in skills:
+            skill_id = skill.get('skill_id') or skill.get('id')
+            if skill_id and skill_id not in seen_skills:
+                seen_skills.add(skill_id)
+                unique_skills.append(skill)
+        return unique_skills[:10]
+    
+    def _record_retrieved(self, state: AgenticRAGState, retrieved: Dict[str, Any]):
+        """Store retrieval results in the workflow state."""
         state['retrieved_data'] = retrieved
         state['reasoning_steps'].append(
             f"Retrieved {len(retrieved['skills'])} skills, "
@@ -376,24 +738,19 @@ class AgenticRAGChatbot:
         
         print(f"  Found {len(retrieved['skills'])} relevant skills")
         print(f"  Found {len(retrieved['resources'])} relevant resources")
-        
-        return state
     
-    def _generate_response_node(self, state: AgenticRAGState) -> AgenticRAGState:
-        """OPTIMIZED: Generate complete response in one LLM call (combines reason+draft+refine)."""
-        print("\n[Agent] Generating response...")
-
-        try:
-            # Single optimized prompt that does reasoning + drafting in one pass
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are an expert IT Skills Advisor. Based on the user's query and retrieved data:
+    def _build_generation_messages(self, state: AgenticRAGState) -> list:
+        """Build the prompt messages for the final response from retrieved data."""
+        # Single optimized prompt that does reasoning + drafting in one pass
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert IT Skills Advisor. Based on the user's query and retrieved data:
 1. Identify key insights from the data
 2. Create a clear, actionable response with specific skills, demand scores, and resources
 3. Format with markdown for readability
 4. Tailor advice to the student's level
 
 Be concise, specific, and helpful."""),
-                ("user", """Query: {query}
+            ("user", """Query: {query}
 Student Level: {level}
 Intent: {intent}
 
@@ -407,59 +764,143 @@ Recommendations:
 {recommendations}
 
 Generate a complete, polished response:""")
-            ])
-
-            retrieved = state.get('retrieved_data', {})
-            query_analysis = state.get('query_analysis', {})
-
-            # Format data concisely for faster processing
-            skills_summary = "\n".join([
-                f"- {s.get('skill_name', 'Unknown')} (Demand: {s.get('demand_score', 'N/A')})"
-                for s in retrieved.get('skills', [])[:5]
-            ])
-
-            resources_summary = "\n".join([
-                f"- {r.get('title', 'Unknown')}: {r.get('url', 'N/A')}"
-                for r in retrieved.get('resources', [])[:3]
-            ])
-
-            recommendations_summary = "\n".join([
-                f"- {r.get('skill_name', 'Unknown')}"
-                for r in retrieved.get('recommendations', [])[:3]
-            ])
-
-            # Get intent safely with fallback
-            intent = query_analysis.get('intent', 'general_inquiry') if isinstance(query_analysis, dict) else 'general_inquiry'
-
-            response = self.llm.invoke(prompt.format_messages(
-                query=state['user_query'],
-                level=state['student_level'],
-                intent=intent,
-                skills=skills_summary or "No specific skills found",
-                resources=resources_summary or "No resources found",
-                recommendations=recommendations_summary or "No recommendations available"
-            ))
-
-            state['refined_response'] = response.content
-            state['draft_response'] = response.content  # Keep for compatibility
-            state['confidence_score'] = 0.9  # Assume high quality from optimized prompt
-            state['reasoning_steps'].append("Generated complete response in single pass")
-
-            print(f"  Generated response ({len(response.content)} chars)")
+        ])
+
+        retrieved = state.get('retrieved_data', {})
+        query_analysis = state.get('query_analysis', {})
+
+        # Format data concisely for faster processing
+        skills_summary = "\n".join([
+            f"- {s.get('skill_name', 'Unknown')} (Demand: {s.get('demand_score', 'N/A')})"
+            for s in retrieved.get('skills', [])[:5]
+        ])
+
+        resources_summary = "\n".join([
+            f"- {r.get('title', 'Unknown')}: {r.get('url', 'N/A')}"
+            for r in retrieved.get('resources', [])[:3]
+        ])
+
+        recommendations_summary = "\n".join([
+            f"- {r.get('skill_name', 'Unknown')}"
+            for r in retrieved.get('recommendations', [])[:3]
+        ])
+
+        # Get intent safely with fallback
+        intent = query_analysis.get('intent', 'general_inquiry') if isinstance(query_analysis, dict) else 'general_inquiry'
+
+        return prompt.format_messages(
+            query=state['user_query'],
+            level=state['student_level'],
+            intent=intent,
+            skills=skills_summary or "No specific skills found",
+            resources=resources_summary or "No resources found",
+            recommendations=recommendations_summary or "No recommendations available"
+        )
+    
+    def _generate_response_node(self, state: AgenticRAGState) -> AgenticRAGState:
+        """OPTIMIZED: Generate complete response in one LLM call (combines reason+draft+refine)."""
+        print("\n[Agent] Generating response...")
 
+        try:
+            response = self.llm.invoke(self._build_generation_messages(state))
+            self._record_response(state, response.content)
         except Exception as e:
-            print(f"  Error generating response: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            
-            # Provide fallback response
-            state['refined_response'] = "I apologize, but I encountered an error while processing your request. Please try rephrasing your question or contact support if the issue persists."
-            state['draft_response'] = state['refined_response']
-            state['confidence_score'] = 0.3
-            state['reasoning_steps'].append(f"Error during generation: {str(e)}")
+            self._record_generation_failure(state, e)
+
+        return state
+    
+    async def _agenerate_response_node(self, state: AgenticRAGState) -> AgenticRAGState:
+        """Async variant of ``_generate_response_node``."""
+        print("\n[Agent] Generating response...")
+
+        try:
+            response = await self.llm.ainvoke(self._build_generation_messages(state))
+            self._record_response(state, response.content)
+        except Exception as e:
+            self._record_generation_failure(state, e)
 
         return state
     
+    def _record_response(self, state: AgenticRAGState, content: str):
+        """Store the generated response in the workflow state."""
+        state['refined_response'] = content
+        state['draft_response'] = content  # Keep for compatibility
+        state['confidence_score'] = 0.9  # Assume high quality from optimized prompt
+        state['reasoning_steps'].append("Generated complete response in single pass")
+
+        print(f"  Generated response ({len(content)} chars)")
+    
+    def _record_generation_failure(self, state: AgenticRAGState, error: Exception):
+        """Store the fallback response after a generation error."""
+        print(f"  Error generating response: {str(error)}")
+        import traceback
+        traceback.print_exc()
+        
+        # Provide fallback response
+        state['refined_response'] = GENERATION_ERROR_RESPONSE
+        state['draft_response'] = state['refined_response']
+        state['confidence_score'] = 0.3
+        state['reasoning_steps'].append(f"Error during generation: {str(error)}")
+    
+    def _initial_state(self, user_query: str, student_level: str) -> AgenticRAGState:
+        """Create the starting workflow state for a query."""
+        return AgenticRAGState(
+            user_query=user_query,
+            student_level=student_level,
+            query_analysis={},
+            search_queries=[],
+            retrieved_data={},
+            reasoning_steps=[],
+            draft_response="",
+            refined_response="",
+            confidence_score=0.0,
+            needs_clarification=False,
+            refinement_count=0  # Initialize counter
+        )
+    
+    def _lookup_cached_response(self, user_query: str, student_level: str):
+        """Embed the query and check the semantic response cache.
+        
+        Returns:
+            (query embedding or None, cache generation or None, cached response or None);
+            pass the first two to ``_cache_response``
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return None, None, None
+        # Read before generating so an invalidation meanwhile discards the answer
+        cache_generation = cache.generation
+        try:
+            # Same cached embedder as retrieval, so this costs no extra API call
+            query_embedding = get_query_embeddings().embed_query(user_query)
+        except Exception as e:
+            print(f"Warning: Response cache lookup skipped ({e})")
+            return None, None, None
+        return query_embedding, cache_generation, cache.lookup(query_embedding, student_level)
+    
+    async def _alookup_cached_response(self, user_query: str, student_level: str):
+        """Async variant of ``_lookup_cached_response``."""
+        cache = get_response_cache()
+        if cache is None:
+            return None, None, None
+        cache_generation = cache.generation
+        try:
+            query_embedding = await get_query_embeddings().aembed_query(user_query)
+        except Exception as e:
+            print(f"Warning: Response cache lookup skipped ({e})")
+            return None, None, None
+        return query_embedding, cache_generation, cache.lookup(query_embedding, student_level)
+    
+    def _cache_response(self, query_embedding: Optional[List[float]], cache_generation: Optional[int],
+                        user_query: str, student_level: str, response: str):
+        """Store a successful answer unless the cache was invalidated since ``cache_generation``."""
+        cache = get_response_cache()
+        if cache is None or query_embedding is None or not response:
+            return
+        if response == GENERATION_ERROR_RESPONSE:
+            return
+        cache.store(query_embedding, student_level, user_query, response, generation=cache_generation)
+    
     def chat(self, user_query: str, student_level: str = "Junior") -> str:
         """Process user query through agentic RAG workflow.
         
@@ -474,20 +915,13 @@ Generate a complete, polished response:""")
         print("Agentic RAG Processing")
         print("="*80)
         
+        query_embedding, cache_generation, cached = self._lookup_cached_response(user_query, student_level)
+        if cached is not None:
+            print("Answered from response cache\n")
+            return cached
+        
         try:
-            initial_state = AgenticRAGState(
-                user_query=user_query,
-                student_level=student_level,
-                query_analysis={},
-                search_queries=[],
-                retrieved_data={},
-                reasoning_steps=[],
-                draft_response="",
-                refined_response="",
-                confidence_score=0.0,
-                needs_clarification=False,
-                refinement_count=0  # Initialize counter
-            )
+            initial_state = self._initial_state(user_query, student_level)
             
             result = self.graph.invoke(initial_state)
             
@@ -495,10 +929,181 @@ Generate a complete, polished response:""")
             print(f"Processing Complete (Confidence: {result['confidence_score']:.2f})")
             print("="*80 + "\n")
             
+            self._cache_response(query_embedding, cache_generation, user_query, student_level, result['refined_response'])
+            return result['refined_response']
+            
+        except Exception as e:
+            print(f"\nError in chat processing: {e}")
+            import traceback
+            traceback.print_exc()
+            return f"I apologize, but I encountered an error while processing your request: {str(e)}"
+
+
+    def stream_chat(self, user_query: str, student_level: str = "Junior") -> Iterator[Dict[str, Any]]:
+        """Process a query and stream progress events followed by response tokens.
+        
+        Runs analyze -> plan_search -> retrieve through the workflow graph,
+        emitting one ``node`` event per completed step, then streams the final
+        LLM call token by token.
+        
+        Args:
+            user_query: User's question
+            student_level: Student's current level
+            
+        Yields:
+            Events: ``{"event": "node", ...}``, ``{"event": "token", "content": ...}``,
+            then ``{"event": "done", "response": ...}`` or ``{"event": "error", ...}``
+        """
+        query_embedding, cache_generation, cached = self._lookup_cached_response(user_query, student_level)
+        if cached is not None:
+            yield {"event": "node", "node": "cache", "detail": "Answered from response cache"}
+            yield {"event": "token", "content": cached}
+            yield {"event": "done", "response": cached}
+            return
+        
+        state = self._initial_state(user_query, student_level)
+        
+        try:
+            for step in self.retrieval_graph.stream(state):
+                for node_name, node_state in step.items():
+                    state = node_state
+                    yield {
+                        "event": "node",
+                        "node": node_name,
+                        "detail": state['reasoning_steps'][-1] if state.get('reasoning_steps') else ""
+                    }
+        except Exception as e:
+            print(f"\nError in chat streaming: {e}")
+            yield {"event": "error", "message": str(e)}
+            return
+        
+        print("\n[Agent] Streaming response...")
+        chunks = []
+        try:
+            for chunk in self.llm.stream(self._build_generation_messages(state)):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield {"event": "token", "content": chunk.content}
+        except Exception as e:
+            print(f"  Error generating response: {str(e)}")
+            if not chunks:
+                # Nothing reached the client yet; send the same fallback as chat()
+                chunks.append(GENERATION_ERROR_RESPONSE)
+                yield {"event": "token", "content": GENERATION_ERROR_RESPONSE}
+            # Never cache a partial or fallback answer
+            query_embedding = None
+        
+        response = "".join(chunks)
+        self._cache_response(query_embedding, cache_generation, user_query, student_level, response)
+        yield {"event": "done", "response": response}
+
+
+    async def achat(self, user_query: str, student_level: str = "Junior") -> str:
+        """Async variant of ``chat`` for use inside the API event loop.
+        
+        Args:
+            user_query: User's question
+            student_level: Student's current level
+            
+        Returns:
+            Refined response
+        """
+        print("\n" + "="*80)
+        print("Agentic RAG Processing")
+        print("="*80)
+        
+        query_embedding, cache_generation, cached = await self._alookup_cached_response(user_query, student_level)
+        if cached is not None:
+            print("Answered from response cache\n")
+            return cached
+        
+        try:
+            initial_state = self._initial_state(user_query, student_level)
+            
+            result = await self.graph.ainvoke(initial_state)
+            
+            print("\n" + "="*80)
+            print(f"Processing Complete (Confidence: {result['confidence_score']:.2f})")
+            print("="*80 + "\n")
+            
+            self._cache_response(query_embedding, cache_generation, user_query, student_level, result['refined_response'])
             return result['refined_response']
             
         except Exception as e:
             print(f"\nError in chat processing: {e}")
             import traceback
             traceback.print_exc()
-            return f"I apologize, but I encountered an error while processing your request: {str(e)}"
\ No newline at end of file
+            return f"I apologize, but I encountered an error while processing your request: {str(e)}"
+
+    async def astream_chat(self, user_query: str, student_level: str = "Junior") -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of ``stream_chat``; yields the same events.
+        
+        Args:
+            user_query: User's question
+            student_level: Student's current level
+            
+        Yields:
+            Events: ``{"event": "node", ...}``, ``{"event": "token", "content": ...}``,
+            then ``{"event": "done", "response": ...}`` or ``{"event": "error", ...}``
+        """
+        query_embedding, cache_generation, cached = await self._alookup_cached_response(user_query, student_level)
+        if cached is not None:
+            yield {"event": "node", "node": "cache", "detail": "Answered from response cache"}
+            yield {"event": "token", "content": cached}
+            yield {"event": "done", "response": cached}
+            return
+        
+        state = self._initial_state(user_query, student_level)
+        
+        try:
+            async for step in self.retrieval_graph.astream(state):
+                for node_name, node_state in step.items():
+                    state = node_state
+                    yield {
+                        "event": "node",
+                        "node": node_name,
+                        "detail": state['reasoning_steps'][-1] if state.get('reasoning_steps') else ""
+                    }
+        except Exception as e:
+            print(f"\nError in chat streaming: {e}")
+            yield {"event": "error", "message": str(e)}
+            return
+        
+        print("\n[Agent] Streaming response...")
+        chunks = []
+        try:
+            async for chunk in self.llm.astream(self._build_generation_messages(state)):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield {"event": "token", "content": chunk.content}
+        except Exception as e:
+            print(f"  Error generating response: {str(e)}")
+            if not chunks:
+                # Nothing reached the client yet; send the same fallback as achat()
+                chunks.append(GENERATION_ERROR_RESPONSE)
+                yield {"event": "token", "content": GENERATION_ERROR_RESPONSE}
+            # Never cache a partial or fallback answer
+            query_embedding = None
+        
+        response = "".join(chunks)
+        self._cache_response(query_embedding, cache_generation, user_query, student_level, response)
+        yield {"event": "done", "response": response}
+
+
+# Shared chatbot instance (graph and clients are built once per process)
+_chatbot: Optional[AgenticRAGChatbot] = None
+_chatbot_lock = threading.Lock()
+
+
+def get_chatbot() -> AgenticRAGChatbot:
+    """Get or create the process-wide chatbot instance.
+    
+    Returns:
+        Shared AgenticRAGChatbot
+    """
+    global _chatbot
+    if _chatbot is None:
+        with _chatbot_lock:
+            if _chatbot is None:
+                _chatbot = AgenticRAGChatbot()
+    return _chatbot
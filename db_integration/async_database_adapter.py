@@ -0,0 +1,376 @@
+"""Async database adapter for FastAPI handlers (Docker PostgreSQL or Supabase).
+
+Same chaining API as ``DatabaseAdapter``, but ``execute()`` is awaited::
+
+    db = await get_async_database()
+    result = await db.table('it_skills').select('*').eq('category', 'AI').execute()
+
+PostgreSQL queries run on psycopg 3's ``AsyncConnectionPool``, so a slow
+query only suspends the handler that issued it instead of blocking the event
+loop. SQL is built by the synchronous builders in ``database_adapter``.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row, tuple_row
+from psycopg.types.json import Jsonb
+from psycopg_pool import AsyncConnectionPool
+from supabase import AsyncClient, acreate_client
+from dotenv import load_dotenv
+
+from db_integration.database_adapter import (
+    PostgresInsertBuilder, PostgresQueryBuilder, PostgresResult, PostgresRPCBuilder,
+    _columns, _foreign_keys
+)
+from db_integration.query_stats import explain_sql, get_query_stats
+
+load_dotenv()
+
+
+# Process-wide shared clients (created on first use inside the event loop)
+_async_pool: Optional[AsyncConnectionPool] = None
+_async_supabase_client: Optional[AsyncClient] = None
+# One asyncio.Lock per event loop: a lock is bound to the loop that first
+# waits on it, and tests or worker threads may run several loops
+_async_clients_locks = weakref.WeakKeyDictionary()
+_async_clients_locks_guard = threading.Lock()
+
+# Connection pinned by AsyncDatabaseAdapter.transaction() for the current task
+_transaction_conn: ContextVar[Optional[AsyncConnection]] = ContextVar('_transaction_conn', default=None)
+
+
+def _clients_lock() -> asyncio.Lock:
+    """Lock guarding creation of the shared clients, for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_locks_guard:
+        lock = _async_clients_locks.get(loop)
+        if lock is None:
+            lock = _async_clients_locks[loop] = asyncio.Lock()
+    return lock
+
+
+async def get_async_connection_pool() -> AsyncConnectionPool:
+    """Get or create the process-wide async PostgreSQL connection pool.
+
+    Uses the same DB_* connection settings as the synchronous pool. Size is
+    configured with ASYNC_DB_POOL_MIN_SIZE, ASYNC_DB_POOL_MAX_SIZE and
+    DB_POOL_TIMEOUT (seconds).
+
+    Returns:
+        Shared async connection pool
+    """
+    global _async_pool
+    if _async_pool is None:
+        async with _clients_lock():
+            if _async_pool is None:
+                pool = AsyncConnectionPool(
+                    min_size=int(os.getenv('ASYNC_DB_POOL_MIN_SIZE', '1')),
+                    max_size=int(os.getenv('ASYNC_DB_POOL_MAX_SIZE', '10')),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                    kwargs={
+                        'host': os.getenv('DB_HOST', 'database'),
+                        'port': os.getenv('DB_PORT', '5432'),
+                        'dbname': os.getenv('DB_NAME', os.getenv('POSTGRES_DB', 'evolveiq_db')),
+                        'user': os.getenv('DB_USER', os.getenv('POSTGRES_USER', 'evolveiq')),
+                        'password': os.getenv('DB_PASSWORD', os.getenv('POSTGRES_PASSWORD', 'evolveiq_password')),
+                        'row_factory': dict_row
+                    },
+                    open=False
+                )
+                try:
+                    await pool.open(wait=True, timeout=pool.timeout)
+                except Exception as e:
+                    await pool.close()
+                    raise ValueError(f"Failed to connect to PostgreSQL: {str(e)}")
+                _async_pool = pool
+    return _async_pool
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Get or create the process-wide async Supabase client.
+
+    Returns:
+        Shared async Supabase client
+    """
+    global _async_supabase_client
+    if _async_supabase_client is None:
+        async with _clients_lock():
+            if _async_supabase_client is None:
+                supabase_url = os.getenv('SUPABASE_URL')
+                supabase_key = os.getenv('SUPABASE_KEY')
+
+                if not supabase_url or not supabase_key:
+                    raise ValueError(
+                        "USE_SUPABASE=true but SUPABASE_URL and SUPABASE_KEY must be set"
+                    )
+
+                _async_supabase_client = await acreate_client(supabase_url, supabase_key)
+    return _async_supabase_client
+
+
+async def close_async_connection_pool():
+    """Close the shared async connection pool (call on process shutdown)."""
+    global _async_pool
+    async with _clients_lock():
+        if _async_pool is not None:
+            await _async_pool.close()
+            _async_pool = None
+
+
+@asynccontextmanager
+async def _cursor(pool: AsyncConnectionPool):
+    """Yield a tuple cursor and commit when the block succeeds.
+
+    Inside ``AsyncDatabaseAdapter.transaction()`` the block runs on the pinned
+    connection under a savepoint, and the commit is left to the transaction.
+    """
+    conn = _transaction_conn.get()
+    if conn is not None:
+        async with conn.transaction():
+            async with conn.cursor(row_factory=tuple_row) as cursor:
+                yield cursor
+        return
+
+    # The pool commits on a clean exit and rolls back on error
+    async with pool.connection() as conn:
+        async with conn.cursor(row_factory=tuple_row) as cursor:
+            yield cursor
+
+
+async def _execute(cursor, name: str, query: str, values=None,
+                   fetch: bool = True) -> Tuple[list, Optional[List[str]]]:
+    """Run one statement and report it to the query statistics (see ``database_adapter._execute``).
+
+    Returns:
+        (result rows, column names), the columns read before a plan capture
+        reuses the cursor
+    """
+    stats = get_query_stats()
+    start = time.perf_counter()
+    try:
+        await cursor.execute(query, values)
+        results = await cursor.fetchall() if fetch else []
+    except Exception:
+        if stats:
+            stats.record(name, query, 0, time.perf_counter() - start, error=True)
+        raise
+    columns = _columns(cursor)
+
+    rows = len(results) if fetch else max(cursor.rowcount, 0)
+    if stats and stats.record(name, query, rows, time.perf_counter() - start):
+        # Re-run under EXPLAIN inside a savepoint that is always rolled back
+        await cursor.execute("SAVEPOINT query_explain")
+        try:
+            await cursor.execute(explain_sql(query), values)
+            stats.attach_plan(query, "\n".join(row[0] for row in await cursor.fetchall()))
+        except psycopg.Error as e:
+            print(f"Warning: Could not capture query plan: {e}")
+        await cursor.execute("ROLLBACK TO SAVEPOINT query_explain")
+    return results, columns
+
+
+async def get_async_database() -> 'AsyncDatabaseAdapter':
+    """Create an async adapter, opening the shared pool or client on first use.
+
+    Returns:
+        AsyncDatabaseAdapter for the configured backend
+    """
+    if os.getenv('USE_SUPABASE', 'false').lower() == 'true':
+        return AsyncDatabaseAdapter(supabase_client=await get_async_supabase_client())
+    return AsyncDatabaseAdapter(pool=await get_async_connection_pool())
+
+
+class AsyncDatabaseAdapter:
+    """Async counterpart of ``DatabaseAdapter``.
+
+    Instances are cheap: they share one process-wide async pool (or Supabase
+    client); use ``get_async_database()`` to build one.
+    """
+
+    def __init__(self, pool: Optional[AsyncConnectionPool] = None,
+                 supabase_client: Optional[AsyncClient] = None):
+        """Initialize the adapter.
+
+        Args:
+            pool: Async PostgreSQL pool (Docker PostgreSQL)
+            supabase_client: Async Supabase client (used when set)
+        """
+        self.use_supabase = supabase_client is not None
+        self.supabase_client = supabase_client
+        self.pool = pool
+
+    def table(self, table_name: str):
+        """Get table interface compatible with the async Supabase client."""
+        if self.use_supabase:
+            return self.supabase_client.table(table_name)
+        else:
+            return AsyncPostgresTableAdapter(self.pool, table_name)
+
+    def rpc(self, function_name: str, params: dict = None):
+        """Call a PostgreSQL function (RPC) - compatible with the async Supabase client."""
+        if self.use_supabase:
+            return self.supabase_client.rpc(function_name, params)
+        else:
+            return AsyncPostgresRPCBuilder(self.pool, function_name, params or {})
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Group queries into one transaction: commit when the block ends, roll back on error.
+
+        Nested calls join the outer transaction. With Supabase this is a no-op.
+        """
+        if self.use_supabase or _transaction_conn.get() is not None:
+            yield
+            return
+
+        async with self.pool.connection() as conn:
+            token = _transaction_conn.set(conn)
+            try:
+                async with conn.transaction():
+                    yield
+            finally:
+                _transaction_conn.reset(token)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get async connection pool statistics (empty when using Supabase)."""
+        return self.pool.get_stats() if self.pool else {}
+
+
+class AsyncPostgresTableAdapter:
+    """Async adapter to make PostgreSQL queries compatible with the Supabase client interface."""
+
+    def __init__(self, pool: AsyncConnectionPool, table_name: str):
+        self.pool = pool
+        self.table_name = table_name
+
+    def select(self, columns: str = '*'):
+        """Start a SELECT query."""
+        return AsyncPostgresQueryBuilder(self.pool, self.table_name, 'select', columns)
+
+    def insert(self, data):
+        """Insert one row (dict) or many (list of dicts) - returns query builder for chaining."""
+        return AsyncPostgresInsertBuilder(self.pool, self.table_name, data, 'insert')
+
+    def upsert(self, data, on_conflict: Optional[str] = None):
+        """Upsert one row (dict) or many (list of dicts) - returns query builder for chaining."""
+        return AsyncPostgresInsertBuilder(self.pool, self.table_name, data, 'upsert', on_conflict)
+
+    def delete(self):
+        """Start a DELETE query."""
+        return AsyncPostgresQueryBuilder(self.pool, self.table_name, 'delete')
+
+    def update(self, data: dict):
+        """Start an UPDATE query."""
+        return AsyncPostgresQueryBuilder(self.pool, self.table_name, 'update', update_data=data)
+
+
+async def _foreign_key(cursor, table_name: str, referenced: str):
+    """Async variant of ``database_adapter._foreign_key`` (shares its cache)."""
+    key = (table_name, referenced)
+    if key not in _foreign_keys:
+        await cursor.execute("""
+            SELECT kcu.column_name AS fk_column, ccu.column_name AS ref_column
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.key_column_usage kcu
+              ON kcu.constraint_name = tc.constraint_name AND kcu.table_schema = tc.table_schema
+            JOIN information_schema.constraint_column_usage ccu
+              ON ccu.constraint_name = tc.constraint_name AND ccu.table_schema = tc.table_schema
+            WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_name = %s AND ccu.table_name = %s
+            LIMIT 1
+        """, (table_name, referenced))
+        row = await cursor.fetchone()
+        if row is None:
+            raise ValueError(f"No foreign key from {table_name} to {referenced}")
+        _foreign_keys[key] = (row[0], row[1])
+    return _foreign_keys[key]
+
+
+class AsyncPostgresQueryBuilder(PostgresQueryBuilder):
+    """Query builder with the Supabase chaining API and an awaitable ``execute()``."""
+
+    async def execute(self):
+        """Execute the query on a pooled async connection."""
+        async with _cursor(self.pool) as cursor:
+            if self.operation == 'select':
+                for referenced in self._embedded_tables():
+                    await _foreign_key(cursor, self.table_name, referenced)
+
+            query, values = self._statement()
+            results, columns = await _execute(cursor, self.table_name, query, values,
+                                              fetch=self.operation != 'delete')
+        return PostgresResult(results, columns)
+
+
+class AsyncPostgresInsertBuilder(PostgresInsertBuilder):
+    """Insert/upsert builder with an awaitable ``execute()``."""
+
+    # Rows per multi-row INSERT; also kept under PostgreSQL's 65535 bind
+    # parameters per statement for wide rows
+    ROWS_PER_STATEMENT = 1000
+    MAX_BIND_PARAMETERS = 65535
+
+    @staticmethod
+    def _adapt_value(value):
+        """Send dicts and lists of dicts as jsonb, like PostgREST does."""
+        if isinstance(value, dict):
+            return Jsonb(value)
+        if isinstance(value, (list, tuple)) and any(isinstance(v, dict) for v in value):
+            return Jsonb(value)
+        return value
+
+    async def execute(self):
+        """Execute the insert/upsert on a pooled async connection."""
+        if isinstance(self.data, list):
+            return await self._execute_many(self.data)
+
+        query, values = self._statement()
+        async with _cursor(self.pool) as cursor:
+            results, columns = await _execute(cursor, self.table_name, query, values)
+        return PostgresResult(results, columns)
+
+    async def _execute_many(self, rows: list):
+        """Write several rows with multi-row INSERTs per column set and a single commit."""
+        if not rows:
+            return PostgresResult([])
+
+        results = []
+        columns = None
+        async with _cursor(self.pool) as cursor:
+            for keys, group in self._row_groups(rows).items():
+                row_sql = '(' + ', '.join(['%s'] * len(keys)) + ')'
+                chunk_size = max(1, min(self.ROWS_PER_STATEMENT, self.MAX_BIND_PARAMETERS // len(keys)))
+                for start in range(0, len(group), chunk_size):
+                    chunk = group[start:start + chunk_size]
+                    values = [self._adapt_value(row[k]) for row in chunk for k in keys]
+                    query = self._group_statement(keys, ', '.join([row_sql] * len(chunk)))
+                    chunk_results, columns = await _execute(cursor, self.table_name, query, values)
+                    results.extend(chunk_results)
+        return PostgresResult(results, columns)
+
+
+class AsyncPostgresRPCBuilder(PostgresRPCBuilder):
+    """RPC builder with an awaitable ``execute()``."""
+
+    @staticmethod
+    def _adapt_param(value):
+        """Adapt RPC arguments like ``PostgresRPCBuilder``, with psycopg 3's jsonb wrapper."""
+        adapted = PostgresRPCBuilder._adapt_param(value)
+        if adapted is not value and not isinstance(adapted, str):
+            return Jsonb(value)
+        return adapted
+
+    async def execute(self):
+        """Execute the RPC call on a pooled async connection."""
+        query, values = self._statement()
+        async with _cursor(self.pool) as cursor:
+            results, columns = await _execute(cursor, self.function_name, query, values)
+        return PostgresResult(results, columns)
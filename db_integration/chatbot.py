@@ -3,10 +3,11 @@
 from typing import List, Dict, Any, Optional
 import uuid
 from datetime import datetime
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from db_integration.supabase_client import SupabaseManager
+from db_integration.supabase_client import RESOURCE_SUMMARY_COLUMNS, SKILL_SUMMARY_COLUMNS, SupabaseManager
+from db_integration.embedding_cache import get_query_embeddings
 import config
 import json
 
@@ -26,7 +27,7 @@ class SkillsChatbot:
             temperature=0.7,
             api_key=config.OPENAI_API_KEY
         )
-        self.embeddings = OpenAIEmbeddings(api_key=config.OPENAI_API_KEY)
+        self.embeddings = get_query_embeddings()
         self.session_id = session_id or str(uuid.uuid4())
         self.conversation_history = []
         
@@ -63,7 +64,7 @@ Format your responses with:
             text: Text to embed
             
         Returns:
-            Embedding vector
+            Embedding vector (cached by model + normalized text)
         """
         return self.embeddings.embed_query(text)
     
@@ -98,7 +99,7 @@ Format your responses with:
             context['skills'] = result.data if result.data else []
         except:
             # Fallback to text search
-            skills = self.db.get_top_skills(limit=10)
+            skills = self.db.get_top_skills(limit=10, columns=SKILL_SUMMARY_COLUMNS)
             query_lower = query.lower()
             context['skills'] = [
                 s for s in skills 
@@ -119,7 +120,7 @@ Format your responses with:
             context['resources'] = result.data if result.data else []
         except:
             # Fallback to getting all resources
-            all_resources = self.db.get_all_resources(limit=20)
+            all_resources = self.db.get_all_resources(limit=20, columns=RESOURCE_SUMMARY_COLUMNS)
             query_lower = query.lower()
             context['resources'] = [
                 r for r in all_resources
@@ -132,7 +133,7 @@ Format your responses with:
             top_skills = self.db.get_top_skills_for_students(limit=5)
             context['stats'] = {
                 'top_skills': [s.get('skill_name') for s in top_skills[:5]],
-                'total_skills': len(self.db.get_top_skills(limit=100))
+                'total_skills': len(self.db.get_top_skills(limit=100, columns='id'))
             }
         except:
             pass
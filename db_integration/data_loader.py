@@ -1,12 +1,53 @@
 """Data loader to sync GenAI agent results to Supabase."""
 
+import time
+from collections import Counter
+from contextlib import contextmanager
 from typing import Dict, Any, List
 from datetime import date
 from db_integration.supabase_client import SupabaseManager
-from db_integration.skill_extractor import SkillExtractor, calculate_skill_demand
+from db_integration.skill_extractor import (
+    SkillExtractor, SkillMentionMatcher, calculate_weighted_trend_score, skill_demand_score
+)
+from db_integration.response_cache import invalidate_response_cache
 import json
 
 
+def tally_skill_signals(skill_names: List[str], resources: List[Dict[str, Any]],
+                        topics: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Count trend inputs for every skill in one pass over the documents.
+    
+    A skill counts as mentioned when its name occurs (case-insensitively) in a
+    resource's title and description; topics add their GitHub stars when the
+    name is in the title and their LinkedIn posts when it is in the title or
+    description.
+    
+    Args:
+        skill_names: Skills to count
+        resources: Report learning resources
+        topics: Report trending topics
+        
+    Returns:
+        skill name -> {'mentions', 'github_stars', 'linkedin_posts'}
+    """
+    matcher = SkillMentionMatcher(skill_names)
+    tallies = {name: {'mentions': 0, 'github_stars': 0, 'linkedin_posts': 0} for name in skill_names}
+    
+    for resource in resources:
+        for name in matcher.find(f"{resource.get('title', '')} {resource.get('description', '')}"):
+            tallies[name]['mentions'] += 1
+    
+    for topic in topics:
+        metrics = topic.get('metrics', {})
+        in_title = matcher.find(topic.get('title', ''))
+        for name in in_title:
+            tallies[name]['github_stars'] += metrics.get('stars', 0)
+        for name in in_title | matcher.find(topic.get('description', '')):
+            tallies[name]['linkedin_posts'] += metrics.get('estimated_posts', 0)
+    
+    return tallies
+
+
 class DataLoader:
     """Load GenAI agent data into Supabase."""
     
@@ -14,10 +55,19 @@ class DataLoader:
         """Initialize data loader."""
         self.db = SupabaseManager()
         self.skill_extractor = SkillExtractor()
+        self.timings: Dict[str, float] = {}
     
     def load_report(self, report: Dict[str, Any]) -> Dict[str, Any]:
         """Load a complete agent report into Supabase.
         
+        Every table is written with multi-row statements on one connection
+        that commits once at the end, so readers never see a half-loaded
+        report. Writes are best effort: a failed statement is logged and
+        retried row by row, rows that still fail are skipped, and the rest of
+        the load commits. Only an exception that escapes a stage (e.g. a lost
+        connection) rolls the whole load back. Per-stage timings are printed
+        and kept in ``self.timings`` (seconds).
+        
         Args:
             report: Report from GenAIAgentOrchestrator
             
@@ -31,37 +81,87 @@ class DataLoader:
             'skills_linked': 0,
             'trends_created': 0
         }
+        self.timings = {}
+        started = time.perf_counter()
         
         print("\n" + "="*80)
         print("Loading Data to Supabase")
         print("="*80)
         
-        # Load learning resources
-        print(f"\n[1/5] Loading {len(report.get('learning_resources', []))} learning resources...")
         resources = report.get('learning_resources', [])
-        loaded_resources = self.db.bulk_insert_resources(resources)
+        topics = report.get('trending_topics', [])
+        
+        # Extract skills first: the LLM calls must not hold the transaction open
+        print(f"\n[1/6] Extracting skills from {len(resources)} resources...")
+        llm_before = self.skill_extractor.llm_stats()
+        with self._stage('extract'):
+            extracted = list(zip(resources, self.skill_extractor.extract_many(resources)))
+        llm_after = self.skill_extractor.llm_stats()
+        print(f"Extracted {len({s['skill_name'] for _, skills in extracted for s in skills})} unique skills "
+              f"({llm_after['llm_calls'] - llm_before['llm_calls']} LLM calls, "
+              f"{llm_after['cache_hits'] - llm_before['cache_hits']} cached)")
+        
+        # One commit at the end; failed rows are skipped (see _bulk_write),
+        # only an escaping exception rolls the whole load back
+        with self.db.transaction():
+            self._write_report(resources, topics, extracted, stats)
+        
+        # Cached chatbot answers may cite the old catalog
+        invalidate_response_cache()
+        self.timings['total'] = time.perf_counter() - started
+        
+        print("\n" + "="*80)
+        print("Data Loading Complete!")
+        print("Stage timings: " + ", ".join(f"{stage} {seconds * 1000:.0f}ms"
+                                            for stage, seconds in self.timings.items()))
+        print("="*80)
+        
+        return stats
+    
+    @contextmanager
+    def _stage(self, name: str):
+        """Time one loading stage into ``self.timings``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+    
+    def _write_report(self, resources: List[Dict[str, Any]], topics: List[Dict[str, Any]],
+                      extracted: List[tuple], stats: Dict[str, int]):
+        """Write resources, topics, skills, links and trends (run inside ``transaction()``).
+        
+        Args:
+            resources: Report learning resources
+            topics: Report trending topics
+            extracted: (resource, extracted skills) pairs
+            stats: Loading statistics, updated in place
+        """
+        # Load learning resources
+        print(f"\n[2/6] Loading {len(resources)} learning resources...")
+        with self._stage('resources'):
+            loaded_resources = self.db.bulk_insert_resources(resources)
         stats['resources_loaded'] = len(loaded_resources)
         print(f"Loaded {stats['resources_loaded']} resources")
         
         # Load trending topics
-        print(f"\n[2/5] Loading {len(report.get('trending_topics', []))} trending topics...")
-        topics = report.get('trending_topics', [])
-        loaded_topics = self.db.bulk_insert_topics(topics)
+        print(f"\n[3/6] Loading {len(topics)} trending topics...")
+        with self._stage('topics'):
+            loaded_topics = self.db.bulk_insert_topics(topics)
         stats['topics_loaded'] = len(loaded_topics)
         print(f"Loaded {stats['topics_loaded']} topics")
         
-        # Extract and load skills
-        print(f"\n[3/5] Extracting skills from resources...")
+        # Collect skills of the resources that were stored
         all_skills = {}
         resource_skill_links = []
         
-        for resource_data, db_resource in zip(resources, loaded_resources):
+        # Bulk upsert collapses duplicate URLs, so match rows by URL not position
+        loaded_by_url = {r.get('url'): r for r in loaded_resources}
+        for resource_data, skills in extracted:
+            db_resource = loaded_by_url.get(resource_data.get('url'))
             if not db_resource or 'id' not in db_resource:
                 continue
             
-            # Extract skills
-            skills = self.skill_extractor.extract_and_categorize(resource_data)
-            
             for skill in skills:
                 skill_name = skill['skill_name']
                 
@@ -75,101 +175,82 @@ class DataLoader:
                     'skill': skill
                 })
         
-        print(f"Extracted {len(all_skills)} unique skills")
-        
-        # Insert skills into database
-        print(f"\n[4/5] Inserting skills into database...")
-        skill_id_map = {}
-        
-        for skill_name, skill_data in all_skills.items():
-            # Check if skill already exists
-            existing_skill = self.db.get_skill_by_name(skill_name)
+        # One IN (...) lookup for known skills, one multi-row insert for the rest
+        print(f"\n[4/6] Inserting {len(all_skills)} skills into database...")
+        with self._stage('skills'):
+            # Mentions, stars and posts for every skill, used for demand and trends
+            tallies = tally_skill_signals(list(all_skills), resources, topics)
             
-            if existing_skill:
-                skill_id_map[skill_name] = existing_skill['id']
-            else:
-                # Calculate demand score
-                demand_score = calculate_skill_demand(skill_name, resources)
-                
-                # Insert new skill
-                new_skill = {
-                    'skill_name': skill_name,
-                    'category': skill_data['category'],
-                    'difficulty_level': skill_data.get('difficulty_level', 'Intermediate'),
-                    'demand_score': demand_score,
-                    'description': f"Skill in {skill_data['category']}"
-                }
-                
-                inserted = self.db.insert_skill(new_skill)
-                if inserted and 'id' in inserted:
-                    skill_id_map[skill_name] = inserted['id']
-                    stats['skills_extracted'] += 1
+            skill_id_map = {s['skill_name']: s['id']
+                            for s in self.db.get_skills_by_names(list(all_skills))}
+            
+            new_skills = [{
+                'skill_name': skill_name,
+                'category': skill_data['category'],
+                'difficulty_level': skill_data.get('difficulty_level', 'Intermediate'),
+                'demand_score': skill_demand_score(tallies[skill_name]['mentions'], len(resources)),
+                'description': f"Skill in {skill_data['category']}"
+            } for skill_name, skill_data in all_skills.items() if skill_name not in skill_id_map]
+            
+            inserted = self.db.bulk_insert_skills(new_skills)
+            skill_id_map.update({s['skill_name']: s['id'] for s in inserted if 'id' in s})
+            stats['skills_extracted'] = len(inserted)
+            
+            # Names another writer added meanwhile fail to insert; pick up their ids
+            missing = [s['skill_name'] for s in new_skills if s['skill_name'] not in skill_id_map]
+            if missing:
+                skill_id_map.update({s['skill_name']: s['id']
+                                     for s in self.db.get_skills_by_names(missing)})
         
         print(f"Inserted {stats['skills_extracted']} new skills")
         
         # Link resources to skills
-        print(f"\n[5/5] Linking resources to skills...")
-        for link in resource_skill_links:
-            resource_id = link['resource_id']
-            skill_name = link['skill']['skill_name']
-            
-            if skill_name in skill_id_map:
-                skill_id = skill_id_map[skill_name]
-                relevance = int(link['skill'].get('confidence', 0.5) * 10)
-                self.db.link_resource_to_skill(resource_id, skill_id, relevance)
-                stats['skills_linked'] += 1
+        print(f"\n[5/6] Linking resources to skills...")
+        with self._stage('links'):
+            links = []
+            for link in resource_skill_links:
+                resource_id = link['resource_id']
+                skill_name = link['skill']['skill_name']
+                
+                if skill_name in skill_id_map:
+                    skill_id = skill_id_map[skill_name]
+                    relevance = int(link['skill'].get('confidence', 0.5) * 10)
+                    links.append({'resource_id': resource_id, 'skill_id': skill_id, 'relevance': relevance})
+            stats['skills_linked'] = self.db.link_resources_to_skills(links)
         
         print(f"Created {stats['skills_linked']} resource-skill links")
         
         # Create skill trends for today
-        print(f"\n[BONUS] Creating skill trend records...")
-        today = date.today()
-        
-        for skill_name, skill_id in skill_id_map.items():
-            # Count mentions in loaded resources
-            mentions = sum(1 for r in resources 
-                          if skill_name.lower() in f"{r.get('title', '')} {r.get('description', '')}".lower())
+        print(f"\n[6/6] Creating skill trend records...")
+        with self._stage('trends'):
+            today = date.today()
+            trends = {}
+            link_counts = Counter(link['skill']['skill_name'] for link in resource_skill_links)
             
-            # Count GitHub references in topics
-            github_stars = sum(t.get('metrics', {}).get('stars', 0) 
-                             for t in topics 
-                             if skill_name.lower() in t.get('title', '').lower())
-            
-            # Count LinkedIn engagement in topics (Bug Fix #1)
-            linkedin_posts = sum(t.get('metrics', {}).get('estimated_posts', 0) 
-                               for t in topics 
-                               if skill_name.lower() in t.get('title', '').lower() or 
-                                  skill_name.lower() in t.get('description', '').lower())
-            
-            # Calculate weighted trend score (Bug Fix #2)
-            from db_integration.skill_extractor import calculate_weighted_trend_score
-            trend_score = calculate_weighted_trend_score(
-                mention_count=mentions,
-                github_stars=github_stars,
-                linkedin_posts=linkedin_posts,
-                total_resources=len(resources)
-            )
-            
-            trend_data = {
-                'date': today.isoformat(),
-                'mentions': mentions,
-                'resources': len([l for l in resource_skill_links 
-                                 if l['skill']['skill_name'] == skill_name]),
-                'github_stars': github_stars,
-                'linkedin_posts': linkedin_posts,
-                'score': trend_score
-            }
+            for skill_name, skill_id in skill_id_map.items():
+                tally = tallies[skill_name]
+                
+                # Calculate weighted trend score (Bug Fix #2)
+                trend_score = calculate_weighted_trend_score(
+                    mention_count=tally['mentions'],
+                    github_stars=tally['github_stars'],
+                    linkedin_posts=tally['linkedin_posts'],
+                    total_resources=len(resources)
+                )
+                
+                trend_data = {
+                    'date': today.isoformat(),
+                    'mentions': tally['mentions'],
+                    'resources': link_counts[skill_name],
+                    'github_stars': tally['github_stars'],
+                    'linkedin_posts': tally['linkedin_posts'],
+                    'score': trend_score
+                }
+                
+                trends[skill_id] = trend_data
             
-            self.db.insert_skill_trend(skill_id, trend_data)
-            stats['trends_created'] += 1
-        
+            stats['trends_created'] = self.db.insert_skill_trends(trends)
         print(f"Created {stats['trends_created']} trend records")
-        
-        print("\n" + "="*80)
-        print("Data Loading Complete!")
-        print("="*80)
-        
-        return stats
     
     def load_from_json_file(self, filename: str) -> Dict[str, Any]:
         """Load data from a JSON report file.
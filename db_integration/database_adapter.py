@@ -1,113 +1,620 @@
 """Database adapter that supports both Docker PostgreSQL and Supabase."""
 
 import os
-from typing import Optional
+import re
+import time
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from supabase import create_client, Client
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from psycopg2.pool import PoolError
 from dotenv import load_dotenv
 
+from db_integration.query_stats import explain_sql, get_query_stats
+
 load_dotenv()
 
 
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection becomes available within the timeout."""
+
+
+class PostgresConnectionPool:
+    """Thread-safe PostgreSQL connection pool shared by the whole process.
+    
+    Callers block (up to ``timeout`` seconds) when all ``max_size`` connections
+    are checked out, and the pool keeps wait statistics so it can be sized
+    against the API thread pool.
+    
+    Inside ``transaction()`` the calling thread is pinned to one connection:
+    ``connection()`` and ``cursor()`` reuse it and nothing is committed until
+    the block ends.
+    """
+    
+    def __init__(self, min_size: int = 1, max_size: int = 10, timeout: float = 30.0, **connect_kwargs):
+        """Initialize the pool and open ``min_size`` connections.
+        
+        Args:
+            min_size: Connections opened up front and kept idle
+            max_size: Upper bound on open connections
+            timeout: Seconds to wait for a free connection before failing
+            **connect_kwargs: Arguments passed to ``psycopg2.connect``
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.connect_kwargs = connect_kwargs
+        
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        # Connection pinned by transaction() for the current thread
+        self._local = threading.local()
+        
+        # Stats
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        
+        for _ in range(min_size):
+            self._idle.append(self._connect())
+            self._size += 1
+    
+    def _connect(self):
+        """Open a new physical connection."""
+        return psycopg2.connect(**self.connect_kwargs)
+    
+    def getconn(self):
+        """Check out a connection, waiting for one to be returned if the pool is full."""
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        conn = None
+        
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve a slot; connect outside the lock
+                    self._size += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            
+            waited = time.perf_counter() - start
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        
+        if conn is None or conn.closed:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return conn
+    
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool.
+        
+        Args:
+            conn: Connection obtained from ``getconn``
+            discard: Close the connection instead of reusing it
+        """
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                if not conn.closed:
+                    conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+    
+    def in_transaction(self) -> bool:
+        """Whether the calling thread is inside ``transaction()``."""
+        return getattr(self._local, 'conn', None) is not None
+    
+    @contextmanager
+    def transaction(self):
+        """Run every query in the block on one connection with a single commit.
+        
+        Rolls back if the block raises. Nested calls join the outer transaction.
+        """
+        if self.in_transaction():
+            yield self._local.conn
+            return
+        
+        conn = self.getconn()
+        self._local.conn = conn
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as e:
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            raise
+        finally:
+            self._local.conn = None
+            self.putconn(conn, discard=discard)
+    
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a ``with`` block.
+        
+        Inside ``transaction()`` this is the pinned connection (not returned
+        to the pool at the end of the block).
+        """
+        if self.in_transaction():
+            yield self._local.conn
+            return
+        
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # Broken connections are dropped rather than handed to the next caller
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+    
+    @contextmanager
+    def cursor(self, cursor_factory=RealDictCursor):
+        """Yield a cursor on a pooled connection and commit when the block succeeds.
+        
+        Rows are dicts by default; pass ``cursor_factory=None`` for plain tuples.
+        
+        Inside ``transaction()`` the block runs under a savepoint instead: a
+        failed statement is undone on its own (callers that catch the error
+        can carry on) and the commit is left to the transaction.
+        """
+        if self.in_transaction():
+            conn = self._local.conn
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            try:
+                cursor.execute("SAVEPOINT adapter_statement")
+                yield cursor
+                cursor.execute("RELEASE SAVEPOINT adapter_statement")
+            except Exception:
+                if not conn.closed:
+                    try:
+                        cursor.execute("ROLLBACK TO SAVEPOINT adapter_statement")
+                    except psycopg2.Error:
+                        pass
+                raise
+            finally:
+                cursor.close()
+            return
+        
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        pass
+                raise
+            finally:
+                cursor.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get pool usage statistics.
+        
+        Returns:
+            Sizes, current usage and cumulative wait times
+        """
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'total_wait_ms': round(self._total_wait * 1000, 2),
+                'avg_wait_ms': round(self._total_wait * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 2)
+            }
+    
+    def closeall(self):
+        """Close idle connections and stop handing out new ones."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn = self._idle.pop()
+                self._size -= 1
+                if not conn.closed:
+                    conn.close()
+            self._cond.notify_all()
+
+
+# Process-wide shared clients
+_connection_pool: Optional[PostgresConnectionPool] = None
+_supabase_client: Optional[Client] = None
+_clients_lock = threading.Lock()
+
+
+def get_connection_pool() -> PostgresConnectionPool:
+    """Get or create the process-wide PostgreSQL connection pool.
+    
+    Pool size is configured with DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE and
+    DB_POOL_TIMEOUT (seconds).
+    
+    Returns:
+        Shared connection pool
+    """
+    global _connection_pool
+    if _connection_pool is None:
+        with _clients_lock:
+            if _connection_pool is None:
+                db_host = os.getenv('DB_HOST', 'database')
+                db_port = os.getenv('DB_PORT', '5432')
+                db_name = os.getenv('DB_NAME', os.getenv('POSTGRES_DB', 'evolveiq_db'))
+                db_user = os.getenv('DB_USER', os.getenv('POSTGRES_USER', 'evolveiq'))
+                db_password = os.getenv('DB_PASSWORD', os.getenv('POSTGRES_PASSWORD', 'evolveiq_password'))
+                
+                try:
+                    _connection_pool = PostgresConnectionPool(
+                        min_size=int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+                        max_size=int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                        timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+                        host=db_host,
+                        port=db_port,
+                        database=db_name,
+                        user=db_user,
+                        password=db_password
+                    )
+                except Exception as e:
+                    raise ValueError(f"Failed to connect to PostgreSQL: {str(e)}")
+    return _connection_pool
+
+
+def get_supabase_client() -> Client:
+    """Get or create the process-wide Supabase client.
+    
+    Returns:
+        Shared Supabase client
+    """
+    global _supabase_client
+    if _supabase_client is None:
+        with _clients_lock:
+            if _supabase_client is None:
+                supabase_url = os.getenv('SUPABASE_URL')
+                supabase_key = os.getenv('SUPABASE_KEY')
+                
+                if not supabase_url or not supabase_key:
+                    raise ValueError(
+                        "USE_SUPABASE=true but SUPABASE_URL and SUPABASE_KEY must be set"
+                    )
+                
+                _supabase_client = create_client(supabase_url, supabase_key)
+    return _supabase_client
+
+
+def close_connection_pool():
+    """Close the shared connection pool (call on process shutdown)."""
+    global _connection_pool
+    with _clients_lock:
+        if _connection_pool is not None:
+            _connection_pool.closeall()
+            _connection_pool = None
+
+
+# Filter operators accepted by iter_rows, as SQL and as builder method names
+_FILTER_OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def iter_rows_keyset(client, table_name: str, columns: str = '*', key: str = 'id',
+                     page_size: int = 1000, filters: Optional[List[Tuple[str, str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream a table through a Supabase-style client by keyset pagination.
+    
+    Each page is ``WHERE key > last ORDER BY key LIMIT page_size``, so every
+    page is an index range scan and rows past PostgREST's max-rows cap are
+    still reached.
+    
+    Args:
+        client: Supabase client (or anything with the same ``table()`` API)
+        table_name: Table to read
+        columns: Columns to select (``key`` is added if missing)
+        key: Unique, orderable column used as the page cursor
+        page_size: Rows per request
+        filters: Extra ``(column, op, value)`` filters, op in eq/neq/gt/gte/lt/lte
+        
+    Yields:
+        Rows as dicts, ordered by ``key``
+    """
+    if columns != '*' and key not in [c.strip() for c in columns.split(',')]:
+        columns = f"{key}, {columns}"
+    
+    last_key = None
+    while True:
+        query = client.table(table_name).select(columns)
+        for column, op, value in filters or []:
+            query = getattr(query, op)(column, value)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        page = query.order(key).limit(page_size).execute().data or []
+        yield from page
+        if len(page) < page_size:
+            return
+        last_key = page[-1][key]
+
+
 class DatabaseAdapter:
-    """Adapter that works with both Docker PostgreSQL and Supabase."""
+    """Adapter that works with both Docker PostgreSQL and Supabase.
+    
+    Instances are cheap: they share one process-wide connection pool (or
+    Supabase client), and each query checks a connection out only for the
+    duration of its ``execute()``.
+    """
     
     def __init__(self):
         """Initialize database connection."""
         self.use_supabase = os.getenv('USE_SUPABASE', 'false').lower() == 'true'
         self.supabase_client: Optional[Client] = None
-        self.postgres_conn = None
+        self.pool: Optional[PostgresConnectionPool] = None
         
         if self.use_supabase:
             # Use Supabase client
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_KEY')
-            
-            if not supabase_url or not supabase_key:
-                raise ValueError(
-                    "USE_SUPABASE=true but SUPABASE_URL and SUPABASE_KEY must be set"
-                )
-            
-            self.supabase_client = create_client(supabase_url, supabase_key)
+            self.supabase_client = get_supabase_client()
         else:
-            # Use direct PostgreSQL connection
-            db_host = os.getenv('DB_HOST', 'database')
-            db_port = os.getenv('DB_PORT', '5432')
-            db_name = os.getenv('DB_NAME', os.getenv('POSTGRES_DB', 'evolveiq_db'))
-            db_user = os.getenv('DB_USER', os.getenv('POSTGRES_USER', 'evolveiq'))
-            db_password = os.getenv('DB_PASSWORD', os.getenv('POSTGRES_PASSWORD', 'evolveiq_password'))
-            
-            try:
-                self.postgres_conn = psycopg2.connect(
-                    host=db_host,
-                    port=db_port,
-                    database=db_name,
-                    user=db_user,
-                    password=db_password
-                )
-            except Exception as e:
-                raise ValueError(f"Failed to connect to PostgreSQL: {str(e)}")
+            # Use pooled PostgreSQL connections
+            self.pool = get_connection_pool()
     
     def table(self, table_name: str):
         """Get table interface compatible with Supabase client."""
         if self.use_supabase:
             return self.supabase_client.table(table_name)
         else:
-            return PostgresTableAdapter(self.postgres_conn, table_name)
+            return PostgresTableAdapter(self.pool, table_name)
     
     def rpc(self, function_name: str, params: dict = None):
         """Call a PostgreSQL function (RPC) - compatible with Supabase client."""
         if self.use_supabase:
             return self.supabase_client.rpc(function_name, params)
         else:
-            return PostgresRPCBuilder(self.postgres_conn, function_name, params or {})
+            return PostgresRPCBuilder(self.pool, function_name, params or {})
+    
+    @contextmanager
+    def transaction(self):
+        """Group writes into one transaction: commit when the block ends, roll back on error.
+        
+        Usage::
+        
+            with db.client.transaction():
+                db.client.table('a').insert(...).execute()
+                db.client.table('b').upsert(...).execute()
+        
+        With Supabase this is a no-op: PostgREST commits every request on its
+        own, so there is nothing to group.
+        """
+        if self.use_supabase:
+            yield
+            return
+        with self.pool.transaction():
+            yield
+    
+    def iter_rows(self, table_name: str, columns: str = '*', key: str = 'id', page_size: int = 1000,
+                  filters: Optional[List[Tuple[str, str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream every row of a table in pages, using constant memory.
+        
+        PostgreSQL uses a server-side (named) cursor that fetches
+        ``page_size`` rows per round trip while holding one pooled connection;
+        Supabase uses keyset pagination on ``key``.
+        
+        Args:
+            table_name: Table to read
+            columns: Columns to select
+            key: Unique, orderable column rows are ordered by
+            page_size: Rows fetched per round trip
+            filters: Extra ``(column, op, value)`` filters, op in eq/neq/gt/gte/lt/lte
+            
+        Yields:
+            Rows as dicts, ordered by ``key``
+        """
+        if self.use_supabase:
+            yield from iter_rows_keyset(self.supabase_client, table_name, columns, key, page_size, filters)
+            return
+        
+        query = f"SELECT {columns} FROM {table_name}"
+        values = []
+        if filters:
+            query += " WHERE " + " AND ".join(
+                f"{column} {_FILTER_OPERATORS[op]} %s" for column, op, _ in filters
+            )
+            values = [value for _, _, value in filters]
+        query += f" ORDER BY {key}"
+        
+        with self.pool.connection() as conn:
+            # Named cursors live inside a transaction; putconn rolls it back
+            # if the caller stops iterating early. The name is unique so
+            # nested iterations on one pinned connection don't collide
+            cursor = conn.cursor(name=f"iter_{table_name}_{uuid.uuid4().hex}", cursor_factory=RealDictCursor)
+            cursor.itersize = page_size
+            try:
+                cursor.execute(query, values)
+                for row in cursor:
+                    yield dict(row)
+            finally:
+                cursor.close()
+            if not self.pool.in_transaction():
+                conn.commit()
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics (empty when using Supabase)."""
+        return self.pool.stats() if self.pool else {}
     
     def close(self):
-        """Close database connection."""
-        if self.postgres_conn:
-            self.postgres_conn.close()
+        """Release this adapter.
+        
+        Connections belong to the shared pool, so nothing is closed here;
+        use ``close_connection_pool()`` on shutdown.
+        """
+        pass
+
+
+def _execute(cursor, name: str, query: str, values=None, fetch: bool = True,
+             many: bool = False) -> Tuple[list, Optional[List[str]]]:
+    """Run one statement and report it to the query statistics.
+    
+    Args:
+        cursor: Tuple cursor from ``PostgresConnectionPool.cursor(cursor_factory=None)``
+        name: Table or function the statement targets (for the stats)
+        query: SQL with ``%s`` placeholders
+        values: Parameters (a list of row tuples when ``many``)
+        fetch: Return the result rows
+        many: Run through ``execute_values`` (``query`` has one ``VALUES %s``)
+        
+    Returns:
+        (result rows, column names). Rows are empty when not fetching; the
+        columns are read before a plan capture reuses the cursor
+    """
+    stats = get_query_stats()
+    start = time.perf_counter()
+    try:
+        if many:
+            results = execute_values(cursor, query, values, page_size=len(values), fetch=fetch) or []
+        else:
+            cursor.execute(query, values)
+            results = cursor.fetchall() if fetch else []
+    except Exception:
+        if stats:
+            stats.record(name, query, 0, time.perf_counter() - start, error=True)
+        raise
+    columns = _columns(cursor)
+    
+    rows = len(results) if fetch else max(cursor.rowcount, 0)
+    if stats and stats.record(name, query, rows, time.perf_counter() - start) and not many:
+        # ANALYZE re-runs the statement: do it under a savepoint that is always
+        # rolled back, so neither its side effects nor its errors leak out
+        cursor.execute("SAVEPOINT query_explain")
+        try:
+            cursor.execute(explain_sql(query), values)
+            stats.attach_plan(query, "\n".join(row[0] for row in cursor.fetchall()))
+        except psycopg2.Error as e:
+            print(f"Warning: Could not capture query plan: {e}")
+        cursor.execute("ROLLBACK TO SAVEPOINT query_explain")
+    return results, columns
+
+
+def _columns(cursor) -> Optional[List[str]]:
+    """Column names of the last result set (None when it returned no rows)."""
+    return [column[0] for column in cursor.description] if cursor.description else None
 
 
 class PostgresTableAdapter:
     """Adapter to make PostgreSQL queries compatible with Supabase client interface."""
     
-    def __init__(self, conn, table_name: str):
-        self.conn = conn
+    def __init__(self, pool: PostgresConnectionPool, table_name: str):
+        self.pool = pool
         self.table_name = table_name
     
     def select(self, columns: str = '*'):
         """Start a SELECT query."""
-        return PostgresQueryBuilder(self.conn, self.table_name, 'select', columns)
+        return PostgresQueryBuilder(self.pool, self.table_name, 'select', columns)
     
-    def insert(self, data: dict):
-        """Insert data - returns query builder for chaining."""
-        return PostgresInsertBuilder(self.conn, self.table_name, data, 'insert')
+    def insert(self, data):
+        """Insert one row (dict) or many (list of dicts) - returns query builder for chaining."""
+        return PostgresInsertBuilder(self.pool, self.table_name, data, 'insert')
     
-    def upsert(self, data: dict, on_conflict: Optional[str] = None):
-        """Upsert data - returns query builder for chaining."""
-        return PostgresInsertBuilder(self.conn, self.table_name, data, 'upsert', on_conflict)
+    def upsert(self, data, on_conflict: Optional[str] = None):
+        """Upsert one row (dict) or many (list of dicts) - returns query builder for chaining."""
+        return PostgresInsertBuilder(self.pool, self.table_name, data, 'upsert', on_conflict)
     
     def delete(self):
         """Start a DELETE query."""
-        return PostgresQueryBuilder(self.conn, self.table_name, 'delete')
+        return PostgresQueryBuilder(self.pool, self.table_name, 'delete')
     
     def update(self, data: dict):
         """Start an UPDATE query."""
-        return PostgresQueryBuilder(self.conn, self.table_name, 'update', update_data=data)
+        return PostgresQueryBuilder(self.pool, self.table_name, 'update', update_data=data)
+
+
+# PostgREST embedded resource in a select list, e.g. "it_skills(skill_name, category)"
+_EMBED_PATTERN = re.compile(r'(\w+)\(([^()]*)\)')
+
+# (table, referenced table) -> (foreign key column, referenced column)
+_foreign_keys: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+
+def _foreign_key(cursor, table_name: str, referenced: str) -> Tuple[str, str]:
+    """Look up the single-column foreign key from ``table_name`` to ``referenced``."""
+    key = (table_name, referenced)
+    if key not in _foreign_keys:
+        cursor.execute("""
+            SELECT kcu.column_name AS fk_column, ccu.column_name AS ref_column
+            FROM information_schema.table_constraints tc
+            JOIN information_schema.key_column_usage kcu
+              ON kcu.constraint_name = tc.constraint_name AND kcu.table_schema = tc.table_schema
+            JOIN information_schema.constraint_column_usage ccu
+              ON ccu.constraint_name = tc.constraint_name AND ccu.table_schema = tc.table_schema
+            WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_name = %s AND ccu.table_name = %s
+            LIMIT 1
+        """, (table_name, referenced))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"No foreign key from {table_name} to {referenced}")
+        _foreign_keys[key] = (row['fk_column'], row['ref_column'])
+    return _foreign_keys[key]
 
 
 class PostgresQueryBuilder:
     """Query builder for PostgreSQL that mimics Supabase client interface."""
     
-    def __init__(self, conn, table_name: str, operation: str, columns: str = '*', update_data: Optional[dict] = None):
-        self.conn = conn
+    def __init__(self, pool: PostgresConnectionPool, table_name: str, operation: str, columns: str = '*', update_data: Optional[dict] = None):
+        self.pool = pool
         self.table_name = table_name
         self.operation = operation
         self.columns = columns
         self.update_data = update_data
         self.filters = []
         self.limit_val = None
+        self.offset_val = None
         self.order_by = None
     
     def eq(self, column: str, value):
@@ -120,60 +627,128 @@ class PostgresQueryBuilder:
         self.filters.append((column, '!=', value))
         return self
     
+    def gt(self, column: str, value):
+        """Add greater-than filter."""
+        self.filters.append((column, '>', value))
+        return self
+    
+    def gte(self, column: str, value):
+        """Add greater-than-or-equal filter."""
+        self.filters.append((column, '>=', value))
+        return self
+    
+    def lt(self, column: str, value):
+        """Add less-than filter."""
+        self.filters.append((column, '<', value))
+        return self
+    
+    def lte(self, column: str, value):
+        """Add less-than-or-equal filter."""
+        self.filters.append((column, '<=', value))
+        return self
+    
+    def in_(self, column: str, values):
+        """Add membership filter (an empty list matches nothing)."""
+        self.filters.append((column, 'IN', tuple(values)))
+        return self
+    
+    def ilike(self, column: str, pattern: str):
+        """Add case-insensitive pattern filter (``*`` works as ``%``, as in PostgREST)."""
+        self.filters.append((column, 'ILIKE', pattern.replace('*', '%')))
+        return self
+    
     def limit(self, count: int):
         """Set limit."""
         self.limit_val = count
         return self
     
+    def offset(self, count: int):
+        """Skip the first ``count`` rows."""
+        self.offset_val = count
+        return self
+    
+    def range(self, start: int, end: int):
+        """Return rows ``start`` through ``end`` inclusive (zero-based, like Supabase)."""
+        self.offset_val = start
+        self.limit_val = max(0, end - start + 1)
+        return self
+    
     def order(self, column: str, desc: bool = False):
         """Set order by."""
         self.order_by = (column, desc)
         return self
     
     def execute(self):
-        """Execute the query."""
-        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        """Execute the query on a pooled connection."""
+        if self.operation == 'select' and self._embedded_tables():
+            with self.pool.cursor() as cursor:
+                for referenced in self._embedded_tables():
+                    _foreign_key(cursor, self.table_name, referenced)
+        
+        query, values = self._statement()
+        with self.pool.cursor(cursor_factory=None) as cursor:
+            results, columns = _execute(cursor, self.table_name, query, values,
+                                        fetch=self.operation != 'delete')
+        return PostgresResult(results, columns)
+    
+    def _statement(self) -> Tuple[str, list]:
+        """Build the SQL and parameters for this query.
+        
+        Embedded tables in a select list must already have their foreign keys
+        looked up (see ``_foreign_key``).
+        """
+        where_clause = self._build_where()
+        values = self._where_values()
         
         if self.operation == 'select':
-            query = f"SELECT {self.columns} FROM {self.table_name}"
-            where_clause = self._build_where()
+            query = f"SELECT {self._select_list()} FROM {self.table_name}"
             if where_clause:
                 query += f" WHERE {where_clause}"
             if self.order_by:
                 query += f" ORDER BY {self.order_by[0]} {'DESC' if self.order_by[1] else 'ASC'}"
-            if self.limit_val:
-                query += f" LIMIT {self.limit_val}"
-            
-            cursor.execute(query, [f[2] for f in self.filters])
-            results = cursor.fetchall()
-            cursor.close()
-            return PostgresResult(results)
+            if self.limit_val is not None:
+                query += f" LIMIT {int(self.limit_val)}"
+            if self.offset_val:
+                query += f" OFFSET {int(self.offset_val)}"
+            return query, values
         
         elif self.operation == 'delete':
             query = f"DELETE FROM {self.table_name}"
-            where_clause = self._build_where()
             if where_clause:
                 query += f" WHERE {where_clause}"
-            cursor.execute(query, [f[2] for f in self.filters])
-            self.conn.commit()
-            cursor.close()
-            return PostgresResult([])
+            return query, values
         
         elif self.operation == 'update':
             if not self.update_data:
                 raise ValueError("Update data required for update operation")
             set_clause = ', '.join([f"{k} = %s" for k in self.update_data.keys()])
             query = f"UPDATE {self.table_name} SET {set_clause}"
-            where_clause = self._build_where()
             if where_clause:
                 query += f" WHERE {where_clause}"
             query += " RETURNING *"
-            values = list(self.update_data.values()) + [f[2] for f in self.filters]
-            cursor.execute(query, values)
-            self.conn.commit()
-            results = cursor.fetchall()
-            cursor.close()
-            return PostgresResult(results)
+            return query, list(self.update_data.values()) + values
+        
+        raise ValueError(f"Unsupported operation: {self.operation}")
+    
+    def _embedded_tables(self) -> List[str]:
+        """Tables embedded in the select list (PostgREST ``table(columns)`` syntax)."""
+        if '(' not in self.columns:
+            return []
+        return [match.group(1) for match in _EMBED_PATTERN.finditer(self.columns)]
+    
+    def _select_list(self) -> str:
+        """Expand PostgREST many-to-one embeds into correlated JSON subqueries."""
+        if '(' not in self.columns:
+            return self.columns
+        
+        def expand(match):
+            referenced, columns = match.group(1), match.group(2).strip() or '*'
+            fk_column, ref_column = _foreign_keys[(self.table_name, referenced)]
+            return (f"(SELECT row_to_json(embedded) FROM (SELECT {columns} FROM {referenced} "
+                    f"WHERE {referenced}.{ref_column} = {self.table_name}.{fk_column}) embedded) "
+                    f"AS {referenced}")
+        
+        return _EMBED_PATTERN.sub(expand, self.columns)
     
     def _build_where(self) -> str:
         """Build WHERE clause from filters."""
@@ -181,79 +756,219 @@ class PostgresQueryBuilder:
             return ""
         conditions = []
         for i, (col, op, val) in enumerate(self.filters):
-            conditions.append(f"{col} {op} %s")
+            if op == 'IN':
+                # "IN ()" is a syntax error; an empty list matches nothing
+                conditions.append(f"{col} IN ({', '.join(['%s'] * len(val))})" if val else "FALSE")
+            else:
+                conditions.append(f"{col} {op} %s")
         return " AND ".join(conditions)
+    
+    def _where_values(self) -> list:
+        """Parameters for ``_build_where`` (IN lists are expanded one per placeholder)."""
+        values = []
+        for col, op, val in self.filters:
+            if op == 'IN':
+                values.extend(val)
+            else:
+                values.append(val)
+        return values
 
 
 class PostgresInsertBuilder:
-    """Builder for insert/upsert operations that mimics Supabase chaining."""
+    """Builder for insert/upsert operations that mimics Supabase chaining.
+    
+    ``data`` may be one row (dict) or a list of rows; a list is written with
+    one multi-row statement per distinct column set, all in one transaction.
+    """
     
-    def __init__(self, conn, table_name: str, data: dict, operation: str, on_conflict: Optional[str] = None):
-        self.conn = conn
+    def __init__(self, pool: PostgresConnectionPool, table_name: str, data, operation: str, on_conflict: Optional[str] = None):
+        self.pool = pool
         self.table_name = table_name
         self.data = data
         self.operation = operation
         self.on_conflict = on_conflict
     
+    @staticmethod
+    def _adapt_value(value):
+        """Send dicts and lists of dicts as jsonb, like PostgREST does."""
+        if isinstance(value, dict):
+            return Json(value)
+        if isinstance(value, (list, tuple)) and any(isinstance(v, dict) for v in value):
+            return Json(value)
+        return value
+    
     def execute(self):
-        """Execute the insert/upsert."""
-        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        """Execute the insert/upsert on a pooled connection."""
+        if isinstance(self.data, list):
+            return self._execute_many(self.data)
+        
+        query, values = self._statement()
+        with self.pool.cursor(cursor_factory=None) as cursor:
+            results, columns = _execute(cursor, self.table_name, query, values)
+        return PostgresResult(results, columns)
+    
+    def _statement(self) -> Tuple[str, list]:
+        """SQL and parameters for a single-row write."""
         columns = ', '.join(self.data.keys())
         placeholders = ', '.join(['%s'] * len(self.data))
-        values = list(self.data.values())
+        values = [self._adapt_value(v) for v in self.data.values()]
         
         if self.operation == 'insert':
             query = f"INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders}) RETURNING *"
-            cursor.execute(query, values)
         else:  # upsert
-            # Determine conflict column - use on_conflict parameter or default to 'id' or 'url'
-            conflict_col = self.on_conflict or ('url' if 'url' in self.data else 'id')
-            update_clause = ', '.join([f"{k} = EXCLUDED.{k}" for k in self.data.keys() if k != conflict_col])
             query = f"""
                 INSERT INTO {self.table_name} ({columns}) 
                 VALUES ({placeholders})
-                ON CONFLICT ({conflict_col}) DO UPDATE SET {update_clause}
+                {self._conflict_clause(list(self.data.keys()))}
                 RETURNING *
             """
-            cursor.execute(query, values)
+        return query, values
+    
+    def _conflict_columns(self, keys) -> list:
+        # Determine conflict column - use on_conflict parameter or default to 'id' or 'url'
+        conflict = self.on_conflict or ('url' if 'url' in keys else 'id')
+        return [c.strip() for c in conflict.split(',')]
+    
+    def _conflict_clause(self, keys) -> str:
+        conflict_cols = self._conflict_columns(keys)
+        update_clause = ', '.join([f"{k} = EXCLUDED.{k}" for k in keys if k not in conflict_cols])
+        if not update_clause:
+            return f"ON CONFLICT ({', '.join(conflict_cols)}) DO NOTHING"
+        return f"ON CONFLICT ({', '.join(conflict_cols)}) DO UPDATE SET {update_clause}"
+    
+    def _row_groups(self, rows: list) -> Dict[tuple, list]:
+        """Group rows by column set (first-seen order), deduplicating upserts first.
+        
+        One statement cannot update the same row twice, so upsert rows with
+        equal conflict values keep only the last occurrence. Rows with a
+        missing or NULL conflict value never conflict and all pass through.
+        """
+        if self.operation == 'upsert':
+            deduped = []
+            positions: Dict[tuple, int] = {}
+            for row in rows:
+                conflict_cols = self._conflict_columns(row.keys())
+                conflict_values = tuple(row.get(c) for c in conflict_cols)
+                if any(v is None for v in conflict_values):
+                    deduped.append(row)
+                    continue
+                key = (tuple(conflict_cols), conflict_values)
+                if key in positions:
+                    deduped[positions[key]] = row
+                else:
+                    positions[key] = len(deduped)
+                    deduped.append(row)
+            rows = deduped
         
-        self.conn.commit()
-        results = cursor.fetchall()
-        cursor.close()
-        return PostgresResult(results)
+        groups: Dict[tuple, list] = {}
+        for row in rows:
+            groups.setdefault(tuple(row.keys()), []).append(row)
+        return groups
+    
+    def _group_statement(self, keys: tuple, values_sql: str = '%s') -> str:
+        """Multi-row INSERT for one column set; ``values_sql`` stands in for the row list."""
+        conflict_clause = self._conflict_clause(list(keys)) if self.operation == 'upsert' else ""
+        return f"INSERT INTO {self.table_name} ({', '.join(keys)}) VALUES {values_sql} {conflict_clause} RETURNING *"
+    
+    def _execute_many(self, rows: list):
+        """Write several rows with multi-row INSERTs and a single commit.
+        
+        Rows are grouped by column set (in first-seen order) so each group is
+        one ``INSERT ... VALUES (...), (...)`` statement; returned rows follow
+        the group order.
+        """
+        if not rows:
+            return PostgresResult([])
+        
+        results = []
+        columns = None
+        with self.pool.cursor(cursor_factory=None) as cursor:
+            for keys, group in self._row_groups(rows).items():
+                values = [tuple(self._adapt_value(row[k]) for k in keys) for row in group]
+                # RETURNING * gives every group the same columns
+                group_results, columns = _execute(cursor, self.table_name, self._group_statement(keys),
+                                                  values, many=True)
+                results.extend(group_results)
+        return PostgresResult(results, columns)
 
 
 class PostgresRPCBuilder:
     """Builder for RPC/function calls that mimics Supabase client interface."""
     
-    def __init__(self, conn, function_name: str, params: dict):
-        self.conn = conn
+    def __init__(self, pool: PostgresConnectionPool, function_name: str, params: dict):
+        self.pool = pool
         self.function_name = function_name
         self.params = params
     
-    def execute(self):
-        """Execute the RPC call."""
-        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+    @staticmethod
+    def _adapt_param(value):
+        """Adapt RPC arguments the way PostgREST passes them.
         
-        # Build function call with named parameters
+        Dicts and lists of lists/dicts (e.g. several embeddings) become jsonb.
+        Flat float lists (an embedding) are sent as an untyped '[...]' literal
+        so Postgres resolves them to ``vector``; a numeric[] array has no
+        implicit cast to vector and the function lookup fails.
+        """
+        if isinstance(value, dict):
+            return Json(value)
+        if isinstance(value, (list, tuple)):
+            if any(isinstance(v, (list, tuple, dict)) for v in value):
+                return Json(value)
+            if value and all(isinstance(v, (int, float)) for v in value) and any(isinstance(v, float) for v in value):
+                return '[' + ','.join(repr(float(v)) for v in value) + ']'
+        return value
+    
+    def execute(self):
+        """Execute the RPC call on a pooled connection."""
+        query, values = self._statement()
+        with self.pool.cursor(cursor_factory=None) as cursor:
+            results, columns = _execute(cursor, self.function_name, query, values)
+        return PostgresResult(results, columns)
+    
+    def _statement(self) -> Tuple[str, list]:
+        """SQL and parameters for the function call."""
         # PostgreSQL functions use named parameters: function_name(param1 => value1, param2 => value2)
-        if self.params:
-            param_parts = [f"{k} => %s" for k in self.params.keys()]
-            param_list = ', '.join(param_parts)
-            query = f"SELECT * FROM {self.function_name}({param_list})"
-            cursor.execute(query, list(self.params.values()))
-        else:
-            query = f"SELECT * FROM {self.function_name}()"
-            cursor.execute(query)
-        
-        results = cursor.fetchall()
-        cursor.close()
-        return PostgresResult(results)
+        param_list = ', '.join(f"{k} => %s" for k in self.params.keys())
+        query = f"SELECT * FROM {self.function_name}({param_list})"
+        return query, [self._adapt_param(v) for v in self.params.values()]
 
 
 class PostgresResult:
-    """Result wrapper compatible with Supabase client response."""
+    """Result wrapper compatible with Supabase client response.
     
-    def __init__(self, data):
-        self.data = [dict(row) for row in data] if data else []
-
+    Rows are kept as the tuples the driver returned plus one shared list of
+    column names; ``data`` turns them into dicts only when first accessed.
+    """
+    
+    __slots__ = ('rows', 'columns', '_data')
+    
+    def __init__(self, rows=None, columns: Optional[List[str]] = None):
+        """Wrap result rows.
+        
+        Args:
+            rows: Tuples in ``columns`` order, or mappings when ``columns`` is None
+            columns: Column names shared by every row
+        """
+        if columns is None:
+            self._data = [dict(row) for row in rows] if rows else []
+            self.columns = list(self._data[0].keys()) if self._data else []
+            self.rows = None
+        else:
+            self._data = None
+            self.columns = columns
+            self.rows = rows or []
+    
+    @property
+    def data(self) -> List[Dict[str, Any]]:
+        """Rows as dicts (built once, on first access)."""
+        if self._data is None:
+            columns = self.columns
+            self._data = [dict(zip(columns, row)) for row in self.rows]
+        return self._data
+    
+    def column(self, name: str) -> list:
+        """Values of one column, without building the row dicts."""
+        if self._data is not None:
+            return [row.get(name) for row in self._data]
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
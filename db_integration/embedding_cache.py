@@ -0,0 +1,238 @@
+"""Shared cache for text embeddings used by semantic search."""
+
+import hashlib
+import threading
+from array import array
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+import config
+from db_integration.local_cache import LRUCache, SQLiteStore
+
+
+DEFAULT_EMBEDDINGS_MODEL = "text-embedding-3-small"
+
+
+def get_embeddings_model() -> str:
+    """Embedding model from admin settings (``AIModelConfig.embeddings_model``).
+    
+    Stored and query embeddings must come from the same model, so both paths
+    resolve it here.
+    """
+    try:
+        from config_manager import get_config_manager
+        return get_config_manager().get_ai_model_config().embeddings_model or DEFAULT_EMBEDDINGS_MODEL
+    except Exception as e:
+        print(f"Warning: Could not read embeddings model setting ({e}), using {DEFAULT_EMBEDDINGS_MODEL}")
+        return DEFAULT_EMBEDDINGS_MODEL
+
+
+def get_embedding_dimensions(model: Optional[str] = None) -> Optional[int]:
+    """Configured reduced dimension (EMBEDDING_DIMENSIONS), or None for the model default.
+    
+    Only text-embedding-3 models accept a ``dimensions`` parameter; for other
+    models the setting is ignored.
+    """
+    model = model or get_embeddings_model()
+    if not config.EMBEDDING_DIMENSIONS or not model.startswith('text-embedding-3'):
+        return None
+    return config.EMBEDDING_DIMENSIONS
+
+
+def embedding_label(model: Optional[str] = None) -> str:
+    """Identify the vector space: model name plus reduced dimension if any.
+    
+    Stored with each embedding row and used in cache keys, so changing either
+    the model or EMBEDDING_DIMENSIONS invalidates old vectors.
+    """
+    model = model or get_embeddings_model()
+    dimensions = get_embedding_dimensions(model)
+    return f"{model}@{dimensions}" if dimensions else model
+
+
+def create_embeddings_client(model: Optional[str] = None) -> OpenAIEmbeddings:
+    """Create an OpenAI embeddings client for ``model`` (default: configured model)."""
+    model = model or get_embeddings_model()
+    return OpenAIEmbeddings(model=model, dimensions=get_embedding_dimensions(model),
+                            api_key=config.OPENAI_API_KEY)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: trim, collapse whitespace, casefold."""
+    return " ".join(text.split()).casefold()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that memoizes vectors by model + normalized text.
+
+    Lookups go to a bounded in-memory LRU first, then to an optional SQLite
+    store that survives restarts; only misses reach the embedding API.
+    """
+
+    def __init__(self, embeddings: Optional[Embeddings] = None,
+                 max_size: int = 2048, store_path: Optional[str] = None):
+        """Initialize the cache.
+
+        Args:
+            embeddings: Underlying embeddings client (defaults to the configured model)
+            max_size: Maximum number of vectors held in memory
+            store_path: Optional SQLite file for the on-disk tier
+        """
+        self.embeddings = embeddings or create_embeddings_client()
+        model = getattr(self.embeddings, 'model', type(self.embeddings).__name__)
+        dimensions = getattr(self.embeddings, 'dimensions', None)
+        self.model = f"{model}@{dimensions}" if dimensions else model
+        self.memory = LRUCache(max_size=max_size)
+        self.store = SQLiteStore(store_path, table='embeddings') if store_path else None
+
+        self._stats_lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model}\n{normalize_text(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, memory_hits: int = 0, disk_hits: int = 0, misses: int = 0):
+        with self._stats_lock:
+            self._memory_hits += memory_hits
+            self._disk_hits += disk_hits
+            self._misses += misses
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        """Return a cached vector from memory or disk, promoting disk hits."""
+        vector = self.memory.get(key)
+        if vector is not None:
+            self._count(memory_hits=1)
+            return vector
+
+        if self.store is not None:
+            try:
+                blob = self.store.get(key)
+            except Exception as e:
+                print(f"Warning: Embedding cache read failed: {e}")
+                blob = None
+            if blob is not None:
+                vector = array('d', blob).tolist()
+                self.memory.put(key, vector)
+                self._count(disk_hits=1)
+                return vector
+
+        self._count(misses=1)
+        return None
+
+    def _store(self, key: str, vector: List[float]):
+        self.memory.put(key, vector)
+        if self.store is not None:
+            try:
+                self.store.put(key, array('d', vector).tobytes())
+            except Exception as e:
+                print(f"Warning: Embedding cache write failed: {e}")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query, using the cache when possible."""
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async variant of ``embed_query``."""
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self._store(key, vector)
+        return vector
+
+    def _split_cached(self, texts: List[str]):
+        """Resolve cached vectors; return results, keys, and unique missing texts by key."""
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, str] = {}
+        for i, (key, text) in enumerate(zip(keys, texts)):
+            if key in missing:
+                continue
+            vector = self._lookup(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                results[i] = vector
+        return results, keys, missing
+
+    def _merge(self, results, keys, missing: Dict[str, str], vectors: List[List[float]]):
+        fresh = dict(zip(missing.keys(), vectors))
+        for key, vector in fresh.items():
+            self._store(key, vector)
+        return [vector if vector is not None else fresh[key]
+                for vector, key in zip(results, keys)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, sending only cache misses (deduplicated) in one call."""
+        results, keys, missing = self._split_cached(texts)
+        vectors = self.embeddings.embed_documents(list(missing.values())) if missing else []
+        return self._merge(results, keys, missing, vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of ``embed_documents``."""
+        results, keys, missing = self._split_cached(texts)
+        vectors = await self.embeddings.aembed_documents(list(missing.values())) if missing else []
+        return self._merge(results, keys, missing, vectors)
+
+    def clear(self):
+        """Drop all cached vectors from both tiers."""
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for both tiers."""
+        with self._stats_lock:
+            memory_hits = self._memory_hits
+            disk_hits = self._disk_hits
+            misses = self._misses
+        lookups = memory_hits + disk_hits + misses
+        return {
+            'model': self.model,
+            'size': len(self.memory),
+            'max_size': self.memory.max_size,
+            'disk_enabled': self.store is not None,
+            'memory_hits': memory_hits,
+            'disk_hits': disk_hits,
+            'misses': misses,
+            'hit_rate': round((memory_hits + disk_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+# Shared query-embedding cache (one per process)
+_query_embeddings: Optional[CachedEmbeddings] = None
+_query_embeddings_lock = threading.Lock()
+
+
+def get_query_embeddings() -> CachedEmbeddings:
+    """Get or create the process-wide cached query embedder.
+
+    Configured via config.EMBEDDING_CACHE_SIZE (in-memory entries) and
+    EMBEDDING_CACHE_PATH (SQLite file; empty disables the disk tier).
+
+    Returns:
+        Shared CachedEmbeddings
+    """
+    global _query_embeddings
+    model = get_embeddings_model()
+    label = embedding_label(model)
+    if _query_embeddings is None or _query_embeddings.model != label:
+        with _query_embeddings_lock:
+            if _query_embeddings is None or _query_embeddings.model != label:
+                # Built per model/dimension: switching must not reuse old vectors
+                _query_embeddings = CachedEmbeddings(
+                    create_embeddings_client(model),
+                    max_size=config.EMBEDDING_CACHE_SIZE,
+                    store_path=config.EMBEDDING_CACHE_PATH or None
+                )
+    return _query_embeddings
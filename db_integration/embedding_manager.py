@@ -1,98 +1,234 @@
 """Embedding manager for generating and storing vector embeddings."""
 
-from typing import List, Dict, Any
-from langchain_openai import OpenAIEmbeddings
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+import hashlib
 from db_integration.supabase_client import SupabaseManager
+from db_integration.embedding_cache import get_query_embeddings, create_embeddings_client, embedding_label
+from db_integration.token_counter import count_tokens
 import config
 
 
+def content_hash(text: str) -> str:
+    """Hash of the exact text that is embedded (stored to detect changes)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ThroughputReport:
+    """Thread-safe progress and throughput (rows/s, tokens/s) for batch jobs."""
+    
+    def __init__(self, label: str, total: Optional[int] = None):
+        self.label = label
+        self.total = total
+        self.rows = 0
+        self.tokens = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def _line(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        done = f"{self.rows}/{self.total}" if self.total is not None else str(self.rows)
+        return (f"{done} {self.label} in {elapsed:.1f}s "
+                f"({self.rows / elapsed:.1f} rows/s, {self.tokens / elapsed:.0f} tokens/s)")
+    
+    def add(self, rows: int, tokens: int):
+        """Record a finished batch and print progress."""
+        with self._lock:
+            self.rows += rows
+            self.tokens += tokens
+            print(f"  Processed {self._line()}")
+    
+    def finish(self):
+        """Print the final throughput summary."""
+        with self._lock:
+            print(f"  Done: {self._line()}, {self.tokens} tokens")
+
+
 class EmbeddingManager:
     """Manage vector embeddings for resources and skills."""
     
     def __init__(self):
         """Initialize embedding manager."""
         self.db = SupabaseManager()
-        self.embeddings = OpenAIEmbeddings(api_key=config.OPENAI_API_KEY)
+        # Model comes from AIModelConfig.embeddings_model; stored with each row
+        # (with the EMBEDDING_DIMENSIONS suffix when reduced, e.g. "...-small@512")
+        self.embeddings = create_embeddings_client()
+        self.model = embedding_label(self.embeddings.model)
+        # Per-table counts from the last run (embedded, new, stale, skipped, failed)
+        self.last_run: Dict[str, Dict[str, int]] = {}
+        # Search queries repeat; share the process-wide query cache
+        self.query_embeddings = get_query_embeddings()
     
-    def generate_resource_embeddings(self) -> int:
-        """Generate embeddings for all learning resources.
+    def generate_resource_embeddings(self, force: bool = False) -> int:
+        """Generate embeddings for new or changed learning resources.
         
+        Args:
+            force: Re-embed every row even if its text and model are unchanged
+            
         Returns:
             Number of embeddings created
         """
         print("\nGenerating embeddings for learning resources...")
         
-        # Get all resources
-        resources = self.db.get_all_resources(limit=1000)
-        count = 0
-        
-        for resource in resources:
-            try:
+        # Stream every resource (no row cap, one page in memory at a time)
+        def rows():
+            for resource in self.db.iter_rows('learning_resources', 'id, title, description, category'):
                 # Create text to embed
                 text = f"{resource.get('title', '')} {resource.get('description', '')} {resource.get('category', '')}"
-                
-                # Generate embedding
-                embedding = self.embeddings.embed_query(text)
-                
-                # Store in database
-                self.db.client.table('resource_embeddings').upsert({
+                yield {
                     'resource_id': resource['id'],
-                    'embedding': embedding,
-                    'content_text': text[:500]  # Store first 500 chars
-                }, on_conflict='resource_id').execute()
-                
-                count += 1
-                if count % 10 == 0:
-                    print(f"  Processed {count}/{len(resources)} resources...")
-            
-            except Exception as e:
-                print(f"  Error processing resource {resource.get('id')}: {e}")
-                continue
+                    'content_text': text[:500],  # Store first 500 chars
+                    '_text': text
+                }
         
+        count = self._embed_changed(rows(), 'resource_embeddings', 'resource_id', 'resources', force)
         print(f"[OK] Created {count} resource embeddings")
         return count
     
-    def generate_skill_embeddings(self) -> int:
-        """Generate embeddings for all skills.
+    def generate_skill_embeddings(self, force: bool = False) -> int:
+        """Generate embeddings for new or changed skills.
         
+        Args:
+            force: Re-embed every row even if its text and model are unchanged
+            
         Returns:
             Number of embeddings created
         """
         print("\nGenerating embeddings for skills...")
         
-        # Get all skills
-        skills = self.db.get_top_skills(limit=1000)
-        count = 0
-        
-        for skill in skills:
-            try:
+        # Stream every skill (no row cap, one page in memory at a time)
+        def rows():
+            for skill in self.db.iter_rows('it_skills', 'id, skill_name, description, category, difficulty_level'):
                 # Create text to embed
                 text = f"{skill.get('skill_name', '')} {skill.get('description', '')} {skill.get('category', '')} {skill.get('difficulty_level', '')}"
-                
-                # Generate embedding
-                embedding = self.embeddings.embed_query(text)
-                
-                # Store in database
-                self.db.client.table('skill_embeddings').upsert({
+                yield {
                     'skill_id': skill['id'],
-                    'embedding': embedding,
-                    'description_text': text[:500]
-                }, on_conflict='skill_id').execute()
-                
-                count += 1
-                if count % 5 == 0:
-                    print(f"  Processed {count}/{len(skills)} skills...")
-            
-            except Exception as e:
-                print(f"  Error processing skill {skill.get('id')}: {e}")
-                continue
+                    'description_text': text[:500],
+                    '_text': text
+                }
         
+        count = self._embed_changed(rows(), 'skill_embeddings', 'skill_id', 'skills', force)
         print(f"[OK] Created {count} skill embeddings")
         return count
     
-    def generate_all_embeddings(self) -> Dict[str, int]:
-        """Generate all embeddings.
+    def _existing_hashes(self, table: str, key: str) -> Dict[str, tuple]:
+        """Map catalog id -> (content_hash, embedding_model) for stored embeddings."""
+        return {
+            str(row[key]): (row.get('content_hash'), row.get('embedding_model'))
+            for row in self.db.iter_rows(table, f"{key}, content_hash, embedding_model", key=key)
+        }
+    
+    def _embed_changed(self, rows: Iterable[Dict[str, Any]], table: str, key: str, label: str,
+                       force: bool = False) -> int:
+        """Embed only rows whose text hash or model differs from what is stored.
+        
+        A row is stale when its stored ``content_hash`` no longer matches the
+        current text or its ``embedding_model`` differs from the configured
+        model (so changing the model re-embeds everything).
         
+        Returns:
+            Number of rows embedded
+        """
+        existing = self._existing_hashes(table, key)
+        counts = {'embedded': 0, 'new': 0, 'stale': 0, 'skipped': 0, 'failed': 0}
+        
+        def changed() -> Iterator[Dict[str, Any]]:
+            for row in rows:
+                row['content_hash'] = content_hash(row['_text'])
+                row['embedding_model'] = self.model
+                stored = existing.get(str(row[key]))
+                if stored is None:
+                    counts['new'] += 1
+                    yield row
+                elif force or stored != (row['content_hash'], self.model):
+                    counts['stale'] += 1
+                    yield row
+                else:
+                    counts['skipped'] += 1
+        
+        # Rows are classified as they stream in, so counts are final afterwards
+        counts['embedded'] = self._embed_and_upsert(changed(), table, key, label)
+        counts['failed'] = counts['new'] + counts['stale'] - counts['embedded']
+        print(f"  {counts['new']} new, {counts['stale']} stale, {counts['skipped']} unchanged (skipped)")
+        self.last_run[label] = counts
+        return counts['embedded']
+    
+    def _embed_and_upsert(self, rows: Iterable[Dict[str, Any]], table: str, key: str, label: str) -> int:
+        """Embed rows in batches and upsert each batch with one multi-row statement.
+        
+        Batches are cut from the stream as it is read, embedded with one
+        ``embed_documents`` call each and run with bounded concurrency
+        (EMBEDDING_BATCH_SIZE / EMBEDDING_CONCURRENCY); at most two batches
+        per worker are in memory at once. A failed batch is reported and skipped.
+        
+        Args:
+            rows: Rows to store (any iterable); ``_text`` holds the text to embed
+            table: Embedding table
+            key: Conflict column (one embedding per catalog row)
+            label: Name used in progress output
+            
+        Returns:
+            Number of rows stored
+        """
+        batch_size = max(1, config.EMBEDDING_BATCH_SIZE)
+        workers = max(1, config.EMBEDDING_CONCURRENCY)
+        progress = ThroughputReport(label)
+        
+        def process(batch: List[Dict[str, Any]]) -> int:
+            texts = [row['_text'] for row in batch]
+            vectors = self.embeddings.embed_documents(texts)
+            records = []
+            for row, vector in zip(batch, vectors):
+                record = {k: v for k, v in row.items() if k != '_text'}
+                record['embedding'] = vector
+                records.append(record)
+            self.db.client.table(table).upsert(records, on_conflict=key).execute()
+            progress.add(len(batch), count_tokens(texts))
+            return len(batch)
+        
+        count = 0
+        submitted = 0
+        pending = {}
+        
+        def collect(return_when):
+            nonlocal count
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    count += future.result()
+                except Exception as e:
+                    print(f"  Error processing {label} batch starting at {batch[0].get(key)}: {e}")
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) < batch_size:
+                    continue
+                if len(pending) >= 2 * workers:
+                    collect(FIRST_COMPLETED)
+                pending[pool.submit(process, batch)] = batch
+                submitted += 1
+                batch = []
+            if batch:
+                pending[pool.submit(process, batch)] = batch
+                submitted += 1
+            if pending:
+                collect(ALL_COMPLETED)
+        
+        if submitted:
+            progress.finish()
+        return count
+    
+    def generate_all_embeddings(self, force: bool = False) -> Dict[str, int]:
+        """Generate embeddings for all new or changed resources and skills.
+        
+        Args:
+            force: Re-embed every row even if unchanged
+            
         Returns:
             Count of embeddings created
         """
@@ -106,13 +242,16 @@ class EmbeddingManager:
         }
         
         try:
-            stats['resources'] = self.generate_resource_embeddings()
-            stats['skills'] = self.generate_skill_embeddings()
+            stats['resources'] = self.generate_resource_embeddings(force)
+            stats['skills'] = self.generate_skill_embeddings(force)
             
             print("\n" + "="*80)
-            print(f"[OK] Embedding Generation Complete!")
-            print(f"  - Resource embeddings: {stats['resources']}")
-            print(f"  - Skill embeddings: {stats['skills']}")
+            print(f"[OK] Embedding Generation Complete! (model: {self.model})")
+            for label in ('resources', 'skills'):
+                counts = self.last_run.get(label, {})
+                print(f"  - {label.capitalize()}: {counts.get('embedded', 0)} embedded "
+                      f"({counts.get('stale', 0)} stale), {counts.get('skipped', 0)} skipped, "
+                      f"{counts.get('failed', 0)} failed")
             print("="*80)
         
         except Exception as e:
@@ -133,19 +272,10 @@ class EmbeddingManager:
             List of similar resources
         """
         # Generate query embedding
-        query_embedding = self.embeddings.embed_query(query)
+        query_embedding = self.query_embeddings.embed_query(query)
         
         try:
-            result = self.db.client.rpc(
-                'search_similar_resources',
-                {
-                    'query_embedding': query_embedding,
-                    'match_threshold': 0.6,
-                    'match_count': limit
-                }
-            ).execute()
-            
-            return result.data if result.data else []
+            return self.db.search_similar_resources(query_embedding, match_threshold=0.6, match_count=limit)
         except Exception as e:
             print(f"Error searching resources: {e}")
             return []
@@ -161,19 +291,10 @@ class EmbeddingManager:
             List of similar skills
         """
         # Generate query embedding
-        query_embedding = self.embeddings.embed_query(query)
+        query_embedding = self.query_embeddings.embed_query(query)
         
         try:
-            result = self.db.client.rpc(
-                'search_similar_skills',
-                {
-                    'query_embedding': query_embedding,
-                    'match_threshold': 0.6,
-                    'match_count': limit
-                }
-            ).execute()
-            
-            return result.data if result.data else []
+            return self.db.search_similar_skills(query_embedding, match_threshold=0.6, match_count=limit)
         except Exception as e:
             print(f"Error searching skills: {e}")
             return []
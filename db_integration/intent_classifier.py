@@ -0,0 +1,307 @@
+"""Local query intent classifier for the agentic RAG chatbot.
+
+Replaces the per-chat ``analyze_query`` LLM call for the common case: keyword
+rules plus nearest-centroid over cached embeddings of example queries. Only
+low-confidence queries fall back to the LLM.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import config
+from db_integration.embedding_cache import get_query_embeddings
+from db_integration.skill_extractor import IT_SKILLS_TAXONOMY
+
+
+# Keyword rules: each matching pattern adds one vote for its intent
+INTENT_KEYWORDS = {
+    'skill_discovery': [
+        r'\bwhat (?:skills?|should i learn|to learn)\b', r'\bwhich skills?\b',
+        r'\blearn next\b', r'\bstart (?:with|learning)\b', r'\bskills? (?:for|to|should)\b',
+        r'\bfocus on\b', r'\bwhat should (?:a|an|i)\b', r'\bget started\b'
+    ],
+    'resource_finding': [
+        r'\bresources?\b', r'\btutorials?\b', r'\bcourses?\b', r'\bbooks?\b',
+        r'\bdocumentation\b', r'\bvideos?\b', r'\blinks?\b', r'\barticles?\b',
+        r'\bwhere (?:can|do|should) i (?:learn|find|study)\b', r'\bmaterials?\b'
+    ],
+    'career_advice': [
+        r'\bcareers?\b', r'\bjobs?\b', r'\binternships?\b', r'\bresumes?\b', r'\bcv\b',
+        r'\binterviews?\b', r'\bsalar(?:y|ies)\b', r'\bhired?\b', r'\bbecome an? \w+',
+        r'\broles?\b', r'\bemployers?\b'
+    ],
+    'comparison': [
+        r'\bvs\.?\b', r'\bversus\b', r'\bcompare[ds]?\b', r'\bcomparison\b',
+        r'\bdifferences? between\b', r'\bbetter than\b', r'\bor\b.*\?\s*$', r'\bpros and cons\b'
+    ],
+    'trend_analysis': [
+        r'\btrends?\b', r'\btrending\b', r'\bpopular\b', r'\bin demand\b', r'\bdemand\b',
+        r'\bgrowing\b', r'\bhot\b', r'\bfuture\b', r'\bemerging\b', r'\bthis year\b'
+    ]
+}
+
+# Example queries per intent; their embedding centroids back up the rules
+INTENT_EXAMPLES = {
+    'skill_discovery': [
+        "What skills should a Junior learn?",
+        "What should I learn next as a computer science student?",
+        "Which skills do I need for AI development?",
+        "Where should I start with programming?",
+        "What technologies should I focus on this semester?"
+    ],
+    'resource_finding': [
+        "Can you recommend tutorials for LangChain?",
+        "Where can I learn React?",
+        "Good courses for machine learning beginners",
+        "Find me documentation and videos about Docker",
+        "Best resources to study SQL"
+    ],
+    'career_advice': [
+        "How do I become a machine learning engineer?",
+        "What should I put on my resume for a data science internship?",
+        "How do I prepare for a software engineering interview?",
+        "Which career path is better for me, frontend or backend?",
+        "What jobs can I get with cloud skills?"
+    ],
+    'comparison': [
+        "React vs Angular, which one should I learn?",
+        "What is the difference between SQL and NoSQL?",
+        "Compare PyTorch and TensorFlow",
+        "Is Python better than Java for beginners?",
+        "AWS or Azure for a student?"
+    ],
+    'trend_analysis': [
+        "What are the trending skills right now?",
+        "Which technologies are in demand this year?",
+        "Is generative AI still growing?",
+        "What are the most popular frameworks in 2025?",
+        "What tech skills will matter in the future?"
+    ]
+}
+
+# Off-topic queries sit far from every centroid; leave those to the LLM
+MIN_CENTROID_SIMILARITY = 0.35
+
+# After a failed centroid build, wait this long before calling the embedding API again
+CENTROID_RETRY_SECONDS = 60
+
+CONTEXT_NEEDS = {
+    'resource_finding': ['resources', 'skills'],
+    'trend_analysis': ['skills', 'trends'],
+}
+
+# Taxonomy terms that are also ordinary English words are matched case-sensitively
+_CASE_SENSITIVE_TERMS = {
+    'Go', 'Swift', 'Rust', 'Ruby', 'Express', 'Spark', 'Flutter', 'Lambda',
+    'Container', 'Testing', 'Automation', 'Deployment', 'Backend', 'Frontend', 'Git'
+}
+
+
+def _build_entity_patterns():
+    """Compile taxonomy term matchers, longest terms first."""
+    terms = sorted({t for skills in IT_SKILLS_TAXONOMY.values() for t in skills},
+                   key=len, reverse=True)
+    patterns = []
+    for term in terms:
+        flags = 0 if (term in _CASE_SENSITIVE_TERMS or len(term) <= 3) else re.IGNORECASE
+        patterns.append((term, re.compile(rf'(?<![\w+#.]){re.escape(term)}(?![\w+#])', flags)))
+    return patterns
+
+
+class IntentClassifier:
+    """Classify chat queries locally, deferring to the LLM when unsure."""
+
+    def __init__(self, confidence_threshold: float = None):
+        """Initialize the classifier.
+
+        Args:
+            confidence_threshold: Minimum confidence to skip the LLM
+                (defaults to config.INTENT_CONFIDENCE_THRESHOLD)
+        """
+        self.confidence_threshold = (
+            config.INTENT_CONFIDENCE_THRESHOLD if confidence_threshold is None else confidence_threshold
+        )
+        self.keyword_patterns = {
+            intent: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for intent, patterns in INTENT_KEYWORDS.items()
+        }
+        self.entity_patterns = _build_entity_patterns()
+
+        self._centroids: Optional[np.ndarray] = None
+        self._centroid_retry_at = 0.0
+        self._centroid_intents: List[str] = list(INTENT_EXAMPLES.keys())
+        self._lock = threading.Lock()
+        self._counts = {'rules': 0, 'embedding': 0, 'llm': 0}
+
+    def extract_entities(self, query: str) -> List[str]:
+        """Return taxonomy terms mentioned in the query (canonical spelling)."""
+        entities = []
+        covered = []
+        for term, pattern in self.entity_patterns:
+            for match in pattern.finditer(query):
+                span = match.span()
+                # Skip terms inside a longer term already matched ("React" in "React Native")
+                if any(start <= span[0] and span[1] <= end for start, end in covered):
+                    continue
+                covered.append(span)
+                if term not in entities:
+                    entities.append(term)
+        return entities
+
+    def _rule_scores(self, query: str) -> Dict[str, int]:
+        return {
+            intent: sum(1 for pattern in patterns if pattern.search(query))
+            for intent, patterns in self.keyword_patterns.items()
+        }
+
+    def _set_centroids(self, vectors: List[List[float]]):
+        matrix = np.asarray(vectors, dtype=np.float32)
+        centroids = []
+        offset = 0
+        for intent in self._centroid_intents:
+            count = len(INTENT_EXAMPLES[intent])
+            centroid = matrix[offset:offset + count].mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+            offset += count
+        self._centroids = np.vstack(centroids)
+
+    def _example_texts(self) -> List[str]:
+        return [text for intent in self._centroid_intents for text in INTENT_EXAMPLES[intent]]
+
+    def _ensure_centroids(self) -> bool:
+        if self._centroids is None and time.monotonic() >= self._centroid_retry_at:
+            try:
+                self._set_centroids(get_query_embeddings().embed_documents(self._example_texts()))
+            except Exception as e:
+                print(f"Warning: Intent centroids unavailable ({e}), using rules only")
+                self._centroid_retry_at = time.monotonic() + CENTROID_RETRY_SECONDS
+        return self._centroids is not None
+
+    async def _aensure_centroids(self) -> bool:
+        if self._centroids is None and time.monotonic() >= self._centroid_retry_at:
+            try:
+                self._set_centroids(await get_query_embeddings().aembed_documents(self._example_texts()))
+            except Exception as e:
+                print(f"Warning: Intent centroids unavailable ({e}), using rules only")
+                self._centroid_retry_at = time.monotonic() + CENTROID_RETRY_SECONDS
+        return self._centroids is not None
+
+    def _centroid_scores(self, embedding: Optional[List[float]]) -> Optional[Dict[str, float]]:
+        if embedding is None or self._centroids is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        if vector.shape[0] != self._centroids.shape[1]:
+            return None
+        similarities = self._centroids @ vector
+        return dict(zip(self._centroid_intents, similarities.tolist()))
+
+    def _decide(self, query: str, embedding: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        """Combine rule votes and centroid similarity into an analysis or None."""
+        rules = self._rule_scores(query)
+        centroids = self._centroid_scores(embedding)
+
+        ranked_rules = sorted(rules.items(), key=lambda x: x[1], reverse=True)
+        top_rule, top_votes = ranked_rules[0]
+        rule_margin = top_votes - ranked_rules[1][1]
+        centroid_top = max(centroids, key=centroids.get) if centroids else None
+
+        if top_votes and rule_margin:
+            intent, source = top_rule, 'rules'
+            confidence = min(0.95, 0.7 + 0.1 * rule_margin)
+            if centroid_top == intent:
+                confidence = min(0.99, confidence + 0.1)
+        elif centroids and max(centroids.values()) >= MIN_CENTROID_SIMILARITY:
+            ranked = sorted(centroids.values(), reverse=True)
+            intent, source = centroid_top, 'embedding'
+            # Embedding similarities are close together; scale the gap to the runner-up
+            confidence = min(0.95, 0.5 + 5 * (ranked[0] - ranked[1]))
+            if top_votes and rules[intent] == top_votes:
+                # Tied rule votes that include the centroid pick
+                confidence = min(0.95, confidence + 0.15)
+        else:
+            return None
+
+        if confidence < self.confidence_threshold:
+            return None
+
+        with self._lock:
+            self._counts[source] += 1
+        return {
+            'intent': intent,
+            'entities': self.extract_entities(query),
+            'context_needs': CONTEXT_NEEDS.get(intent, ['skills', 'resources']),
+            'confidence': round(confidence, 3),
+            'source': source
+        }
+
+    def classify(self, query: str) -> Optional[Dict[str, Any]]:
+        """Classify a query locally.
+
+        Args:
+            query: User's question
+
+        Returns:
+            Analysis dict (intent, entities, context_needs, confidence, source),
+            or None when confidence is too low and the LLM should decide
+        """
+        embedding = None
+        if self._ensure_centroids():
+            try:
+                # Shared cached embedder: retrieval embeds the same query anyway
+                embedding = get_query_embeddings().embed_query(query)
+            except Exception as e:
+                print(f"Warning: Query embedding failed ({e}), using rules only")
+        return self._decide(query, embedding)
+
+    async def aclassify(self, query: str) -> Optional[Dict[str, Any]]:
+        """Async variant of ``classify``."""
+        embedding = None
+        if await self._aensure_centroids():
+            try:
+                embedding = await get_query_embeddings().aembed_query(query)
+            except Exception as e:
+                print(f"Warning: Query embedding failed ({e}), using rules only")
+        return self._decide(query, embedding)
+
+    def record_llm_fallback(self):
+        """Count a query that was handed to the LLM analyzer."""
+        with self._lock:
+            self._counts['llm'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """How often each path classified a query."""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {
+            'total': total,
+            'rules': counts['rules'],
+            'embedding': counts['embedding'],
+            'llm': counts['llm'],
+            'llm_rate': round(counts['llm'] / total, 4) if total else 0.0,
+            'confidence_threshold': self.confidence_threshold
+        }
+
+
+# Shared classifier (patterns and centroids are built once per process)
+_intent_classifier: Optional[IntentClassifier] = None
+_intent_classifier_lock = threading.Lock()
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Get or create the process-wide intent classifier.
+
+    Returns:
+        Shared IntentClassifier
+    """
+    global _intent_classifier
+    if _intent_classifier is None:
+        with _intent_classifier_lock:
+            if _intent_classifier is None:
+                _intent_classifier = IntentClassifier()
+    return _intent_classifier
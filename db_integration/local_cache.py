@@ -0,0 +1,146 @@
+"""In-process caching primitives shared by the chatbot and data pipeline."""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries before least-recently-used eviction
+        """
+        self.max_size = max(1, max_size)
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` (marking it recently used) or ``default``."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or refresh ``key``, evicting the oldest entry when full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove ``key`` and return its value (``default`` if absent)."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def items(self) -> Iterable[Tuple[Hashable, Any]]:
+        """Snapshot of cached entries, oldest first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class SQLiteStore:
+    """Small persistent key/blob store backed by a local SQLite file.
+
+    Used as a second cache tier that survives restarts. Safe to share across
+    threads; writes are serialized by a lock.
+    """
+
+    def __init__(self, path: str, table: str = 'cache'):
+        """Open (or create) the store.
+
+        Args:
+            path: SQLite database file path; parent directories are created
+            table: Table name, so several caches can share one file
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored blob for ``key`` or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT value FROM {self.table} WHERE key = ?', (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, value: bytes):
+        """Insert or replace the blob stored under ``key``."""
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)',
+                (key, sqlite3.Binary(value), time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove ``key`` if present."""
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all stored entries."""
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table}')
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+    def close(self):
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
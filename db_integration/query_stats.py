@@ -0,0 +1,233 @@
+"""In-process query instrumentation for the database adapters.
+
+Every ``execute()`` of the PostgreSQL builders reports its SQL, table or
+function name, row count and duration here. Statements are grouped by
+normalized SQL (literals and parameters replaced with ``?``) into latency
+histograms; queries above the slow threshold are logged, and SELECT outliers
+can have their ``EXPLAIN (ANALYZE, BUFFERS)`` plan captured.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import config
+
+
+# Histogram bucket upper bounds in milliseconds (a final bucket catches the rest)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Distinct statements tracked; later new statements are counted under "other"
+MAX_STATEMENTS = 500
+
+# Recent slow queries kept for the admin snapshot
+SLOW_LOG_SIZE = 100
+
+# Minimum seconds between two plan captures of the same statement
+EXPLAIN_INTERVAL_SECONDS = 300
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_VALUE_LIST = re.compile(r"VALUES (?:\?|\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))*)", re.IGNORECASE)
+_IN_LIST = re.compile(r"IN \(\?(?:, \?)*\)", re.IGNORECASE)
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse a statement to its shape: literals, parameters and list lengths removed."""
+    sql = " ".join(query.split())
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    # VALUES and IN lists differ only in length (execute_values sends "VALUES ?")
+    sql = _VALUE_LIST.sub('VALUES (...)', sql)
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def is_select(query: str) -> bool:
+    """Whether a statement is a plain SELECT (safe to re-run under EXPLAIN ANALYZE)."""
+    return query.lstrip().upper().startswith('SELECT')
+
+
+class QueryStats:
+    """Thread-safe per-statement latency histograms plus a slow-query log."""
+
+    def __init__(self, slow_threshold_ms: float = 200, explain_threshold_ms: float = 0):
+        """Initialize the collector.
+
+        Args:
+            slow_threshold_ms: Queries at or above this duration are logged
+            explain_threshold_ms: SELECTs at or above this duration get their
+                plan captured (0 disables)
+        """
+        self.slow_threshold_ms = slow_threshold_ms
+        self.explain_threshold_ms = explain_threshold_ms
+
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Dict[str, Any]] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=SLOW_LOG_SIZE)
+        self._explained_at: Dict[str, float] = {}
+        self._started_at = time.time()
+
+    def _statement(self, sql: str, name: str) -> Dict[str, Any]:
+        """Get or create the entry for one normalized statement (caller holds the lock)."""
+        entry = self._statements.get(sql)
+        if entry is None:
+            if len(self._statements) >= MAX_STATEMENTS:
+                sql, name = 'other', 'other'
+                entry = self._statements.get(sql)
+            if entry is None:
+                entry = {
+                    'sql': sql, 'name': name, 'calls': 0, 'errors': 0, 'rows': 0,
+                    'total_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(BUCKETS_MS) + 1), 'plan': None
+                }
+                self._statements[sql] = entry
+        return entry
+
+    def record(self, name: str, query: str, rows: int, seconds: float, error: bool = False) -> bool:
+        """Record one executed statement.
+
+        Args:
+            name: Table or function the statement targets
+            query: SQL as sent (with ``%s`` placeholders)
+            rows: Rows returned or affected
+            seconds: Wall-clock duration
+            error: Whether the statement raised
+
+        Returns:
+            True when the caller should capture the plan with ``explain_sql``
+            and hand it to ``attach_plan``
+        """
+        sql = normalize_sql(query)
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))
+        slow = ms >= self.slow_threshold_ms
+
+        with self._lock:
+            entry = self._statement(sql, name)
+            entry['calls'] += 1
+            entry['rows'] += rows
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['buckets'][bucket] += 1
+            if error:
+                entry['errors'] += 1
+            if slow:
+                self._slow.append({
+                    'at': time.time(), 'name': name, 'sql': sql,
+                    'duration_ms': round(ms, 2), 'rows': rows, 'error': error
+                })
+
+            explain = (not error and self.explain_threshold_ms > 0 and ms >= self.explain_threshold_ms
+                       and is_select(query)
+                       and time.monotonic() - self._explained_at.get(sql, -EXPLAIN_INTERVAL_SECONDS)
+                       >= EXPLAIN_INTERVAL_SECONDS)
+            if explain:
+                self._explained_at[sql] = time.monotonic()
+
+        if slow:
+            print(f"Slow query ({ms:.0f}ms, {rows} rows) on {name}: {sql}")
+        return explain
+
+    def attach_plan(self, query: str, plan: str):
+        """Store the captured ``EXPLAIN (ANALYZE, BUFFERS)`` output for a statement."""
+        sql = normalize_sql(query)
+        with self._lock:
+            entry = self._statements.get(sql)
+            if entry is not None:
+                entry['plan'] = {'at': time.time(), 'text': plan}
+
+    @staticmethod
+    def _percentile(buckets: List[int], calls: int, fraction: float) -> Optional[float]:
+        """Upper bucket bound containing the given fraction of calls."""
+        if not calls:
+            return None
+        rank = fraction * calls
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, buckets):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return None  # beyond the last bound
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        """Statements ordered by total time, plus the recent slow-query log.
+
+        Args:
+            limit: Maximum number of statements returned
+
+        Returns:
+            JSON-serializable summary
+        """
+        with self._lock:
+            entries = sorted(self._statements.values(), key=lambda e: e['total_ms'], reverse=True)
+            statements = []
+            for entry in entries[:limit]:
+                calls = entry['calls']
+                statements.append({
+                    'sql': entry['sql'],
+                    'name': entry['name'],
+                    'calls': calls,
+                    'errors': entry['errors'],
+                    'rows': entry['rows'],
+                    'total_ms': round(entry['total_ms'], 2),
+                    'mean_ms': round(entry['total_ms'] / calls, 3) if calls else 0.0,
+                    'max_ms': round(entry['max_ms'], 2),
+                    'p50_ms': self._percentile(entry['buckets'], calls, 0.5),
+                    'p95_ms': self._percentile(entry['buckets'], calls, 0.95),
+                    'histogram': {
+                        (f"<={bound}ms" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}ms"): count
+                        for i, (bound, count) in enumerate(zip(BUCKETS_MS + (None,), entry['buckets']))
+                        if count
+                    },
+                    'plan': dict(entry['plan']) if entry['plan'] else None
+                })
+            return {
+                'since': self._started_at,
+                'slow_threshold_ms': self.slow_threshold_ms,
+                'explain_threshold_ms': self.explain_threshold_ms,
+                'statements_tracked': len(self._statements),
+                'statements': statements,
+                'slow_queries': list(reversed(self._slow))
+            }
+
+    def reset(self):
+        """Drop all collected statistics."""
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+            self._explained_at.clear()
+            self._started_at = time.time()
+
+
+def explain_sql(query: str) -> str:
+    """EXPLAIN statement that re-runs ``query`` with the same parameters."""
+    return f"EXPLAIN (ANALYZE, BUFFERS) {query}"
+
+
+# Shared collector (one per process)
+_query_stats: Optional[QueryStats] = None
+_query_stats_lock = threading.Lock()
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Get or create the process-wide query statistics collector.
+
+    Configured via QUERY_STATS_ENABLED, SLOW_QUERY_MS and QUERY_EXPLAIN_MS.
+
+    Returns:
+        Shared QueryStats, or None when disabled
+    """
+    global _query_stats
+    if not config.QUERY_STATS_ENABLED:
+        return None
+    if _query_stats is None:
+        with _query_stats_lock:
+            if _query_stats is None:
+                _query_stats = QueryStats(
+                    slow_threshold_ms=config.SLOW_QUERY_MS,
+                    explain_threshold_ms=config.QUERY_EXPLAIN_MS
+                )
+    return _query_stats
@@ -0,0 +1,174 @@
+"""Semantic answer cache for the agentic RAG chatbot."""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import config
+
+
+class SemanticResponseCache:
+    """Cache chatbot answers keyed by query embedding and student level.
+
+    A lookup hits when a cached query for the same student level lies within
+    ``max_distance`` cosine distance of the new query and is younger than
+    ``ttl_seconds``. Entries are invalidated wholesale when the catalog changes.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600,
+                 max_distance: float = 0.08):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached answers per student level (oldest evicted)
+            ttl_seconds: Lifetime of a cached answer
+            max_distance: Maximum cosine distance (1 - similarity) for a hit
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+
+        self._lock = threading.Lock()
+        # student_level -> {'vectors': (n, d) float32 unit rows, 'entries': [...]}
+        self._levels: Dict[str, Dict[str, Any]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _expire(self, level: Dict[str, Any], now: float):
+        """Drop expired entries for one level (caller holds the lock)."""
+        keep = [i for i, entry in enumerate(level['entries'])
+                if now - entry['created_at'] < self.ttl_seconds]
+        if len(keep) != len(level['entries']):
+            level['entries'] = [level['entries'][i] for i in keep]
+            level['vectors'] = level['vectors'][keep]
+
+    def lookup(self, embedding: List[float], student_level: str) -> Optional[str]:
+        """Return a cached answer for a semantically equivalent query, if any.
+
+        Args:
+            embedding: Query embedding
+            student_level: Student's current level
+
+        Returns:
+            Cached response or None
+        """
+        vector = self._normalize(embedding)
+        now = time.time()
+
+        with self._lock:
+            level = self._levels.get(student_level)
+            if vector is not None and level is not None:
+                self._expire(level, now)
+                if level['entries'] and level['vectors'].shape[1] == vector.shape[0]:
+                    similarities = level['vectors'] @ vector
+                    best = int(np.argmax(similarities))
+                    if 1.0 - float(similarities[best]) <= self.max_distance:
+                        self._hits += 1
+                        return level['entries'][best]['response']
+            self._misses += 1
+            return None
+
+    @property
+    def generation(self) -> int:
+        """Number of invalidations so far; read before generating an answer."""
+        with self._lock:
+            return self._invalidations
+
+    def store(self, embedding: List[float], student_level: str, query: str, response: str,
+              generation: Optional[int] = None):
+        """Cache an answer.
+
+        Args:
+            embedding: Query embedding
+            student_level: Student's current level
+            query: Original query text (kept for inspection)
+            response: Generated answer
+            generation: ``generation`` read before the answer was generated;
+                the answer is dropped if the cache was invalidated since
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            if generation is not None and generation != self._invalidations:
+                # Built from the catalog as it was before the invalidation
+                return
+            level = self._levels.get(student_level)
+            if level is None or level['vectors'].shape[1] != vector.shape[0]:
+                level = {'vectors': np.empty((0, vector.shape[0]), dtype=np.float32), 'entries': []}
+                self._levels[student_level] = level
+
+            self._expire(level, now)
+            level['vectors'] = np.vstack([level['vectors'], vector])
+            level['entries'].append({'query': query, 'response': response, 'created_at': now})
+
+            overflow = len(level['entries']) - self.max_entries
+            if overflow > 0:
+                level['vectors'] = level['vectors'][overflow:]
+                level['entries'] = level['entries'][overflow:]
+
+    def invalidate(self):
+        """Drop every cached answer (e.g. after the catalog is reloaded)."""
+        with self._lock:
+            self._levels.clear()
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': sum(len(level['entries']) for level in self._levels.values()),
+                'max_entries_per_level': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'max_distance': self.max_distance,
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Shared response cache (one per process)
+_response_cache: Optional[SemanticResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[SemanticResponseCache]:
+    """Get or create the process-wide response cache.
+
+    Configured via config.RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL (seconds) and RESPONSE_CACHE_MAX_DISTANCE.
+
+    Returns:
+        Shared SemanticResponseCache, or None when disabled
+    """
+    global _response_cache
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = SemanticResponseCache(
+                    max_entries=config.RESPONSE_CACHE_SIZE,
+                    ttl_seconds=config.RESPONSE_CACHE_TTL,
+                    max_distance=config.RESPONSE_CACHE_MAX_DISTANCE
+                )
+    return _response_cache
+
+
+def invalidate_response_cache():
+    """Invalidate cached answers if the cache has been created in this process."""
+    if _response_cache is not None:
+        _response_cache.invalidate()
@@ -1,10 +1,16 @@
 """Skill extraction and categorization for IT students."""
 
-from typing import List, Dict, Any, Set
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 import config
 import re
+from db_integration.local_cache import LRUCache, SQLiteStore
+from db_integration.token_counter import count_tokens
 
 
 # IT Skills taxonomy for students
@@ -55,12 +61,78 @@ IT_SKILLS_TAXONOMY = {
     ]
 }
 
+# Characters of resource text sent to the LLM (and hashed for the cache key)
+LLM_INPUT_CHARS = 500
+
+EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an IT skills expert. Extract relevant IT skills 
+    mentioned in the text. Focus on skills that IT students should learn.
+    Return only the skill names, one per line."""),
+    ("user", "Text: {text}\n\nExtract IT skills:")
+])
+
+BATCH_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an IT skills expert. Each numbered item below is a 
+    separate learning resource. Extract the relevant IT skills mentioned in each 
+    item. Focus on skills that IT students should learn.
+    Return ONLY valid JSON with no markdown formatting, mapping every item number 
+    to a list of skill names: {{"1": ["<skill>", ...], "2": [], ...}}"""),
+    ("user", "{items}\n\nExtract IT skills for every item:")
+])
+
+
+def _clean_skill_names(lines: List[str]) -> List[str]:
+    """Strip list markers and drop empty or too-short names."""
+    names = []
+    for line in lines:
+        skill_name = re.sub(r'^[-*•]\s*', '', str(line)).strip()
+        if skill_name and len(skill_name) > 2:
+            names.append(skill_name)
+    return names
+
+
+def _parse_batch_response(content: str, count: int) -> Dict[int, List[str]]:
+    """Parse a batched extraction answer into item number -> skill names.
+    
+    Raises ValueError when the answer is not a JSON object. Items that are
+    missing or not a list of names are left out, so the caller can retry them
+    one by one.
+    """
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    
+    mapping = json.loads(content.strip())
+    if not isinstance(mapping, dict):
+        raise ValueError("batch answer is not a JSON object")
+    
+    parsed = {}
+    for item, names in mapping.items():
+        try:
+            number = int(item)
+        except (TypeError, ValueError):
+            continue
+        if 1 <= number <= count and isinstance(names, list):
+            parsed[number] = _clean_skill_names(names)
+    return parsed
+
 
 class SkillExtractor:
     """Extract and categorize IT skills from learning resources."""
     
-    def __init__(self):
-        """Initialize skill extractor."""
+    def __init__(self, cache_path: Optional[str] = None, concurrency: Optional[int] = None):
+        """Initialize skill extractor.
+        
+        Args:
+            cache_path: SQLite file for cached LLM extractions (default
+                SKILL_EXTRACTION_CACHE_PATH; empty keeps them in memory only)
+            concurrency: Parallel LLM calls in ``extract_many`` (default
+                SKILL_EXTRACTION_CONCURRENCY)
+        """
         try:
             self.llm = ChatOpenAI(
                 model=config.LLM_MODEL,
@@ -73,6 +145,29 @@ class SkillExtractor:
         
         # Create normalized skill map for faster lookup
         self.skill_map = self._build_skill_map()
+        
+        # LLM answers keyed by model + truncated text; the disk tier makes
+        # re-loading the same resources free
+        self.concurrency = max(1, concurrency or config.SKILL_EXTRACTION_CONCURRENCY)
+        self.llm_cache = LRUCache(max_size=4096)
+        model = getattr(self.llm, 'model_name', config.LLM_MODEL)
+        prompt = "\n".join(m.prompt.template
+                           for template in (EXTRACTION_PROMPT, BATCH_EXTRACTION_PROMPT)
+                           for m in template.messages)
+        self._llm_key_prefix = f"{model}\n{prompt}\n"
+        self.llm_store = None
+        cache_path = config.SKILL_EXTRACTION_CACHE_PATH if cache_path is None else cache_path
+        if cache_path:
+            try:
+                self.llm_store = SQLiteStore(cache_path, table='skill_extractions')
+            except Exception as e:
+                print(f"[WARNING] Skill extraction cache unavailable ({e}), caching in memory only")
+        
+        self._stats_lock = threading.Lock()
+        self._llm_calls = 0
+        self._llm_cache_hits = 0
+        self._batched_items = 0
+        self._batch_fallbacks = 0
     
     def _build_skill_map(self) -> Dict[str, str]:
         """Build normalized skill name to category mapping."""
@@ -134,6 +229,131 @@ class SkillExtractor:
         
         return skills
     
+    def _llm_cache_key(self, text: str) -> str:
+        """Cache key: hash of the model, the prompt and the text the LLM would see."""
+        raw = f"{self._llm_key_prefix}{text[:LLM_INPUT_CHARS]}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _cached_llm_skills(self, key: str) -> Optional[List[str]]:
+        """Skill names cached for ``key`` in memory or on disk, or None."""
+        names = self.llm_cache.get(key)
+        if names is None and self.llm_store is not None:
+            try:
+                blob = self.llm_store.get(key)
+            except Exception as e:
+                print(f"[WARNING] Skill extraction cache read failed: {e}")
+                blob = None
+            if blob is not None:
+                names = json.loads(blob)
+                self.llm_cache.put(key, names)
+        if names is not None:
+            with self._stats_lock:
+                self._llm_cache_hits += 1
+        return names
+    
+    def _cache_llm_skills(self, key: str, names: List[str]):
+        self.llm_cache.put(key, names)
+        if self.llm_store is not None:
+            try:
+                self.llm_store.put(key, json.dumps(names).encode('utf-8'))
+            except Exception as e:
+                print(f"[WARNING] Skill extraction cache write failed: {e}")
+    
+    def _invoke_llm(self, text: str) -> List[str]:
+        """Ask the LLM for the skill names in ``text`` (raises on failure)."""
+        with self._stats_lock:
+            self._llm_calls += 1
+        response = self.llm.invoke(EXTRACTION_PROMPT.format_messages(text=text[:LLM_INPUT_CHARS]))
+        return _clean_skill_names(response.content.strip().split('\n'))
+    
+    def _llm_skills(self, text: str, key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """LLM-extracted skills for ``text``, from the cache when possible.
+        
+        Failed calls return no skills and are not cached, so the next load
+        retries them.
+        """
+        key = key or self._llm_cache_key(text)
+        names = self._cached_llm_skills(key)
+        if names is None:
+            try:
+                names = self._invoke_llm(text)
+            except Exception as e:
+                print(f"[WARNING] LLM extraction failed: {e}")
+                return []
+            self._cache_llm_skills(key, names)
+        return self._llm_skill_records(names)
+    
+    def _plan_batches(self, pending: Dict[str, str]) -> List[List[tuple]]:
+        """Group (key, text) pairs into prompts that fit the token budget.
+        
+        Items are added while their truncated text stays within
+        SKILL_EXTRACTION_BATCH_TOKENS and the batch has fewer than
+        SKILL_EXTRACTION_BATCH_SIZE items; an item over the budget gets a
+        batch of its own.
+        """
+        batches, batch, tokens = [], [], 0
+        for key, text in pending.items():
+            item_tokens = count_tokens([text[:LLM_INPUT_CHARS]])
+            if batch and (tokens + item_tokens > config.SKILL_EXTRACTION_BATCH_TOKENS
+                          or len(batch) >= config.SKILL_EXTRACTION_BATCH_SIZE):
+                batches.append(batch)
+                batch, tokens = [], 0
+            batch.append((key, text))
+            tokens += item_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _llm_skills_batch(self, batch: List[tuple]) -> Dict[str, List[Dict[str, Any]]]:
+        """LLM-extracted skills for several texts from one numbered prompt.
+        
+        Items the answer does not cover (or every item, when it is not valid
+        JSON) fall back to single-item extraction.
+        
+        Args:
+            batch: (cache key, text) pairs
+            
+        Returns:
+            cache key -> categorized skills
+        """
+        if len(batch) == 1:
+            key, text = batch[0]
+            return {key: self._llm_skills(text, key)}
+        
+        # One line per item so the numbering stays unambiguous
+        items = "\n".join(f"{i}. {' '.join(text[:LLM_INPUT_CHARS].split())}"
+                          for i, (_, text) in enumerate(batch, 1))
+        try:
+            with self._stats_lock:
+                self._llm_calls += 1
+            response = self.llm.invoke(BATCH_EXTRACTION_PROMPT.format_messages(items=items))
+            parsed = _parse_batch_response(response.content, len(batch))
+        except Exception as e:
+            print(f"[WARNING] Batched LLM extraction of {len(batch)} items failed ({e}), "
+                  f"extracting them one by one")
+            parsed = {}
+        
+        results = {}
+        for i, (key, text) in enumerate(batch, 1):
+            if i in parsed:
+                self._cache_llm_skills(key, parsed[i])
+                results[key] = self._llm_skill_records(parsed[i])
+            else:
+                results[key] = self._llm_skills(text, key)
+        
+        with self._stats_lock:
+            self._batched_items += len(parsed)
+            self._batch_fallbacks += len(batch) - len(parsed)
+        return results
+    
+    def _llm_skill_records(self, names: List[str]) -> List[Dict[str, Any]]:
+        """Categorized skill dicts for LLM-returned names."""
+        return [{
+            'skill_name': name,
+            'category': self._categorize_skill(name),
+            'confidence': 0.7
+        } for name in names]
+    
     def _extract_with_llm(self, text: str) -> List[Dict[str, Any]]:
         """Extract skills using LLM.
         
@@ -143,34 +363,7 @@ class SkillExtractor:
         Returns:
             List of extracted skills
         """
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an IT skills expert. Extract relevant IT skills 
-            mentioned in the text. Focus on skills that IT students should learn.
-            Return only the skill names, one per line."""),
-            ("user", "Text: {text}\n\nExtract IT skills:")
-        ])
-        
-        try:
-            response = self.llm.invoke(prompt.format_messages(text=text[:500]))
-            skill_lines = response.content.strip().split('\n')
-            
-            skills = []
-            for line in skill_lines:
-                # Clean up the line
-                skill_name = re.sub(r'^[-*•]\s*', '', line).strip()
-                if skill_name and len(skill_name) > 2:
-                    # Try to categorize
-                    category = self._categorize_skill(skill_name)
-                    skills.append({
-                        'skill_name': skill_name,
-                        'category': category,
-                        'confidence': 0.7
-                    })
-            
-            return skills
-        except Exception as e:
-            print(f"[WARNING] LLM extraction failed: {e}")
-            return []
+        return self._llm_skills(text)
     
     def _categorize_skill(self, skill_name: str) -> str:
         """Categorize a skill name.
@@ -261,6 +454,143 @@ class SkillExtractor:
             skill['difficulty_level'] = self.categorize_difficulty(skill['skill_name'])
         
         return skills
+    
+    def extract_many(self, resources: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Extract and categorize skills for many resources at once.
+        
+        Same result shape as calling ``extract_and_categorize`` per
+        resource, but uncached texts are packed into numbered multi-item
+        prompts sized by SKILL_EXTRACTION_BATCH_TOKENS (0 sends one text per
+        call), up to ``self.concurrency`` calls run at a time, resources with
+        identical (truncated) text share one answer, and cached texts make no
+        call at all.
+        
+        Args:
+            resources: Learning resources
+            
+        Returns:
+            Categorized skills per resource, in input order
+        """
+        texts = [f"{r.get('title', '')} {r.get('description', '')}" for r in resources]
+        # Same rule as extract_skills_from_resource: short texts skip the LLM
+        keys = [self._llm_cache_key(text) if self.llm and len(text) > 50 else None for text in texts]
+        llm_skills: Dict[str, List[Dict[str, Any]]] = {}
+        
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key is None or key in llm_skills or key in pending:
+                continue
+            names = self._cached_llm_skills(key)
+            if names is None:
+                pending[key] = text
+            else:
+                llm_skills[key] = self._llm_skill_records(names)
+        
+        if pending:
+            if config.SKILL_EXTRACTION_BATCH_TOKENS > 0:
+                batches = self._plan_batches(pending)
+            else:
+                batches = [[item] for item in pending.items()]
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+                for result in pool.map(self._llm_skills_batch, batches):
+                    llm_skills.update(result)
+        
+        results = []
+        for key, text in zip(keys, texts):
+            skills = self.extract_skills_from_text(text)
+            if key is not None:
+                skills = self._merge_skills(skills, llm_skills[key])
+            for skill in skills:
+                skill['difficulty_level'] = self.categorize_difficulty(skill['skill_name'])
+            results.append(skills)
+        return results
+    
+    def llm_stats(self) -> Dict[str, Any]:
+        """LLM calls made and cache hits since this extractor was created.
+        
+        ``batched_items`` counts texts answered by a multi-item prompt and
+        ``batch_fallbacks`` those re-sent on their own.
+        """
+        with self._stats_lock:
+            calls = self._llm_calls
+            hits = self._llm_cache_hits
+            batched = self._batched_items
+            fallbacks = self._batch_fallbacks
+        return {
+            'llm_calls': calls,
+            'cache_hits': hits,
+            'batched_items': batched,
+            'batch_fallbacks': fallbacks,
+            'disk_enabled': self.llm_store is not None
+        }
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex for the words in a character trie, preferring the longest match."""
+    end = '' in node
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # Greedy optional: try the longer words first, fall back to the word ending here
+    return f"(?:{body})?" if end else body
+
+
+class SkillMentionMatcher:
+    """Find which skill names occur in a text with one regex pass.
+    
+    Matches like ``skill_name.lower() in text.lower()``: case-insensitive
+    substrings, including names inside other names ("Java" in "JavaScript").
+    All names are compiled into one trie-shaped pattern; a lookahead finds the
+    longest name starting at each position, and names contained in a longer
+    match are added from a precomputed table.
+    """
+    
+    def __init__(self, skill_names: List[str]):
+        """Compile the matcher.
+        
+        Args:
+            skill_names: Skill names to look for
+        """
+        self._names: Dict[str, List[str]] = {}
+        for name in skill_names:
+            if name:
+                self._names.setdefault(name.lower(), []).append(name)
+        
+        trie: Dict[str, Any] = {}
+        for lowered in self._names:
+            node = trie
+            for char in lowered:
+                node = node.setdefault(char, {})
+            node[''] = {}
+        self._pattern = re.compile(f"(?=({_trie_pattern(trie)}))") if trie else None
+        
+        lowered_names = list(self._names)
+        self._contained = {
+            lowered: [other for other in lowered_names if other in lowered]
+            for lowered in lowered_names
+        }
+    
+    def find(self, text: str) -> Set[str]:
+        """Skill names (original spelling) that occur in ``text``."""
+        if self._pattern is None or not text:
+            return set()
+        longest = {match.group(1) for match in self._pattern.finditer(text.lower()) if match.group(1)}
+        found = set()
+        for lowered in longest:
+            for contained in self._contained[lowered]:
+                found.update(self._names[contained])
+        return found
+
+
+def skill_demand_score(mention_count: int, total_resources: int) -> int:
+    """Demand score (50-100) from how many of ``total_resources`` mention a skill."""
+    # Normalize to 0-100 scale
+    max_mentions = total_resources * 0.3  # Assume max 30% mention rate
+    score = min(100, int((mention_count / max_mentions) * 100)) if max_mentions > 0 else 0
+    
+    return max(score, 50)  # Minimum score of 50 for known skills
 
 
 def calculate_skill_demand(skill_name: str, resources: List[Dict[str, Any]]) -> int:
@@ -281,11 +611,7 @@ def calculate_skill_demand(skill_name: str, resources: List[Dict[str, Any]]) ->
         if skill_lower in text:
             mention_count += 1
     
-    # Normalize to 0-100 scale
-    max_mentions = len(resources) * 0.3  # Assume max 30% mention rate
-    score = min(100, int((mention_count / max_mentions) * 100)) if max_mentions > 0 else 0
-    
-    return max(score, 50)  # Minimum score of 50 for known skills
+    return skill_demand_score(mention_count, len(resources))
 
 
 def calculate_weighted_trend_score(
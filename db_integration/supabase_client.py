@@ -1,23 +1,38 @@
 """Supabase client for GenAI learning resources and trend analysis."""
 
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+from typing import List, Dict, Any, Optional, Iterator
+from contextlib import nullcontext
+from datetime import datetime, date, timedelta
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from db_integration.embedding_cache import embedding_label
+from db_integration.vector_index import get_vector_index, use_memory_index
 
 load_dotenv()
 
 # Try to use database adapter if available, otherwise fall back to Supabase
 try:
-    from db_integration.database_adapter import DatabaseAdapter
+    from db_integration.database_adapter import DatabaseAdapter, get_supabase_client, iter_rows_keyset
     USE_ADAPTER = True
 except ImportError:
     USE_ADAPTER = False
 
 
+# Projections for callers that only need a summary of each row
+SKILL_SUMMARY_COLUMNS = 'id, skill_name, category, demand_score'
+RESOURCE_SUMMARY_COLUMNS = 'id, title, url, description, category, relevance_score'
+
+# Names per IN (...) lookup in get_skills_by_names
+SKILL_LOOKUP_CHUNK = 100
+
+
 class SupabaseManager:
-    """Manager for Supabase database operations."""
+    """Manager for Supabase database operations.
+    
+    Construction is cheap: the underlying connection pool or Supabase client
+    is shared process-wide, so handlers can create one per request.
+    """
     
     def __init__(self):
         """Initialize Supabase client or PostgreSQL adapter."""
@@ -42,9 +57,47 @@ class SupabaseManager:
                     "Or set USE_SUPABASE=false and configure DB_HOST, DB_NAME, etc. for Docker PostgreSQL."
                 )
             
-            self.client: Client = create_client(self.url, self.key)
+            if USE_ADAPTER:
+                # Reuse the process-wide client instead of creating one per manager
+                self.client: Client = get_supabase_client()
+            else:
+                self.client: Client = create_client(self.url, self.key)
             self.use_adapter = False
     
+    # Transactions
+    
+    def transaction(self):
+        """Context manager grouping writes into one commit (PostgreSQL only).
+        
+        Without the database adapter (plain Supabase client) every request
+        commits on its own and this does nothing.
+        """
+        if self.use_adapter:
+            return self.client.transaction()
+        return nullcontext()
+    
+    # Bulk Reads
+    
+    def iter_rows(self, table_name: str, columns: str = '*', key: str = 'id', page_size: int = 1000,
+                  filters: Optional[List[tuple]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream every row of a table in pages (no row cap, constant memory).
+        
+        Server-side cursor on PostgreSQL, keyset pagination on Supabase.
+        
+        Args:
+            table_name: Table to read
+            columns: Columns to select
+            key: Unique, orderable column rows are ordered by
+            page_size: Rows fetched per round trip
+            filters: Extra ``(column, op, value)`` filters, op in eq/neq/gt/gte/lt/lte
+            
+        Yields:
+            Rows as dicts
+        """
+        if self.use_adapter:
+            return self.client.iter_rows(table_name, columns, key, page_size, filters)
+        return iter_rows_keyset(self.client, table_name, columns, key, page_size, filters)
+    
     # Learning Resources Operations
     
     def insert_learning_resource(self, resource: Dict[str, Any]) -> Dict[str, Any]:
@@ -56,14 +109,7 @@ class SupabaseManager:
         Returns:
             Inserted resource with ID
         """
-        data = {
-            'title': resource.get('title'),
-            'url': resource.get('url'),
-            'description': resource.get('description'),
-            'category': resource.get('category', 'article'),
-            'source': resource.get('source'),
-            'relevance_score': resource.get('relevance_score', 0.5)
-        }
+        data = self._resource_row(resource)
         
         try:
             result = self.client.table('learning_resources').upsert(
@@ -75,34 +121,81 @@ class SupabaseManager:
             print(f"Error inserting resource: {e}")
             return {}
     
+    @staticmethod
+    def _resource_row(resource: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'title': resource.get('title'),
+            'url': resource.get('url'),
+            'description': resource.get('description'),
+            'category': resource.get('category', 'article'),
+            'source': resource.get('source'),
+            'relevance_score': resource.get('relevance_score', 0.5)
+        }
+    
+    def _bulk_write(self, table: str, rows: List[Dict[str, Any]],
+                    on_conflict: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Write rows in one multi-row insert/upsert, falling back to row by row.
+        
+        The fallback keeps one bad row from dropping the whole batch. Errors
+        are logged, not raised: inside ``transaction()`` each statement runs
+        under its own savepoint, so the rows that did succeed still commit.
+        
+        Returns:
+            Written rows (failed rows are left out)
+        """
+        if not rows:
+            return []
+        
+        def write(data):
+            query = self.client.table(table)
+            if on_conflict:
+                return query.upsert(data, on_conflict=on_conflict).execute().data or []
+            return query.insert(data).execute().data or []
+        
+        try:
+            return write(rows)
+        except Exception as e:
+            print(f"Bulk write to {table} failed ({e}), retrying row by row")
+        
+        written = []
+        for row in rows:
+            try:
+                written.extend(write(row))
+            except Exception as e:
+                print(f"Error writing to {table}: {e}")
+        return written
+    
     def bulk_insert_resources(self, resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Insert multiple learning resources.
+        """Insert multiple learning resources with one multi-row upsert on ``url``.
         
         Args:
             resources: List of resource dictionaries
             
         Returns:
-            List of inserted resources
+            List of inserted resources (match them to the input by ``url``;
+            duplicate URLs collapse to one row, resources without a URL are
+            all kept)
         """
-        inserted = []
-        for resource in resources:
-            result = self.insert_learning_resource(resource)
-            if result:
-                inserted.append(result)
-        return inserted
-    
-    def get_all_resources(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = {}
+        for i, resource in enumerate(resources):
+            url = resource.get('url')
+            # A NULL url never conflicts, so each such resource is its own row
+            rows[url if url is not None else (None, i)] = self._resource_row(resource)
+        return self._bulk_write('learning_resources', list(rows.values()), on_conflict='url')
+    
+    def get_all_resources(self, limit: int = 100, columns: str = '*') -> List[Dict[str, Any]]:
         """Get all learning resources.
         
         Args:
             limit: Maximum number of resources to return
+            columns: Columns to select (e.g. RESOURCE_SUMMARY_COLUMNS)
             
         Returns:
             List of resources
         """
         try:
             result = self.client.table('learning_resources')\
-                .select('*')\
+                .select(columns)\
                 .order('relevance_score', desc=True)\
                 .limit(limit)\
                 .execute()
@@ -122,14 +215,7 @@ class SupabaseManager:
         Returns:
             Inserted topic with ID
         """
-        data = {
-            'title': topic.get('title'),
-            'description': topic.get('description'),
-            'source': topic.get('source'),
-            'topic_type': topic.get('type'),
-            'overall_score': topic.get('overall_score', 0),
-            'metadata': topic.get('metrics', {})
-        }
+        data = self._topic_row(topic)
         
         try:
             result = self.client.table('trending_topics').insert(data).execute()
@@ -138,8 +224,19 @@ class SupabaseManager:
             print(f"Error inserting topic: {e}")
             return {}
     
+    @staticmethod
+    def _topic_row(topic: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'title': topic.get('title'),
+            'description': topic.get('description'),
+            'source': topic.get('source'),
+            'topic_type': topic.get('type'),
+            'overall_score': topic.get('overall_score', 0),
+            'metadata': topic.get('metrics', {})
+        }
+    
     def bulk_insert_topics(self, topics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Insert multiple trending topics.
+        """Insert multiple trending topics with one multi-row insert.
         
         Args:
             topics: List of topic dictionaries
@@ -147,27 +244,24 @@ class SupabaseManager:
         Returns:
             List of inserted topics
         """
-        inserted = []
-        for topic in topics:
-            result = self.insert_trending_topic(topic)
-            if result:
-                inserted.append(result)
-        return inserted
+        rows = [self._topic_row(topic) for topic in topics]
+        return self._bulk_write('trending_topics', rows)
     
     # IT Skills Operations
     
-    def get_skill_by_name(self, skill_name: str) -> Optional[Dict[str, Any]]:
+    def get_skill_by_name(self, skill_name: str, columns: str = '*') -> Optional[Dict[str, Any]]:
         """Get a skill by name.
         
         Args:
             skill_name: Name of the skill
+            columns: Columns to select
             
         Returns:
             Skill data or None
         """
         try:
             result = self.client.table('it_skills')\
-                .select('*')\
+                .select(columns)\
                 .eq('skill_name', skill_name)\
                 .execute()
             return result.data[0] if result.data else None
@@ -175,6 +269,30 @@ class SupabaseManager:
             print(f"Error fetching skill: {e}")
             return None
     
+    def get_skills_by_names(self, skill_names: List[str], columns: str = 'id, skill_name') -> List[Dict[str, Any]]:
+        """Look up several skills by name with ``IN (...)`` queries.
+        
+        Args:
+            skill_names: Skill names to find
+            columns: Columns to select (include ``skill_name`` to match results)
+            
+        Returns:
+            Skills that exist (missing names are left out)
+        """
+        names = list(dict.fromkeys(skill_names))
+        found = []
+        try:
+            # Chunked so the PostgREST query string stays short
+            for start in range(0, len(names), SKILL_LOOKUP_CHUNK):
+                result = self.client.table('it_skills')\
+                    .select(columns)\
+                    .in_('skill_name', names[start:start + SKILL_LOOKUP_CHUNK])\
+                    .execute()
+                found.extend(result.data or [])
+        except Exception as e:
+            print(f"Error fetching skills: {e}")
+        return found
+    
     def insert_skill(self, skill: Dict[str, Any]) -> Dict[str, Any]:
         """Insert a new IT skill.
         
@@ -191,18 +309,34 @@ class SupabaseManager:
             print(f"Error inserting skill: {e}")
             return {}
     
-    def get_top_skills(self, limit: int = 20) -> List[Dict[str, Any]]:
+    def bulk_insert_skills(self, skills: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert several new IT skills with one multi-row insert.
+        
+        Args:
+            skills: Skill rows (``skill_name`` must not exist yet)
+            
+        Returns:
+            Inserted skills (rows that failed, e.g. a name added concurrently, are left out)
+        """
+        return self._bulk_write('it_skills', skills)
+    
+    def get_top_skills(self, limit: int = 20, category: Optional[str] = None,
+                       columns: str = '*') -> List[Dict[str, Any]]:
         """Get top IT skills by demand score.
         
         Args:
             limit: Number of skills to return
+            category: Only skills in this category
+            columns: Columns to select (e.g. SKILL_SUMMARY_COLUMNS)
             
         Returns:
             List of top skills
         """
         try:
-            result = self.client.table('it_skills')\
-                .select('*')\
+            query = self.client.table('it_skills').select(columns)
+            if category:
+                query = query.eq('category', category)
+            result = query\
                 .order('demand_score', desc=True)\
                 .limit(limit)\
                 .execute()
@@ -232,6 +366,26 @@ class SupabaseManager:
         except Exception as e:
             print(f"Error linking resource to skill: {e}")
     
+    def link_resources_to_skills(self, links: List[Dict[str, Any]]) -> int:
+        """Link many resources to skills with one multi-row upsert.
+        
+        Args:
+            links: Dicts with resource_id, skill_id and relevance (1-10)
+            
+        Returns:
+            Number of links written
+        """
+        rows = {}
+        for link in links:
+            # A statement cannot upsert the same pair twice; the last one wins
+            rows[(link['resource_id'], link['skill_id'])] = {
+                'resource_id': link['resource_id'],
+                'skill_id': link['skill_id'],
+                'relevance': link.get('relevance', 5)
+            }
+        return len(self._bulk_write('resource_skills', list(rows.values()),
+                                    on_conflict='resource_id,skill_id'))
+    
     # Skill Trends Operations
     
     def insert_skill_trend(self, skill_id: str, trend_data: Dict[str, Any]):
@@ -241,7 +395,19 @@ class SupabaseManager:
             skill_id: UUID of the skill
             trend_data: Trend metrics
         """
-        data = {
+        data = self._trend_row(skill_id, trend_data)
+        
+        try:
+            self.client.table('skill_trends').upsert(
+                data,
+                on_conflict='skill_id,trend_date'
+            ).execute()
+        except Exception as e:
+            print(f"Error inserting skill trend: {e}")
+    
+    @staticmethod
+    def _trend_row(skill_id: str, trend_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             'skill_id': skill_id,
             'trend_date': trend_data.get('date', date.today().isoformat()),
             'mention_count': trend_data.get('mentions', 0),
@@ -250,14 +416,18 @@ class SupabaseManager:
             'linkedin_posts': trend_data.get('linkedin_posts', 0),
             'trend_score': trend_data.get('score', 0)
         }
+    
+    def insert_skill_trends(self, trends: Dict[str, Dict[str, Any]]) -> int:
+        """Upsert trend rows for many skills with one multi-row statement.
         
-        try:
-            self.client.table('skill_trends').upsert(
-                data,
-                on_conflict='skill_id,trend_date'
-            ).execute()
-        except Exception as e:
-            print(f"Error inserting skill trend: {e}")
+        Args:
+            trends: skill_id -> trend metrics (as for ``insert_skill_trend``)
+            
+        Returns:
+            Number of trend rows written
+        """
+        rows = [self._trend_row(skill_id, trend_data) for skill_id, trend_data in trends.items()]
+        return len(self._bulk_write('skill_trends', rows, on_conflict='skill_id,trend_date'))
     
     def get_skill_trends(self, days: int = 30) -> List[Dict[str, Any]]:
         """Get skill trends for the last N days.
@@ -268,9 +438,11 @@ class SupabaseManager:
         Returns:
             List of trend data
         """
+        since = (date.today() - timedelta(days=days)).isoformat()
         try:
             result = self.client.table('skill_trends')\
                 .select('*, it_skills(skill_name, category)')\
+                .gte('trend_date', since)\
                 .order('trend_date', desc=True)\
                 .execute()
             return result.data
@@ -280,18 +452,19 @@ class SupabaseManager:
     
     # Views and Analytics
     
-    def get_top_skills_for_students(self, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_top_skills_for_students(self, limit: int = 20, columns: str = '*') -> List[Dict[str, Any]]:
         """Get top skills for IT students from view.
         
         Args:
             limit: Number of skills to return
+            columns: Columns to select
             
         Returns:
             List of top skills with analytics
         """
         try:
             result = self.client.table('top_skills_for_students')\
-                .select('*')\
+                .select(columns)\
                 .limit(limit)\
                 .execute()
             return result.data
@@ -333,6 +506,101 @@ class SupabaseManager:
             print(f"Error fetching learning path: {e}")
             return []
     
+    # Semantic Search
+    
+    def search_similar_skills(self, query_embedding: List[float], match_threshold: float = 0.6,
+                              match_count: int = 10) -> List[Dict[str, Any]]:
+        """Find skills similar to a query embedding.
+        
+        Uses the in-process vector index when VECTOR_SEARCH_BACKEND=memory,
+        otherwise (or if the index can't answer, e.g. mid-reprojection) the
+        search_similar_skills database function. Either way only rows
+        embedded with the current model (``embedding_label()``) match.
+        Database errors are raised so callers can choose their own fallback.
+        
+        Args:
+            query_embedding: Query vector
+            match_threshold: Minimum cosine similarity
+            match_count: Number of results
+            
+        Returns:
+            Matching skills with similarity, best first
+        """
+        if use_memory_index():
+            try:
+                return get_vector_index('skills').search(query_embedding, match_threshold, match_count)
+            except Exception as e:
+                print(f"Warning: In-memory skill search failed ({e}), searching the database")
+        
+        result = self.client.rpc(
+            'search_similar_skills',
+            {
+                'query_embedding': query_embedding,
+                'match_threshold': match_threshold,
+                'match_count': match_count,
+                'match_model': embedding_label()
+            }
+        ).execute()
+        return result.data if result.data else []
+    
+    def search_similar_skills_multi(self, query_embeddings: List[List[float]], match_threshold: float = 0.6,
+                                    match_count: int = 10) -> List[Dict[str, Any]]:
+        """Find skills similar to any of several query embeddings in one call.
+        
+        Args:
+            query_embeddings: Query vectors
+            match_threshold: Minimum cosine similarity
+            match_count: Number of results
+            
+        Returns:
+            Union of matches with the best score per skill, best first
+        """
+        if use_memory_index():
+            try:
+                return get_vector_index('skills').search_many(query_embeddings, match_threshold, match_count)
+            except Exception as e:
+                print(f"Warning: In-memory skill search failed ({e}), searching the database")
+        
+        result = self.client.rpc(
+            'search_similar_skills_multi',
+            {
+                'query_embeddings': query_embeddings,
+                'match_threshold': match_threshold,
+                'match_count': match_count,
+                'match_model': embedding_label()
+            }
+        ).execute()
+        return result.data if result.data else []
+    
+    def search_similar_resources(self, query_embedding: List[float], match_threshold: float = 0.6,
+                                 match_count: int = 5) -> List[Dict[str, Any]]:
+        """Find learning resources similar to a query embedding.
+        
+        Args:
+            query_embedding: Query vector
+            match_threshold: Minimum cosine similarity
+            match_count: Number of results
+            
+        Returns:
+            Matching resources with similarity, best first
+        """
+        if use_memory_index():
+            try:
+                return get_vector_index('resources').search(query_embedding, match_threshold, match_count)
+            except Exception as e:
+                print(f"Warning: In-memory resource search failed ({e}), searching the database")
+        
+        result = self.client.rpc(
+            'search_similar_resources',
+            {
+                'query_embedding': query_embedding,
+                'match_threshold': match_threshold,
+                'match_count': match_count,
+                'match_model': embedding_label()
+            }
+        ).execute()
+        return result.data if result.data else []
+    
     # Student Recommendations
     
     def insert_recommendation(self, recommendation: Dict[str, Any]):
@@ -0,0 +1,21 @@
+"""Token counting shared by the embedding and skill extraction pipelines."""
+
+from typing import List
+
+
+# tiktoken encoder, loaded on first use (False when unavailable)
+_token_encoder = None
+
+
+def count_tokens(texts: List[str]) -> int:
+    """Count cl100k_base tokens (tiktoken when available, else ~4 chars per token)."""
+    global _token_encoder
+    if _token_encoder is None:
+        try:
+            import tiktoken
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _token_encoder = False
+    if _token_encoder:
+        return sum(len(_token_encoder.encode(text)) for text in texts)
+    return sum(max(1, len(text) // 4) for text in texts)
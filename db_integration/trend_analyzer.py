@@ -162,10 +162,9 @@ class TrendAnalyzer:
         Returns:
             Category distribution
         """
-        skills = self.db.get_top_skills(limit=100)
-        
+        # Stream the whole catalog; only the category column is needed
         distribution = {}
-        for skill in skills:
+        for skill in self.db.iter_rows('it_skills', 'id, category'):
             category = skill.get('category', 'Other')
             distribution[category] = distribution.get(category, 0) + 1
         
@@ -181,10 +180,7 @@ class TrendAnalyzer:
         Returns:
             Top skills in category
         """
-        all_skills = self.db.get_top_skills(limit=100)
-        
-        category_skills = [s for s in all_skills if s.get('category') == category]
-        return category_skills[:limit]
+        return self.db.get_top_skills(limit=limit, category=category)
     
     def generate_learning_roadmap(self, student_level: str, focus_area: str = None) -> Dict[str, Any]:
         """Generate a personalized learning roadmap.
@@ -5,13 +5,18 @@
 CREATE EXTENSION IF NOT EXISTS vector;
 
 -- Table: resource_embeddings
--- Stores vector embeddings of learning resources for semantic search
+-- Stores vector embeddings of learning resources for semantic search.
+-- For a smaller EMBEDDING_DIMENSIONS, existing tables are converted with
+-- `python manage_vectors.py reproject --dimensions N`
 CREATE TABLE IF NOT EXISTS resource_embeddings (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     resource_id UUID REFERENCES learning_resources(id) ON DELETE CASCADE,
-    embedding vector(1536), -- OpenAI ada-002 embedding dimension
+    embedding vector(1536), -- OpenAI text-embedding-3-small / ada-002 dimension
     content_text TEXT, -- The text that was embedded
+    content_hash TEXT, -- sha256 of the full embedded text (skip unchanged rows)
+    embedding_model TEXT, -- Model that produced the vector
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     UNIQUE(resource_id)
 );
 
@@ -22,10 +27,38 @@ CREATE TABLE IF NOT EXISTS skill_embeddings (
     skill_id UUID REFERENCES it_skills(id) ON DELETE CASCADE,
     embedding vector(1536),
     description_text TEXT,
+    content_hash TEXT,
+    embedding_model TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     UNIQUE(skill_id)
 );
 
+-- Existing installs: add updated_at so in-process vector indexes can refresh
+-- incrementally (VECTOR_SEARCH_BACKEND=memory)
+ALTER TABLE resource_embeddings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE skill_embeddings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+-- Existing installs: track what was embedded so unchanged rows are skipped;
+-- rows without a hash/model are treated as stale and re-embedded once
+ALTER TABLE resource_embeddings ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE resource_embeddings ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+ALTER TABLE skill_embeddings ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE skill_embeddings ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+-- Re-embedding (upsert) bumps updated_at; update_updated_at_column() is defined in schema.sql
+DROP TRIGGER IF EXISTS update_resource_embeddings_updated_at ON resource_embeddings;
+CREATE TRIGGER update_resource_embeddings_updated_at
+BEFORE UPDATE ON resource_embeddings
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_skill_embeddings_updated_at ON skill_embeddings;
+CREATE TRIGGER update_skill_embeddings_updated_at
+BEFORE UPDATE ON skill_embeddings
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
 -- Table: chat_history
 -- Stores conversation history for the chatbot
 CREATE TABLE IF NOT EXISTS chat_history (
@@ -37,7 +70,10 @@ CREATE TABLE IF NOT EXISTS chat_history (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- Create indexes for vector similarity search (using cosine distance)
+-- Create indexes for vector similarity search (using cosine distance).
+-- Initial ivfflat indexes; rebuild as the tables grow, switch to HNSW and tune
+-- probes / ef_search with manage_vectors.py (build-index, set-search-params,
+-- benchmark)
 CREATE INDEX IF NOT EXISTS idx_resource_embeddings_vector 
 ON resource_embeddings USING ivfflat (embedding vector_cosine_ops)
 WITH (lists = 100);
@@ -46,16 +82,29 @@ CREATE INDEX IF NOT EXISTS idx_skill_embeddings_vector
 ON skill_embeddings USING ivfflat (embedding vector_cosine_ops)
 WITH (lists = 100);
 
+-- Indexes for incremental index refresh (rows changed since last load)
+CREATE INDEX IF NOT EXISTS idx_resource_embeddings_updated ON resource_embeddings(updated_at);
+CREATE INDEX IF NOT EXISTS idx_skill_embeddings_updated ON skill_embeddings(updated_at);
+
 -- Index for chat history
 CREATE INDEX IF NOT EXISTS idx_chat_history_session ON chat_history(session_id);
 CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history(created_at DESC);
 
+-- Earlier versions of the search functions had no match_model argument;
+-- drop them so calls are not ambiguous between the two signatures
+DROP FUNCTION IF EXISTS search_similar_resources(vector, float, int);
+DROP FUNCTION IF EXISTS search_similar_skills(vector, float, int);
+DROP FUNCTION IF EXISTS search_similar_skills_multi(jsonb, float, int);
+
 -- Function: search_similar_resources
--- Find resources similar to a query embedding
+-- Find resources similar to a query embedding.
+-- match_model restricts matches to rows embedded with that model label
+-- (embedding_model), so vectors from another model are never compared
 CREATE OR REPLACE FUNCTION search_similar_resources(
     query_embedding vector(1536),
     match_threshold float DEFAULT 0.7,
-    match_count int DEFAULT 5
+    match_count int DEFAULT 5,
+    match_model text DEFAULT NULL
 )
 RETURNS TABLE (
     resource_id UUID,
@@ -77,17 +126,19 @@ BEGIN
     FROM resource_embeddings re
     JOIN learning_resources lr ON re.resource_id = lr.id
     WHERE 1 - (re.embedding <=> query_embedding) > match_threshold
+      AND (match_model IS NULL OR re.embedding_model = match_model)
     ORDER BY re.embedding <=> query_embedding
     LIMIT match_count;
 END;
 $$ LANGUAGE plpgsql;
 
 -- Function: search_similar_skills
--- Find skills similar to a query embedding
+-- Find skills similar to a query embedding (match_model as above)
 CREATE OR REPLACE FUNCTION search_similar_skills(
     query_embedding vector(1536),
     match_threshold float DEFAULT 0.7,
-    match_count int DEFAULT 10
+    match_count int DEFAULT 10,
+    match_model text DEFAULT NULL
 )
 RETURNS TABLE (
     skill_id UUID,
@@ -109,11 +160,73 @@ BEGIN
     FROM skill_embeddings se
     JOIN it_skills s ON se.skill_id = s.id
     WHERE 1 - (se.embedding <=> query_embedding) > match_threshold
+      AND (match_model IS NULL OR se.embedding_model = match_model)
     ORDER BY se.embedding <=> query_embedding
     LIMIT match_count;
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function: search_similar_skills_multi
+-- Search skills for several query embeddings in one call.
+-- query_embeddings is a JSON array of vectors; each query takes its own
+-- nearest neighbours (index-assisted), then the union is deduplicated
+-- keeping the best score per skill. The cast carries no dimension so it
+-- works with reduced-size embeddings. match_model as above.
+CREATE OR REPLACE FUNCTION search_similar_skills_multi(
+    query_embeddings jsonb,
+    match_threshold float DEFAULT 0.7,
+    match_count int DEFAULT 10,
+    match_model text DEFAULT NULL
+)
+RETURNS TABLE (
+    skill_id UUID,
+    skill_name TEXT,
+    category TEXT,
+    difficulty_level TEXT,
+    demand_score INT,
+    similarity float,
+    query_index INT
+) AS $$
+    WITH queries AS (
+        SELECT
+            (q.value::text)::vector AS embedding,
+            (q.ordinality - 1)::int AS query_index
+        FROM jsonb_array_elements(query_embeddings) WITH ORDINALITY AS q(value, ordinality)
+    ),
+    matches AS (
+        SELECT
+            nn.skill_id,
+            1 - nn.distance AS similarity,
+            queries.query_index
+        FROM queries
+        CROSS JOIN LATERAL (
+            SELECT se.skill_id, se.embedding <=> queries.embedding AS distance
+            FROM skill_embeddings se
+            WHERE match_model IS NULL OR se.embedding_model = match_model
+            ORDER BY se.embedding <=> queries.embedding
+            LIMIT match_count
+        ) nn
+        WHERE 1 - nn.distance > match_threshold
+    ),
+    best AS (
+        SELECT DISTINCT ON (m.skill_id) m.skill_id, m.similarity, m.query_index
+        FROM matches m
+        ORDER BY m.skill_id, m.similarity DESC
+    )
+    SELECT
+        s.id,
+        s.skill_name,
+        s.category,
+        s.difficulty_level,
+        s.demand_score,
+        best.similarity,
+        best.query_index
+    FROM best
+    JOIN it_skills s ON s.id = best.skill_id
+    ORDER BY best.similarity DESC
+    LIMIT match_count;
+$$ LANGUAGE sql STABLE;
+
 -- Function: get_skill_with_resources
 -- Get a skill and its related learning resources
 CREATE OR REPLACE FUNCTION get_skill_with_resources(skill_name_param TEXT)
@@ -236,6 +349,7 @@ COMMENT ON TABLE skill_embeddings IS 'Vector embeddings of skills for semantic m
 COMMENT ON TABLE chat_history IS 'Conversation history for the chatbot';
 COMMENT ON FUNCTION search_similar_resources IS 'Semantic search for similar resources using vector embeddings';
 COMMENT ON FUNCTION search_similar_skills IS 'Find similar skills using vector embeddings';
+COMMENT ON FUNCTION search_similar_skills_multi IS 'Find similar skills for several query embeddings in one call (best score per skill)';
 COMMENT ON FUNCTION get_skill_with_resources IS 'Get a skill and all its related learning resources';
 COMMENT ON VIEW chatbot_context IS 'Pre-aggregated context for chatbot responses';
 
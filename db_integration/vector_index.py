@@ -0,0 +1,403 @@
+"""In-process vector index for skill and resource embeddings.
+
+The catalog is only thousands of rows, so an exact top-k over a contiguous
+float32 matrix (one matrix-vector product) is faster than an ivfflat RPC
+round trip. Enabled with VECTOR_SEARCH_BACKEND=memory; VECTOR_INDEX_PRECISION
+stores the matrix as float16 or int8 to cut its memory by 2x or 4x.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import config
+from db_integration.embedding_cache import embedding_label
+
+
+# Index definitions: embedding table, its foreign key, and the catalog
+# columns returned with each match (same shape as the search_similar_* RPCs)
+VECTOR_INDEX_SPECS = {
+    'skills': {
+        'embedding_table': 'skill_embeddings',
+        'key_column': 'skill_id',
+        'metadata_table': 'it_skills',
+        'metadata_columns': ['skill_name', 'category', 'difficulty_level', 'demand_score'],
+    },
+    'resources': {
+        'embedding_table': 'resource_embeddings',
+        'key_column': 'resource_id',
+        'metadata_table': 'learning_resources',
+        'metadata_columns': ['title', 'url', 'description', 'category'],
+    },
+}
+
+# Rows fetched per page while loading
+PAGE_SIZE = 1000
+
+# Storage types for the in-memory matrix
+PRECISIONS = ('float32', 'float16', 'int8')
+
+# Quantized rows are widened to float32 this many at a time while scoring
+SCORE_CHUNK_ROWS = 4096
+
+
+def _parse_vector(value) -> np.ndarray:
+    """Parse a pgvector value (text '[...]' or list) into float32."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def truncate_embeddings(vectors, dimensions: int) -> np.ndarray:
+    """Shorten embeddings to their first ``dimensions`` values and re-normalize.
+    
+    text-embedding-3 vectors are trained so that a normalized prefix matches
+    what the API returns for the ``dimensions`` parameter.
+    
+    Args:
+        vectors: One vector or a 2-D array of row vectors
+        dimensions: Target dimension
+        
+    Returns:
+        float32 array of unit vectors (zero rows stay zero)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)[..., :dimensions]
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def quantize(matrix: np.ndarray, precision: str):
+    """Encode unit row vectors for storage.
+    
+    int8 uses one scale per row (max |value| maps to 127).
+    
+    Returns:
+        (encoded matrix, per-row scales or None)
+    """
+    if precision == 'float16':
+        return matrix.astype(np.float16), None
+    if precision == 'int8':
+        peaks = np.abs(matrix).max(axis=1) if len(matrix) else np.empty(0, dtype=np.float32)
+        scales = (127.0 / np.where(peaks == 0, 1.0, peaks)).astype(np.float32)
+        return np.round(matrix * scales[:, None]).astype(np.int8), scales
+    return np.ascontiguousarray(matrix, dtype=np.float32), None
+
+
+def similarity_scores(matrix: np.ndarray, scales, query: np.ndarray) -> np.ndarray:
+    """Dot products of every stored row with a float32 unit query."""
+    if matrix.dtype == np.float32:
+        return matrix @ query
+    scores = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), SCORE_CHUNK_ROWS):
+        chunk = matrix[start:start + SCORE_CHUNK_ROWS].astype(np.float32)
+        scores[start:start + SCORE_CHUNK_ROWS] = chunk @ query
+    if scales is not None:
+        scores /= scales
+    return scores
+
+
+class InMemoryVectorIndex:
+    """Exact cosine top-k over embeddings held in process memory."""
+
+    def __init__(self, embedding_table: str, key_column: str, metadata_table: str,
+                 metadata_columns: List[str], precision: str = None,
+                 embedding_model: Optional[str] = None):
+        """Initialize an empty index.
+
+        Args:
+            embedding_table: Table holding the vectors (e.g. skill_embeddings)
+            key_column: Column linking a vector to its catalog row (e.g. skill_id)
+            metadata_table: Catalog table (e.g. it_skills)
+            metadata_columns: Catalog columns returned with each match
+            precision: Matrix storage type, one of PRECISIONS
+                (defaults to config.VECTOR_INDEX_PRECISION)
+            embedding_model: Only rows whose ``embedding_model`` equals this
+                label are loaded (defaults to ``embedding_label()`` at refresh time)
+        """
+        self.embedding_table = embedding_table
+        self.key_column = key_column
+        self.metadata_table = metadata_table
+        self.metadata_columns = metadata_columns
+        self.embedding_model = embedding_model
+        self.precision = precision or config.VECTOR_INDEX_PRECISION
+        if self.precision not in PRECISIONS:
+            print(f"Warning: Unknown vector index precision '{self.precision}', using float32")
+            self.precision = 'float32'
+
+        # Searches read (matrix, scales, keys) as one snapshot; refresh swaps it
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._scales = None
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+
+        self._embeddings_seen = None
+        self._loaded_model = None
+        self._metadata_seen = None
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._searches = 0
+        self._refreshes = 0
+
+    def _fetch(self, db, table: str, columns: str, key: str, since=None) -> List[Dict[str, Any]]:
+        """Fetch rows (optionally only those updated at or after ``since``) in pages."""
+        filters = [('updated_at', 'gte', since)] if since is not None else None
+        return list(db.iter_rows(table, columns, key=key, page_size=PAGE_SIZE, filters=filters))
+
+    @staticmethod
+    def _overlap(since):
+        """Move an ``updated_at`` high-water mark back by the refresh overlap.
+
+        Supabase returns timestamps as ISO strings, PostgreSQL as datetimes;
+        the result keeps the same type.
+        """
+        if since is None:
+            return None
+        margin = timedelta(seconds=config.VECTOR_INDEX_REFRESH_OVERLAP_SECONDS)
+        if isinstance(since, str):
+            return (datetime.fromisoformat(since.replace('Z', '+00:00')) - margin).isoformat()
+        return since - margin
+
+    @staticmethod
+    def _latest(rows: List[Dict[str, Any]], current):
+        stamps = [row['updated_at'] for row in rows if row.get('updated_at') is not None]
+        if current is not None:
+            stamps.append(current)
+        return max(stamps) if stamps else None
+
+    def refresh(self, db=None, full: bool = False):
+        """Load the index, or apply rows changed since the last refresh.
+
+        Incremental refreshes pick up new and re-embedded rows via
+        ``updated_at``, re-reading VECTOR_INDEX_REFRESH_OVERLAP_SECONDS behind
+        the newest stamp seen so rows from transactions that committed late
+        are not missed (re-read rows replace their entry by key). A full
+        reload also drops deleted rows.
+
+        Rows embedded with another model are skipped; a model change, a
+        loaded row re-embedded with another model, or a vector whose width
+        differs from the loaded ones (e.g. after ``manage_vectors.py
+        reproject``) forces a full reload.
+
+        Raises:
+            ValueError: A full reload found vectors of different widths
+
+        Args:
+            db: SupabaseManager to read from (created if omitted)
+            full: Reload everything instead of only changed rows
+        """
+        if db is None:
+            from db_integration.supabase_client import SupabaseManager
+            db = SupabaseManager()
+
+        model = self.embedding_model or embedding_label()
+        full = full or not self._loaded_at or model != self._loaded_model
+        embeddings_since = None if full else self._embeddings_seen
+        metadata_since = None if full else self._metadata_seen
+
+        embedding_rows = self._fetch(
+            db, self.embedding_table, f"{self.key_column}, embedding, embedding_model, updated_at",
+            self.key_column, self._overlap(embeddings_since)
+        )
+        metadata_rows = self._fetch(
+            db, self.metadata_table, ', '.join(['id'] + self.metadata_columns + ['updated_at']),
+            'id', self._overlap(metadata_since)
+        )
+
+        # Build the new snapshot outside the lock so searches are not blocked
+        if full:
+            keys, positions, matrix, scales, metadata = [], {}, None, None, {}
+        else:
+            with self._lock:
+                keys, positions, matrix = list(self._keys), dict(self._positions), self._matrix.copy()
+                scales = self._scales.copy() if self._scales is not None else None
+                metadata = dict(self._metadata)
+
+        new_vectors = []
+        for row in embedding_rows:
+            key = str(row[self.key_column])
+            if row.get('embedding_model') != model:
+                if key in positions:
+                    # Can't score it against this model's queries; drop it
+                    return self.refresh(db, full=True)
+                continue
+            if row.get('embedding') is None:
+                continue
+            vector = _parse_vector(row['embedding'])
+            norm = np.linalg.norm(vector)
+            if not norm:
+                continue
+            vector /= norm
+            if matrix is not None and len(matrix) and vector.shape[0] != matrix.shape[1]:
+                return self.refresh(db, full=True)
+            if key in positions:
+                encoded, scale = quantize(vector[None, :], self.precision)
+                matrix[positions[key]] = encoded[0]
+                if scales is not None:
+                    scales[positions[key]] = scale[0]
+            else:
+                positions[key] = len(keys)
+                keys.append(key)
+                new_vectors.append(vector)
+
+        if new_vectors:
+            widths = sorted({vector.shape[0] for vector in new_vectors})
+            if len(widths) > 1:
+                raise ValueError(f"{self.embedding_table} holds vectors of different widths {widths}; "
+                                 f"re-embed or reproject the table")
+            added, added_scales = quantize(np.vstack(new_vectors), self.precision)
+            if matrix is None or not len(matrix):
+                matrix, scales = added, added_scales
+            else:
+                matrix = np.vstack([matrix, added])
+                if scales is not None:
+                    scales = np.concatenate([scales, added_scales])
+        elif matrix is None:
+            matrix = np.empty((0, 0), dtype=np.float32)
+
+        for row in metadata_rows:
+            metadata[str(row['id'])] = {col: row.get(col) for col in self.metadata_columns}
+
+        with self._lock:
+            self._matrix = np.ascontiguousarray(matrix)
+            self._scales = scales
+            self._keys = keys
+            self._positions = positions
+            self._metadata = metadata
+            self._embeddings_seen = self._latest(embedding_rows, embeddings_since)
+            self._loaded_model = model
+            self._metadata_seen = self._latest(metadata_rows, metadata_since)
+
+            now = time.monotonic()
+            self._refreshed_at = now
+            if full:
+                self._loaded_at = now
+            self._refreshes += 1
+
+    def maybe_refresh(self):
+        """Refresh when the configured interval has passed.
+
+        Only one thread refreshes; others keep searching the current snapshot.
+        """
+        now = time.monotonic()
+        if self._loaded_at and now - self._refreshed_at < config.VECTOR_INDEX_REFRESH_SECONDS:
+            return
+        if not self._refresh_lock.acquire(blocking=not self._loaded_at):
+            return
+        try:
+            if self._loaded_at and self._refreshed_at > now:
+                # Another thread finished a refresh while we waited
+                return
+            if not self._loaded_at:
+                # Nothing to serve yet; let errors reach the caller's fallback
+                self.refresh(full=True)
+                return
+            try:
+                self.refresh(full=now - self._loaded_at >= config.VECTOR_INDEX_FULL_RELOAD_SECONDS)
+            except Exception as e:
+                print(f"Warning: Vector index refresh failed ({e}), serving previous snapshot")
+                self._refreshed_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def _top_k(self, matrix: np.ndarray, scales, query_embedding: List[float], count: int):
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm or not len(matrix):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if matrix.shape[1] != query.shape[0]:
+            # Let the caller fall back to the database search
+            raise ValueError(f"Query has {query.shape[0]} dimensions, {self.embedding_table} "
+                             f"index has {matrix.shape[1]}")
+        similarities = similarity_scores(matrix, scales, query / norm)
+        count = min(count, len(similarities))
+        top = np.argpartition(-similarities, count - 1)[:count]
+        top = top[np.argsort(-similarities[top])]
+        return top, similarities[top]
+
+    def search(self, query_embedding: List[float], match_threshold: float = 0.6,
+               match_count: int = 10) -> List[Dict[str, Any]]:
+        """Return the ``match_count`` most similar rows above ``match_threshold``.
+
+        Args:
+            query_embedding: Query vector
+            match_threshold: Minimum cosine similarity
+            match_count: Number of results
+
+        Returns:
+            Rows shaped like the matching search_similar_* RPC, best first
+        """
+        self.maybe_refresh()
+        with self._lock:
+            matrix, scales, keys, metadata = self._matrix, self._scales, self._keys, self._metadata
+            self._searches += 1
+
+        results = []
+        for index, similarity in zip(*self._top_k(matrix, scales, query_embedding, match_count)):
+            if similarity <= match_threshold:
+                break
+            key = keys[index]
+            if key not in metadata:
+                # Catalog row deleted since the last full reload
+                continue
+            results.append({self.key_column: key, **metadata[key], 'similarity': float(similarity)})
+        return results
+
+    def search_many(self, query_embeddings: List[List[float]], match_threshold: float = 0.6,
+                    match_count: int = 10) -> List[Dict[str, Any]]:
+        """Union of ``search`` over several vectors, keeping the best score per row.
+
+        Mirrors the search_similar_skills_multi SQL function (``query_index``
+        is the position of the vector that produced the best score).
+        """
+        best: Dict[str, Dict[str, Any]] = {}
+        for query_index, query_embedding in enumerate(query_embeddings):
+            for row in self.search(query_embedding, match_threshold, match_count):
+                key = row[self.key_column]
+                if key not in best or row['similarity'] > best[key]['similarity']:
+                    best[key] = dict(row, query_index=query_index)
+        return sorted(best.values(), key=lambda x: x['similarity'], reverse=True)[:match_count]
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and refresh counters."""
+        with self._lock:
+            matrix = self._matrix
+            return {
+                'rows': len(self._keys),
+                'dimensions': int(matrix.shape[1]) if matrix.ndim == 2 and len(matrix) else 0,
+                'precision': self.precision,
+                'memory_bytes': int(matrix.nbytes) + (int(self._scales.nbytes) if self._scales is not None else 0),
+                'searches': self._searches,
+                'refreshes': self._refreshes,
+                'seconds_since_refresh': round(time.monotonic() - self._refreshed_at, 1) if self._refreshed_at else None
+            }
+
+
+# Shared indexes (one per kind per process)
+_vector_indexes: Dict[str, InMemoryVectorIndex] = {}
+_vector_indexes_lock = threading.Lock()
+
+
+def get_vector_index(kind: str) -> InMemoryVectorIndex:
+    """Get or create the process-wide index for ``'skills'`` or ``'resources'``.
+
+    Returns:
+        Shared InMemoryVectorIndex (loaded lazily on first search)
+    """
+    if kind not in _vector_indexes:
+        with _vector_indexes_lock:
+            if kind not in _vector_indexes:
+                _vector_indexes[kind] = InMemoryVectorIndex(**VECTOR_INDEX_SPECS[kind])
+    return _vector_indexes[kind]
+
+
+def use_memory_index() -> bool:
+    """Whether semantic search should use the in-process index."""
+    return config.VECTOR_SEARCH_BACKEND == 'memory'
@@ -0,0 +1,369 @@
+"""Maintenance operations on the pgvector embedding tables.
+
+These run DDL, so they need a direct PostgreSQL connection (DB_HOST etc.;
+on Supabase, point them at the project's database host).
+"""
+
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from db_integration.database_adapter import get_connection_pool
+from db_integration.vector_index import truncate_embeddings
+
+
+# Embedding tables and the vector index defined for each in vector_embeddings.sql
+EMBEDDING_TABLES = {
+    'skill_embeddings': 'idx_skill_embeddings_vector',
+    'resource_embeddings': 'idx_resource_embeddings_vector',
+}
+
+# Search functions (identity signatures) that read each table's index
+SEARCH_FUNCTIONS = {
+    'skill_embeddings': [
+        'search_similar_skills(vector, double precision, integer, text)',
+        'search_similar_skills_multi(jsonb, double precision, integer, text)',
+    ],
+    'resource_embeddings': [
+        'search_similar_resources(vector, double precision, integer, text)',
+    ],
+}
+
+INDEX_METHODS = ('ivfflat', 'hnsw')
+
+# Query-time setting for each index method
+SEARCH_SETTINGS = {'ivfflat': 'ivfflat.probes', 'hnsw': 'hnsw.ef_search'}
+
+# Rows re-projected per UPDATE statement
+REPROJECT_BATCH_SIZE = 500
+
+
+def column_dimensions(cursor, table: str) -> Optional[int]:
+    """Declared dimension of ``table.embedding`` (None if unconstrained)."""
+    cursor.execute(
+        "SELECT atttypmod FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'embedding'",
+        (table,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"{table} has no embedding column")
+    return row[0] if row[0] > 0 else None
+
+
+def _vector_literal(vector) -> str:
+    return '[' + ','.join(f'{value:.7g}' for value in vector) + ']'
+
+
+def reproject_table(conn, table: str, dimensions: int, batch_size: int = REPROJECT_BATCH_SIZE) -> int:
+    """Shorten every embedding in ``table`` to ``dimensions`` in one transaction.
+    
+    Drops the table's vector index, relaxes the column type, rewrites each
+    vector as its re-normalized prefix (tagging ``embedding_model`` with
+    ``@dimensions``), narrows the column to ``vector(dimensions)`` and
+    recreates the index with its original definition.
+    
+    Args:
+        conn: psycopg2 connection (committed on success, rolled back on error)
+        table: Embedding table
+        dimensions: Target dimension (must not exceed the current one)
+        batch_size: Rows per UPDATE
+        
+    Returns:
+        Number of rows rewritten
+    """
+    index_name = EMBEDDING_TABLES[table]
+    try:
+        with conn.cursor() as cur:
+            current = column_dimensions(cur, table)
+            if current is not None and dimensions > current:
+                raise ValueError(
+                    f"{table} holds {current}-d vectors; cannot widen to {dimensions} "
+                    "(regenerate embeddings instead)"
+                )
+            
+            cur.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", (index_name,))
+            row = cur.fetchone()
+            index_definition = row[0] if row else None
+            
+            cur.execute(f"DROP INDEX IF EXISTS {index_name}")
+            cur.execute(f"ALTER TABLE {table} ALTER COLUMN embedding TYPE vector")
+        
+        # Stream with a server-side cursor; updates go through a second cursor
+        # on the same connection and transaction
+        count = 0
+        reader = conn.cursor(name=f"reproject_{table}")
+        reader.itersize = batch_size
+        reader.execute(f"SELECT id, embedding::text FROM {table} WHERE embedding IS NOT NULL")
+        with conn.cursor() as writer:
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                vectors = truncate_embeddings([json.loads(embedding) for _, embedding in rows], dimensions)
+                execute_values(
+                    writer,
+                    f"""UPDATE {table} AS t
+                        SET embedding = v.embedding::vector,
+                            embedding_model = split_part(t.embedding_model, '@', 1) || '@{dimensions}'
+                        FROM (VALUES %s) AS v(id, embedding)
+                        WHERE t.id = v.id::uuid""",
+                    [(str(row_id), _vector_literal(vector)) for (row_id, _), vector in zip(rows, vectors)]
+                )
+                count += len(rows)
+        reader.close()
+        
+        with conn.cursor() as cur:
+            cur.execute(f"ALTER TABLE {table} ALTER COLUMN embedding TYPE vector({dimensions})")
+            if index_definition:
+                cur.execute(index_definition)
+        conn.commit()
+        return count
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def reproject_embeddings(dimensions: int, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """Re-project stored embeddings to a smaller dimension.
+    
+    Valid for text-embedding-3 models, whose normalized prefixes equal what
+    the API returns for ``dimensions``; set EMBEDDING_DIMENSIONS to the same
+    value so new query and document embeddings match.
+    
+    Args:
+        dimensions: Target dimension
+        tables: Embedding tables to convert (default: all)
+        
+    Returns:
+        Rows rewritten per table
+    """
+    pool = get_connection_pool()
+    results = {}
+    for table in tables or list(EMBEDDING_TABLES):
+        start = time.perf_counter()
+        with pool.connection() as conn:
+            results[table] = reproject_table(conn, table, dimensions)
+        print(f"[OK] {table}: {results[table]} rows re-projected to {dimensions} dimensions "
+              f"in {time.perf_counter() - start:.1f}s")
+    return results
+
+
+def default_lists(rows: int) -> int:
+    """pgvector's suggested ivfflat ``lists``: rows/1000 up to 1M rows, sqrt(rows) above."""
+    if rows > 1_000_000:
+        return int(rows ** 0.5)
+    return max(10, rows // 1000)
+
+
+def build_vector_index(table: str, method: str = 'ivfflat', lists: Optional[int] = None,
+                       m: int = 16, ef_construction: int = 64) -> Dict[str, Any]:
+    """Drop and rebuild the cosine vector index on ``table``.
+    
+    ivfflat centroids are computed from the rows present at build time, so
+    rebuild after the table has grown substantially. HNSW needs no rebuild
+    for growth but builds more slowly and uses more memory.
+    
+    Args:
+        table: Embedding table
+        method: 'ivfflat' or 'hnsw'
+        lists: ivfflat list count (default: ``default_lists(row count)``)
+        m: HNSW connections per node
+        ef_construction: HNSW build-time candidate list size
+        
+    Returns:
+        Index name, method, parameters, size and build time
+    """
+    if table not in EMBEDDING_TABLES:
+        raise ValueError(f"Unknown embedding table: {table}")
+    if method not in INDEX_METHODS:
+        raise ValueError(f"Unknown index method: {method}")
+    
+    index_name = EMBEDDING_TABLES[table]
+    start = time.perf_counter()
+    with get_connection_pool().cursor() as cur:
+        if method == 'ivfflat':
+            if lists is None:
+                cur.execute(f"SELECT COUNT(*) AS rows FROM {table} WHERE embedding IS NOT NULL")
+                lists = default_lists(cur.fetchone()['rows'])
+            parameters = {'lists': int(lists)}
+        else:
+            parameters = {'m': int(m), 'ef_construction': int(ef_construction)}
+        options = ', '.join(f"{name} = {value}" for name, value in parameters.items())
+        
+        cur.execute(f"DROP INDEX IF EXISTS {index_name}")
+        cur.execute(
+            f"CREATE INDEX {index_name} ON {table} "
+            f"USING {method} (embedding vector_cosine_ops) WITH ({options})"
+        )
+        cur.execute("SELECT pg_relation_size(%s::regclass) AS size", (index_name,))
+        size = cur.fetchone()['size']
+    
+    return {
+        'index': index_name,
+        'method': method,
+        'parameters': parameters,
+        'size_bytes': size,
+        'build_seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+def set_search_params(probes: Optional[int] = None, ef_search: Optional[int] = None,
+                      tables: Optional[List[str]] = None) -> List[str]:
+    """Attach ``ivfflat.probes`` / ``hnsw.ef_search`` to the search functions.
+    
+    Settings are stored on the functions (``ALTER FUNCTION ... SET``), so they
+    apply to every call, pooled or through Supabase RPC, without a per-session
+    SET. Pass 0 to reset a setting to the server default.
+    
+    Args:
+        probes: ivfflat lists scanned per query (higher = better recall, slower)
+        ef_search: HNSW candidate list size per query
+        tables: Restrict to the functions reading these tables (default: all)
+        
+    Returns:
+        Statements executed
+    """
+    changes = [(setting, value) for setting, value in
+               ((SEARCH_SETTINGS['ivfflat'], probes), (SEARCH_SETTINGS['hnsw'], ef_search))
+               if value is not None]
+    statements = []
+    for table in tables or list(SEARCH_FUNCTIONS):
+        for function in SEARCH_FUNCTIONS[table]:
+            for setting, value in changes:
+                if value:
+                    statements.append(f"ALTER FUNCTION {function} SET {setting} = {int(value)}")
+                else:
+                    statements.append(f"ALTER FUNCTION {function} RESET {setting}")
+    
+    with get_connection_pool().cursor() as cur:
+        for statement in statements:
+            cur.execute(statement)
+    return statements
+
+
+def vector_index_status() -> Dict[str, Dict[str, Any]]:
+    """Current index definition, size and row count per table, plus function settings."""
+    status = {}
+    with get_connection_pool().connection() as conn, conn.cursor() as cur:
+        for table, index_name in EMBEDDING_TABLES.items():
+            cur.execute(f"SELECT COUNT(*) FROM {table}")
+            rows = cur.fetchone()[0]
+            cur.execute(
+                "SELECT indexdef, pg_relation_size(indexname::regclass) "
+                "FROM pg_indexes WHERE indexname = %s",
+                (index_name,)
+            )
+            index = cur.fetchone()
+            settings = {}
+            for function in SEARCH_FUNCTIONS[table]:
+                cur.execute("SELECT proconfig FROM pg_proc WHERE oid = to_regprocedure(%s)", (function,))
+                config_row = cur.fetchone()
+                settings[function.split('(')[0]] = (config_row[0] if config_row else None) or []
+            status[table] = {
+                'rows': rows,
+                'dimensions': column_dimensions(cur, table),
+                'index': index[0] if index else None,
+                'index_size_bytes': index[1] if index else 0,
+                'function_settings': settings
+            }
+        conn.rollback()
+    return status
+
+
+def _index_method(cur, table: str) -> Optional[str]:
+    cur.execute(
+        "SELECT am.amname FROM pg_class c JOIN pg_am am ON am.oid = c.relam WHERE c.relname = %s",
+        (EMBEDDING_TABLES[table],)
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def benchmark_search(table: str, values: List[int], k: int = 10, queries: int = 100,
+                     noise: float = 0.01, seed: int = 0) -> Dict[str, Any]:
+    """Measure recall@k and latency of indexed search for several settings.
+    
+    Queries are stored vectors with small random noise. Ground truth comes
+    from exact search (index scans disabled). Each value in ``values`` is
+    applied as ``ivfflat.probes`` or ``hnsw.ef_search`` depending on the
+    current index.
+    
+    Args:
+        table: Embedding table
+        values: probes / ef_search values to try
+        k: Neighbours per query
+        queries: Number of queries
+        noise: Standard deviation of per-component query noise
+        seed: Random seed for query selection
+        
+    Returns:
+        Index method, setting name, exact-search latency and one result per value
+    """
+    if table not in EMBEDDING_TABLES:
+        raise ValueError(f"Unknown embedding table: {table}")
+    
+    pool = get_connection_pool()
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                method = _index_method(cur, table)
+                if method not in SEARCH_SETTINGS:
+                    raise ValueError(f"{table} has no ivfflat or hnsw index; run build-index first")
+                setting = SEARCH_SETTINGS[method]
+                
+                cur.execute(
+                    f"SELECT embedding::text FROM {table} WHERE embedding IS NOT NULL "
+                    "ORDER BY random() LIMIT %s", (queries,)
+                )
+                samples = [json.loads(row[0]) for row in cur.fetchall()]
+                if not samples:
+                    raise ValueError(f"{table} has no embeddings")
+                rng = np.random.default_rng(seed)
+                vectors = np.asarray(samples, dtype=np.float32)
+                vectors = vectors[rng.integers(0, len(vectors), size=queries)]
+                vectors += rng.normal(0, noise, size=vectors.shape).astype(np.float32)
+                literals = [_vector_literal(vector) for vector in vectors]
+                
+                search = f"SELECT id FROM {table} ORDER BY embedding <=> %s::vector LIMIT {int(k)}"
+                
+                def run(configure: str):
+                    cur.execute(configure)
+                    found, durations = [], []
+                    for literal in literals:
+                        start = time.perf_counter()
+                        cur.execute(search, (literal,))
+                        found.append({row[0] for row in cur.fetchall()})
+                        durations.append((time.perf_counter() - start) * 1000)
+                    return found, durations
+                
+                exact, exact_ms = run("SET LOCAL enable_indexscan = off")
+                cur.execute("SET LOCAL enable_indexscan = on")
+                
+                results = []
+                for value in values:
+                    found, durations = run(f"SET LOCAL {setting} = {int(value)}")
+                    recall = statistics.mean(
+                        len(truth & hits) / max(1, len(truth)) for truth, hits in zip(exact, found)
+                    )
+                    results.append({
+                        'value': value,
+                        'recall': round(recall, 4),
+                        'mean_ms': round(statistics.mean(durations), 3),
+                        'p95_ms': round(sorted(durations)[int(0.95 * (len(durations) - 1))], 3)
+                    })
+        finally:
+            conn.rollback()
+    
+    return {
+        'table': table,
+        'method': method,
+        'setting': setting,
+        'k': k,
+        'queries': queries,
+        'exact_mean_ms': round(statistics.mean(exact_ms), 3),
+        'results': results
+    }
@@ -26,14 +26,53 @@ function Chat({ studentLevel }) {
     setLoading(true);
 
     try {
-      const response = await api.chat({
+      const response = await api.chatStream({
         message: input,
         student_level: studentLevel
       });
+      if (!response.ok || !response.body) {
+        throw new Error(`Stream failed: ${response.status}`);
+      }
 
-      const data = await response.json();
-      const botMessage = { role: 'assistant', content: data.response };
-      setMessages(prev => [...prev, botMessage]);
+      // Read Server-Sent Events: "node" progress, then "token" chunks, then "done"
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let started = false;
+
+      const appendToken = (text) => {
+        if (!started) {
+          started = true;
+          setLoading(false);
+          setMessages(prev => [...prev, { role: 'assistant', content: text }]);
+        } else {
+          setMessages(prev => {
+            const updated = [...prev];
+            const last = updated[updated.length - 1];
+            updated[updated.length - 1] = { ...last, content: last.content + text };
+            return updated;
+          });
+        }
+      };
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+          const dataLine = raw.split('\n').find(line => line.startsWith('data: '));
+          if (!dataLine) continue;
+          const event = JSON.parse(dataLine.slice(6));
+          if (event.event === 'token') {
+            appendToken(event.content);
+          } else if (event.event === 'error' && !started) {
+            appendToken(`I'm sorry, I'm having trouble processing your request right now. Error: ${event.message}`);
+          }
+        }
+      }
     } catch (error) {
       const errorMessage = { 
         role: 'assistant', 
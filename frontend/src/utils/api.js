@@ -25,6 +25,13 @@ export const api = {
     body: JSON.stringify(data)
   }),
 
+  // Chat with Server-Sent Events (progress + token stream)
+  chatStream: (data) => fetch(`${API_BASE_URL}/api/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+    body: JSON.stringify(data)
+  }),
+
   // Health
   health: () => fetch(`${API_BASE_URL}/api/health`),
 
@@ -0,0 +1,150 @@
+"""Maintenance commands for the pgvector embedding tables.
+
+Usage:
+    python manage_vectors.py status
+    python manage_vectors.py build-index --method hnsw --m 16 --ef-construction 64
+    python manage_vectors.py build-index --method ivfflat [--lists 100] [--table skill_embeddings]
+    python manage_vectors.py set-search-params --probes 10 --ef-search 40
+    python manage_vectors.py benchmark --table skill_embeddings --values 1,5,10,20 --k 10
+    python manage_vectors.py reproject --dimensions 512 [--table skill_embeddings]
+"""
+
+import argparse
+import sys
+
+import config
+from db_integration.vector_maintenance import (
+    EMBEDDING_TABLES, INDEX_METHODS, benchmark_search, build_vector_index,
+    reproject_embeddings, set_search_params, vector_index_status
+)
+
+
+def status(args) -> int:
+    """Print index definitions, sizes and search-function settings."""
+    for table, info in vector_index_status().items():
+        print(f"\n{table}: {info['rows']} rows, {info['dimensions'] or 'unsized'} dimensions")
+        print(f"  index: {info['index'] or '(none)'}")
+        print(f"  index size: {info['index_size_bytes'] / 1024:.1f} KB")
+        for function, settings in info['function_settings'].items():
+            print(f"  {function}: {', '.join(settings) or 'server defaults'}")
+    return 0
+
+
+def build_index(args) -> int:
+    """Drop and rebuild vector indexes."""
+    for table in args.table or list(EMBEDDING_TABLES):
+        try:
+            result = build_vector_index(table, args.method, lists=args.lists,
+                                        m=args.m, ef_construction=args.ef_construction)
+        except Exception as e:
+            print(f"[ERROR] Could not build index on {table}: {e}")
+            return 1
+        parameters = ', '.join(f"{k}={v}" for k, v in result['parameters'].items())
+        print(f"[OK] {result['index']}: {result['method']} ({parameters}), "
+              f"{result['size_bytes'] / 1024:.1f} KB in {result['build_seconds']}s")
+    return 0
+
+
+def search_params(args) -> int:
+    """Store probes / ef_search on the search functions."""
+    if args.probes is None and args.ef_search is None:
+        print("[ERROR] Pass --probes and/or --ef-search (0 resets to the server default)")
+        return 1
+    try:
+        statements = set_search_params(args.probes, args.ef_search, args.table)
+    except Exception as e:
+        print(f"[ERROR] Could not update search functions: {e}")
+        return 1
+    for statement in statements:
+        print(f"[OK] {statement}")
+    return 0
+
+
+def benchmark(args) -> int:
+    """Print recall@k and latency for each probes / ef_search value."""
+    values = [int(value) for value in args.values.split(',') if value.strip()]
+    try:
+        report = benchmark_search(args.table, values, k=args.k, queries=args.queries)
+    except Exception as e:
+        print(f"[ERROR] Benchmark failed: {e}")
+        return 1
+    
+    print("\n" + "="*80)
+    print(f"{report['table']}: {report['method']} recall@{report['k']} vs exact search "
+          f"({report['queries']} queries)")
+    print("="*80)
+    print(f"  exact search: mean {report['exact_mean_ms']:.3f} ms")
+    print(f"\n  {report['setting']:>16} {'recall':>8} {'mean ms':>9} {'p95 ms':>9}")
+    for row in report['results']:
+        print(f"  {row['value']:>16} {row['recall']:>8.3f} {row['mean_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+    return 0
+
+
+def reproject(args) -> int:
+    """Shorten stored embeddings to ``--dimensions``."""
+    if args.dimensions <= 0:
+        print("[ERROR] --dimensions must be positive")
+        return 1
+    if config.EMBEDDING_DIMENSIONS != args.dimensions:
+        print(f"Note: set EMBEDDING_DIMENSIONS={args.dimensions} so new embeddings match "
+              f"(currently {config.EMBEDDING_DIMENSIONS or 'model default'})")
+    
+    try:
+        reproject_embeddings(args.dimensions, args.table)
+    except Exception as e:
+        print(f"\n[ERROR] Re-projection failed (no changes kept for the failing table): {e}")
+        return 1
+    
+    print("\nRe-run db_integration/vector_embeddings.sql if search_similar_skills_multi "
+          "was created before reduced dimensions were supported.")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Parse arguments and run a maintenance command."""
+    parser = argparse.ArgumentParser(description="Manage pgvector embedding tables")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    def add_table_option(command_parser, help_text="Table (repeatable; default: all)"):
+        command_parser.add_argument('--table', action='append', choices=sorted(EMBEDDING_TABLES),
+                                    help=help_text)
+    
+    status_parser = commands.add_parser('status', help="Show vector indexes and search settings")
+    status_parser.set_defaults(handler=status)
+    
+    build_parser = commands.add_parser('build-index', help="Build or rebuild ivfflat/HNSW indexes")
+    build_parser.add_argument('--method', choices=INDEX_METHODS, default='ivfflat')
+    build_parser.add_argument('--lists', type=int, help="ivfflat lists (default: rows/1000, min 10)")
+    build_parser.add_argument('--m', type=int, default=16, help="HNSW connections per node")
+    build_parser.add_argument('--ef-construction', type=int, default=64, help="HNSW build candidate list")
+    add_table_option(build_parser)
+    build_parser.set_defaults(handler=build_index)
+    
+    params_parser = commands.add_parser('set-search-params',
+                                        help="Set probes / ef_search used by the search_similar_* functions")
+    params_parser.add_argument('--probes', type=int, help="ivfflat.probes (0 resets)")
+    params_parser.add_argument('--ef-search', type=int, help="hnsw.ef_search (0 resets)")
+    add_table_option(params_parser, "Only functions searching this table (repeatable; default: all)")
+    params_parser.set_defaults(handler=search_params)
+    
+    benchmark_parser = commands.add_parser('benchmark', help="Recall@k vs latency against exact search")
+    benchmark_parser.add_argument('--table', choices=sorted(EMBEDDING_TABLES), default='skill_embeddings')
+    benchmark_parser.add_argument('--values', default='1,2,5,10,20,40',
+                                  help="Comma-separated probes (ivfflat) or ef_search (HNSW) values")
+    benchmark_parser.add_argument('--k', type=int, default=10)
+    benchmark_parser.add_argument('--queries', type=int, default=100)
+    benchmark_parser.set_defaults(handler=benchmark)
+    
+    reproject_parser = commands.add_parser(
+        'reproject', help="Shorten stored text-embedding-3 vectors to a smaller dimension"
+    )
+    reproject_parser.add_argument('--dimensions', type=int, required=True, help="Target dimension")
+    add_table_option(reproject_parser, "Table to convert (repeatable; default: all)")
+    reproject_parser.set_defaults(handler=reproject)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
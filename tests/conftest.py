@@ -0,0 +1,28 @@
+"""Shared pytest fixtures.
+
+Database tests run against the Docker PostgreSQL backend configured through
+DB_HOST/DB_NAME/DB_USER/DB_PASSWORD and are skipped when it is unreachable.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def postgres_pool():
+    """Shared sync connection pool, or skip when PostgreSQL is unavailable."""
+    if os.getenv('USE_SUPABASE', 'false').lower() == 'true':
+        pytest.skip("needs the Docker PostgreSQL backend (USE_SUPABASE=false)")
+    from db_integration.database_adapter import close_connection_pool, get_connection_pool
+    try:
+        pool = get_connection_pool()
+        with pool.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except Exception as e:
+        pytest.skip(f"PostgreSQL unavailable: {e}")
+    yield pool
+    close_connection_pool()
@@ -0,0 +1,146 @@
+"""SQL and upsert deduplication of the multi-row insert builder."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from db_integration.database_adapter import PostgresInsertBuilder
+from db_integration.supabase_client import SupabaseManager
+
+
+def _groups(rows, operation='upsert', on_conflict=None):
+    builder = PostgresInsertBuilder(None, 'it_skills', rows, operation, on_conflict)
+    return builder._row_groups(rows)
+
+
+def test_upsert_keeps_last_duplicate_in_first_position():
+    rows = [
+        {'id': 1, 'skill_name': 'Python'},
+        {'id': 2, 'skill_name': 'Rust'},
+        {'id': 1, 'skill_name': 'Python 3'},
+    ]
+
+    assert _groups(rows) == {('id', 'skill_name'): [
+        {'id': 1, 'skill_name': 'Python 3'},
+        {'id': 2, 'skill_name': 'Rust'},
+    ]}
+
+
+def test_upsert_keeps_rows_without_conflict_values():
+    rows = [
+        {'skill_name': 'Python'},
+        {'skill_name': 'Rust'},
+        {'id': None, 'skill_name': 'Go'},
+        {'id': None, 'skill_name': 'Java'},
+    ]
+
+    groups = _groups(rows)
+
+    assert groups[('skill_name',)] == rows[:2]
+    assert groups[('id', 'skill_name')] == rows[2:]
+
+
+def test_upsert_dedup_uses_all_conflict_columns():
+    rows = [
+        {'skill_id': 1, 'resource_id': 1, 'relevance_score': 0.1},
+        {'skill_id': 1, 'resource_id': 2, 'relevance_score': 0.2},
+        {'skill_id': 1, 'resource_id': 1, 'relevance_score': 0.3},
+        {'skill_id': 1, 'resource_id': None, 'relevance_score': 0.4},
+    ]
+
+    groups = _groups(rows, on_conflict='skill_id, resource_id')
+
+    assert [row['relevance_score'] for row in groups[('skill_id', 'resource_id', 'relevance_score')]] == \
+        [0.3, 0.2, 0.4]
+
+
+def test_upsert_default_conflict_column_is_url_when_present():
+    rows = [{'url': 'a', 'title': 'x'}, {'url': 'a', 'title': 'y'}, {'url': None, 'title': 'z'}]
+
+    assert _groups(rows)[('url', 'title')] == rows[1:]
+
+
+def test_insert_does_not_deduplicate():
+    rows = [{'id': 1}, {'id': 1}]
+
+    assert _groups(rows, operation='insert') == {('id',): rows}
+
+
+def test_rows_grouped_by_column_set_in_first_seen_order():
+    rows = [{'id': 1, 'a': 1}, {'id': 2}, {'id': 3, 'a': 3}]
+
+    assert list(_groups(rows).items()) == [
+        (('id', 'a'), [rows[0], rows[2]]),
+        (('id',), [rows[1]]),
+    ]
+
+
+def test_group_statement_sql():
+    builder = PostgresInsertBuilder(None, 'learning_resources', [], 'upsert', 'url')
+
+    sql = builder._group_statement(('url', 'title'))
+
+    assert sql == ("INSERT INTO learning_resources (url, title) VALUES %s "
+                   "ON CONFLICT (url) DO UPDATE SET title = EXCLUDED.title RETURNING *")
+
+
+def test_group_statement_without_updatable_columns_does_nothing_on_conflict():
+    builder = PostgresInsertBuilder(None, 'skill_resources', [], 'upsert', 'skill_id,resource_id')
+
+    sql = builder._group_statement(('skill_id', 'resource_id'), '(%s, %s)')
+
+    assert sql == ("INSERT INTO skill_resources (skill_id, resource_id) VALUES (%s, %s) "
+                   "ON CONFLICT (skill_id, resource_id) DO NOTHING RETURNING *")
+
+
+def test_single_row_insert_statement():
+    builder = PostgresInsertBuilder(None, 'it_skills', {'skill_name': 'Python', 'meta': {'a': 1}}, 'insert')
+
+    query, values = builder._statement()
+
+    assert query == "INSERT INTO it_skills (skill_name, meta) VALUES (%s, %s) RETURNING *"
+    assert values[0] == 'Python'
+    assert values[1].adapted == {'a': 1}
+
+
+def test_bulk_insert_resources_keeps_resources_without_url(monkeypatch):
+    manager = object.__new__(SupabaseManager)
+    written = {}
+
+    def bulk_write(table, rows, on_conflict=None):
+        written['rows'] = rows
+        return rows
+
+    monkeypatch.setattr(manager, '_bulk_write', bulk_write, raising=False)
+    manager.bulk_insert_resources([
+        {'title': 'a', 'url': 'https://x'},
+        {'title': 'b'},
+        {'title': 'c', 'url': 'https://x'},
+        {'title': 'd', 'url': None},
+    ])
+
+    assert [row['title'] for row in written['rows']] == ['c', 'b', 'd']
+
+
+def test_async_insert_splits_large_groups(monkeypatch):
+    from db_integration import async_database_adapter
+    from db_integration.async_database_adapter import AsyncPostgresInsertBuilder
+
+    statements = []
+
+    @asynccontextmanager
+    async def cursor(pool):
+        yield None
+
+    async def execute(cursor, table, query, values):
+        statements.append(len(values))
+        return [(value,) for value in values], ['id']
+
+    monkeypatch.setattr(async_database_adapter, '_cursor', cursor)
+    monkeypatch.setattr(async_database_adapter, '_execute', execute)
+    monkeypatch.setattr(AsyncPostgresInsertBuilder, 'ROWS_PER_STATEMENT', 2)
+    rows = [{'id': i} for i in range(5)]
+
+    result = asyncio.run(AsyncPostgresInsertBuilder(None, 'it_skills', rows, 'insert')._execute_many(rows))
+
+    assert statements == [2, 2, 1]
+    assert [row['id'] for row in result.data] == [0, 1, 2, 3, 4]
@@ -0,0 +1,82 @@
+"""Results stay intact when a query is re-run under EXPLAIN for the stats."""
+
+import asyncio
+
+import pytest
+
+from db_integration import query_stats
+from db_integration.query_stats import QueryStats
+
+
+TABLE = 'test_query_explain'
+
+
+@pytest.fixture
+def explain_everything(monkeypatch):
+    """Collector that captures a plan for every SELECT."""
+    stats = QueryStats(slow_threshold_ms=1e9, explain_threshold_ms=1e-9)
+    monkeypatch.setattr(query_stats.config, 'QUERY_STATS_ENABLED', True)
+    monkeypatch.setattr(query_stats, '_query_stats', stats)
+    return stats
+
+
+@pytest.fixture
+def table(postgres_pool):
+    with postgres_pool.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(f"CREATE TABLE {TABLE} (id text PRIMARY KEY, skill_name text, category text)")
+        cursor.execute(f"INSERT INTO {TABLE} VALUES ('a1', 'Python', 'AI'), ('a2', 'Rust', 'Programming')")
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {TABLE}_by_category(wanted text)
+            RETURNS TABLE (id text, skill_name text) LANGUAGE sql STABLE AS
+            $$ SELECT id, skill_name FROM {TABLE} WHERE category = wanted $$
+        """)
+    yield TABLE
+    with postgres_pool.cursor() as cursor:
+        cursor.execute(f"DROP FUNCTION {TABLE}_by_category(text)")
+        cursor.execute(f"DROP TABLE {TABLE}")
+
+
+def _plans(stats):
+    return [s['plan'] for s in stats.snapshot()['statements'] if s['plan']]
+
+
+def test_select_data_after_explain(table, explain_everything):
+    from db_integration.database_adapter import DatabaseAdapter
+
+    result = DatabaseAdapter().table(table).select('id, skill_name, category').order('id').execute()
+
+    assert result.columns == ['id', 'skill_name', 'category']
+    assert result.data == [
+        {'id': 'a1', 'skill_name': 'Python', 'category': 'AI'},
+        {'id': 'a2', 'skill_name': 'Rust', 'category': 'Programming'},
+    ]
+    assert _plans(explain_everything)
+
+
+def test_rpc_data_after_explain(table, explain_everything):
+    from db_integration.database_adapter import DatabaseAdapter
+
+    result = DatabaseAdapter().rpc(f'{table}_by_category', {'wanted': 'AI'}).execute()
+
+    assert result.data == [{'id': 'a1', 'skill_name': 'Python'}]
+    assert _plans(explain_everything)
+
+
+def test_async_select_data_after_explain(table, explain_everything):
+    from db_integration.async_database_adapter import close_async_connection_pool, get_async_database
+
+    async def run():
+        try:
+            db = await get_async_database()
+            return await db.table(table).select('id, skill_name').eq('id', 'a1').execute()
+        finally:
+            await close_async_connection_pool()
+
+    try:
+        result = asyncio.run(run())
+    except ImportError as e:
+        pytest.skip(f"async adapter unavailable: {e}")
+
+    assert result.data == [{'id': 'a1', 'skill_name': 'Python'}]
+    assert _plans(explain_everything)
@@ -0,0 +1,64 @@
+"""Statement normalization and aggregation in the query statistics."""
+
+import pytest
+
+from db_integration.query_stats import QueryStats, is_select, normalize_sql
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("SELECT *  FROM it_skills\n WHERE id = %s", "SELECT * FROM it_skills WHERE id = ?"),
+    ("SELECT * FROM t WHERE name = 'O''Brien' AND score > 0.5 LIMIT 10",
+     "SELECT * FROM t WHERE name = ? AND score > ? LIMIT ?"),
+    ("SELECT * FROM t WHERE id IN (%s, %s, %s)", "SELECT * FROM t WHERE id IN (...)"),
+    ("INSERT INTO t (a, b) VALUES %s RETURNING *", "INSERT INTO t (a, b) VALUES (...) RETURNING *"),
+    ("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s) RETURNING *",
+     "INSERT INTO t (a, b) VALUES (...) RETURNING *"),
+    ("SELECT * FROM search_similar_skills(match_count => %s)",
+     "SELECT * FROM search_similar_skills(match_count => ?)"),
+])
+def test_normalize_sql(query, expected):
+    assert normalize_sql(query) == expected
+
+
+def test_normalize_sql_keeps_identifiers_with_digits():
+    assert normalize_sql("SELECT col1, t2.x FROM table_2") == "SELECT col1, t2.x FROM table_2"
+
+
+def test_lists_of_different_lengths_share_a_statement():
+    stats = QueryStats(slow_threshold_ms=1e9)
+    stats.record('t', "SELECT * FROM t WHERE id IN (%s)", 1, 0.001)
+    stats.record('t', "SELECT * FROM t WHERE id IN (%s, %s, %s)", 3, 0.003)
+
+    statements = stats.snapshot()['statements']
+
+    assert len(statements) == 1
+    assert statements[0]['calls'] == 2
+    assert statements[0]['rows'] == 4
+
+
+def test_is_select():
+    assert is_select("  select 1")
+    assert not is_select("INSERT INTO t VALUES (1)")
+
+
+def test_explain_requested_once_per_interval_for_slow_selects():
+    stats = QueryStats(slow_threshold_ms=1e9, explain_threshold_ms=10)
+
+    assert not stats.record('t', "SELECT * FROM t", 1, 0.001)
+    assert stats.record('t', "SELECT * FROM t", 1, 0.050)
+    assert not stats.record('t', "SELECT * FROM t", 1, 0.050)
+    assert not stats.record('t', "UPDATE t SET a = 1", 1, 0.050)
+    assert not stats.record('t', "SELECT * FROM u", 0, 0.050, error=True)
+
+
+def test_slow_queries_logged_newest_first(capsys):
+    stats = QueryStats(slow_threshold_ms=20)
+    stats.record('a', "SELECT * FROM a", 1, 0.030)
+    stats.record('b', "SELECT * FROM b", 1, 0.001)
+    stats.record('c', "SELECT * FROM c", 1, 0.040)
+
+    assert [q['name'] for q in stats.snapshot()['slow_queries']] == ['c', 'a']
+    assert 'Slow query' in capsys.readouterr().out
+
+    stats.reset()
+    assert stats.snapshot()['statements'] == []
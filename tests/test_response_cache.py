@@ -0,0 +1,95 @@
+"""Semantic answer cache: similarity hits, TTL, eviction and invalidation."""
+
+import pytest
+
+from db_integration import response_cache
+from db_integration.response_cache import SemanticResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_hit_for_nearby_query_of_same_level():
+    cache = SemanticResponseCache(max_distance=0.05)
+    cache.store([1.0, 0.0], 'Junior', 'what to learn', 'Learn Python')
+
+    assert cache.lookup([10.0, 0.1], 'Junior') == 'Learn Python'
+    assert cache.lookup([1.0, 0.0], 'Senior') is None
+    assert cache.lookup([0.8, 0.6], 'Junior') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticResponseCache(ttl_seconds=60)
+    cache.store([1.0, 0.0], 'Junior', 'q1', 'old')
+    clock[0] += 30
+    cache.store([0.0, 1.0], 'Junior', 'q2', 'new')
+
+    clock[0] += 40
+    assert cache.lookup([1.0, 0.0], 'Junior') is None
+    assert cache.lookup([0.0, 1.0], 'Junior') == 'new'
+    assert cache.stats()['size'] == 1
+
+
+def test_oldest_entries_evicted_per_level():
+    cache = SemanticResponseCache(max_entries=2)
+    for i, vector in enumerate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]):
+        cache.store(vector, 'Junior', f'q{i}', f'a{i}')
+    cache.store([1.0, 0.0, 0.0], 'Senior', 'q', 'senior')
+
+    assert cache.lookup([1.0, 0.0, 0.0], 'Junior') is None
+    assert cache.lookup([0.0, 0.0, 1.0], 'Junior') == 'a2'
+    assert cache.lookup([1.0, 0.0, 0.0], 'Senior') == 'senior'
+
+
+def test_invalidate_drops_everything():
+    cache = SemanticResponseCache()
+    cache.store([1.0, 0.0], 'Junior', 'q', 'a')
+
+    cache.invalidate()
+
+    assert cache.lookup([1.0, 0.0], 'Junior') is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_store_drops_answer_generated_before_invalidation():
+    cache = SemanticResponseCache()
+    generation = cache.generation
+
+    # Catalog reloaded while the answer was being generated
+    cache.invalidate()
+    cache.store([1.0, 0.0], 'Junior', 'q', 'stale', generation=generation)
+    assert cache.lookup([1.0, 0.0], 'Junior') is None
+
+    cache.store([1.0, 0.0], 'Junior', 'q', 'fresh', generation=cache.generation)
+    assert cache.lookup([1.0, 0.0], 'Junior') == 'fresh'
+
+
+def test_zero_vectors_and_dimension_changes_are_ignored():
+    cache = SemanticResponseCache()
+    cache.store([0.0, 0.0], 'Junior', 'q', 'a')
+    assert cache.stats()['size'] == 0
+
+    cache.store([1.0, 0.0], 'Junior', 'q', 'a')
+    assert cache.lookup([1.0, 0.0, 0.0], 'Junior') is None
+    cache.store([1.0, 0.0, 0.0], 'Junior', 'q', 'b')
+    assert cache.lookup([1.0, 0.0, 0.0], 'Junior') == 'b'
+
+
+def test_invalidate_response_cache_uses_shared_instance(monkeypatch):
+    monkeypatch.setattr(response_cache.config, 'RESPONSE_CACHE_ENABLED', True)
+    monkeypatch.setattr(response_cache, '_response_cache', None)
+    cache = response_cache.get_response_cache()
+    cache.store([1.0], 'Junior', 'q', 'a')
+
+    response_cache.invalidate_response_cache()
+
+    assert cache.lookup([1.0], 'Junior') is None
+    monkeypatch.setattr(response_cache.config, 'RESPONSE_CACHE_ENABLED', False)
+    assert response_cache.get_response_cache() is None
@@ -0,0 +1,179 @@
+"""Skill mention matching and batched LLM extraction helpers."""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from db_integration import skill_extractor
+from db_integration.data_loader import tally_skill_signals
+from db_integration.skill_extractor import SkillExtractor, SkillMentionMatcher, _parse_batch_response
+
+
+def _substring_matches(names, text):
+    """Reference semantics: the per-skill ``name.lower() in text.lower()`` checks."""
+    return {name for name in names if name and name.lower() in text.lower()}
+
+
+def test_matcher_is_case_insensitive():
+    matcher = SkillMentionMatcher(['Python', 'Docker'])
+
+    assert matcher.find('Learn PYTHON with docker') == {'Python', 'Docker'}
+
+
+def test_matcher_keeps_substring_semantics_without_word_boundaries():
+    # Same as the previous substring checks: no word boundaries, so a short
+    # name inside a longer word still counts
+    matcher = SkillMentionMatcher(['Go', 'Java', 'JavaScript', 'SQL', 'PostgreSQL'])
+
+    assert matcher.find('Google JavaScript tips') == {'Go', 'Java', 'JavaScript'}
+    assert matcher.find('PostgreSQL tuning') == {'SQL', 'PostgreSQL'}
+    assert matcher.find('Go, Java.') == {'Go', 'Java'}
+
+
+def test_matcher_finds_overlapping_names():
+    matcher = SkillMentionMatcher(['ab', 'abc', 'bcd', 'cd', 'd'])
+
+    assert matcher.find('xabcdx') == {'ab', 'abc', 'bcd', 'cd', 'd'}
+    assert matcher.find('bc') == set()
+
+
+def test_matcher_handles_regex_metacharacters():
+    matcher = SkillMentionMatcher(['C++', 'C#', 'Node.js', 'CI/CD'])
+
+    assert matcher.find('c++ and node.js with ci/cd') == {'C++', 'Node.js', 'CI/CD'}
+    assert matcher.find('Nodeljs C') == set()
+
+
+def test_matcher_returns_every_spelling_of_a_name():
+    matcher = SkillMentionMatcher(['GenAI', 'genai', 'LLM', ''])
+
+    assert matcher.find('genai apps') == {'GenAI', 'genai'}
+    assert SkillMentionMatcher([]).find('anything') == set()
+    assert matcher.find('') == set()
+
+
+def test_matcher_agrees_with_substring_checks_on_random_text():
+    rng = random.Random(7)
+    names = list({''.join(rng.choices('abc ', k=rng.randint(1, 4))).strip() or 'a' for _ in range(40)})
+    matcher = SkillMentionMatcher(names)
+
+    for _ in range(300):
+        text = ''.join(rng.choices('abcABC ', k=rng.randint(0, 30)))
+        assert matcher.find(text) == _substring_matches(names, text)
+
+
+def test_tally_skill_signals():
+    resources = [
+        {'title': 'Python basics', 'description': 'Intro to Docker'},
+        {'title': 'Advanced python', 'description': ''},
+    ]
+    topics = [
+        {'title': 'Python rising', 'description': 'docker too', 'metrics': {'stars': 10, 'estimated_posts': 3}},
+        {'title': 'Containers', 'description': 'Docker', 'metrics': {'stars': 5, 'estimated_posts': 2}},
+    ]
+
+    tallies = tally_skill_signals(['Python', 'Docker', 'Rust'], resources, topics)
+
+    assert tallies == {
+        'Python': {'mentions': 2, 'github_stars': 10, 'linkedin_posts': 3},
+        'Docker': {'mentions': 1, 'github_stars': 0, 'linkedin_posts': 5},
+        'Rust': {'mentions': 0, 'github_stars': 0, 'linkedin_posts': 0},
+    }
+
+
+def test_parse_batch_response_plain_and_fenced_json():
+    content = '{"1": ["Python", "- Docker"], "2": []}'
+
+    assert _parse_batch_response(content, 2) == {1: ['Python', 'Docker'], 2: []}
+    assert _parse_batch_response(f"```json\n{content}\n```", 2) == {1: ['Python', 'Docker'], 2: []}
+
+
+def test_parse_batch_response_drops_invalid_items():
+    content = '{"1": ["Go", "x", "  "], "2": "Rust", "3": null, "seven": ["a"], "0": ["b"], "9": ["c"]}'
+
+    # Only item 1 is usable; 2 and 3 are left for single-item retries
+    assert _parse_batch_response(content, 3) == {1: []}
+
+
+@pytest.mark.parametrize('content', [
+    'Sure! Here are the skills:',
+    '{"1": ["Python"]',
+    '["Python", "Docker"]',
+    '',
+])
+def test_parse_batch_response_rejects_malformed_answers(content):
+    with pytest.raises(ValueError):
+        _parse_batch_response(content, 2)
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    # One token per word keeps the budgets below easy to read
+    monkeypatch.setattr(skill_extractor, 'count_tokens', lambda texts: sum(len(t.split()) for t in texts))
+    monkeypatch.setattr(skill_extractor.config, 'SKILL_EXTRACTION_BATCH_TOKENS', 10)
+    monkeypatch.setattr(skill_extractor.config, 'SKILL_EXTRACTION_BATCH_SIZE', 3)
+    instance = SkillExtractor(cache_path='', concurrency=2)
+    instance.llm = None
+    return instance
+
+
+def _sizes(batches):
+    return [[len(text.split()) for _, text in batch] for batch in batches]
+
+
+def test_plan_batches_respects_token_budget_and_item_cap(extractor):
+    pending = {str(i): ' '.join(['w'] * words) for i, words in enumerate([4, 4, 4, 1, 1, 1, 1, 12, 2])}
+
+    assert _sizes(extractor._plan_batches(pending)) == [[4, 4], [4, 1, 1], [1, 1], [12], [2]]
+
+
+def test_plan_batches_counts_only_the_text_the_llm_sees(extractor):
+    pending = {'long': 'w ' * skill_extractor.LLM_INPUT_CHARS, 'short': 'w'}
+
+    # The long text is cut to LLM_INPUT_CHARS (250 words) before counting
+    assert len(extractor._plan_batches(pending)) == 2
+    assert extractor._plan_batches({}) == []
+
+
+class FakeLLM:
+    """Answers numbered prompts with a fixed JSON body, single prompts with one line."""
+
+    def __init__(self, batch_answer):
+        self.batch_answer = batch_answer
+        self.prompts = []
+
+    def invoke(self, messages):
+        text = messages[-1].content
+        self.prompts.append(text)
+        if text.startswith('Text:'):
+            return SimpleNamespace(content='- Single Skill')
+        return SimpleNamespace(content=self.batch_answer)
+
+
+def _resources(count):
+    return [{'title': f'Resource {i} about building services', 'description': 'with enough text for the LLM'}
+            for i in range(count)]
+
+
+def test_extract_many_falls_back_to_single_items_for_missing_entries(extractor, monkeypatch):
+    monkeypatch.setattr(skill_extractor.config, 'SKILL_EXTRACTION_BATCH_TOKENS', 1000)
+    extractor.llm = FakeLLM('{"1": ["Batch Skill"], "3": ["Batch Skill"]}')
+
+    results = extractor.extract_many(_resources(3))
+
+    llm_names = [[s['skill_name'] for s in skills if s['confidence'] == 0.7] for skills in results]
+    assert llm_names == [['Batch Skill'], ['Single Skill'], ['Batch Skill']]
+    assert extractor.llm_stats()['batched_items'] == 2
+    assert extractor.llm_stats()['batch_fallbacks'] == 1
+
+
+def test_extract_many_retries_every_item_on_malformed_json(extractor, monkeypatch):
+    monkeypatch.setattr(skill_extractor.config, 'SKILL_EXTRACTION_BATCH_TOKENS', 1000)
+    extractor.llm = FakeLLM('not json')
+
+    results = extractor.extract_many(_resources(3))
+
+    assert all(any(s['skill_name'] == 'Single Skill' for s in skills) for skills in results)
+    assert len(extractor.llm.prompts) == 4
+    assert extractor.llm_stats()['batch_fallbacks'] == 3
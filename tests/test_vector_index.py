@@ -0,0 +1,157 @@
+"""In-memory vector index: quantized scoring and incremental refresh."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from db_integration import vector_index
+from db_integration.vector_index import InMemoryVectorIndex, quantize, similarity_scores
+
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+MODEL = 'text-embedding-3-small'
+
+
+class FakeDB:
+    """``iter_rows`` over in-memory tables, honouring the updated_at filter."""
+
+    def __init__(self):
+        self.tables = {'skill_embeddings': {}, 'it_skills': {}}
+        self.filters = []
+
+    def put(self, skill_id, vector, name, seconds, model=MODEL):
+        stamp = T0 + timedelta(seconds=seconds)
+        self.tables['skill_embeddings'][skill_id] = {
+            'skill_id': skill_id, 'embedding': vector, 'embedding_model': model, 'updated_at': stamp}
+        self.tables['it_skills'][skill_id] = {
+            'id': skill_id, 'skill_name': name, 'category': 'Programming',
+            'difficulty_level': 'Beginner', 'demand_score': 50, 'updated_at': stamp}
+
+    def iter_rows(self, table, columns, key='id', page_size=1000, filters=None):
+        self.filters.append(filters)
+        rows = sorted(self.tables[table].values(), key=lambda r: r[key])
+        for column, op, value in filters or []:
+            assert op == 'gte'
+            rows = [r for r in rows if r[column] >= value]
+        return iter([dict(r) for r in rows])
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(vector_index.config, 'VECTOR_INDEX_REFRESH_SECONDS', 1e9)
+    monkeypatch.setattr(vector_index.config, 'VECTOR_INDEX_REFRESH_OVERLAP_SECONDS', 60)
+    return InMemoryVectorIndex(**vector_index.VECTOR_INDEX_SPECS['skills'], precision='float32',
+                               embedding_model=MODEL)
+
+
+def _names(index, vector):
+    return [row['skill_name'] for row in index.search(vector, match_threshold=0.5, match_count=5)]
+
+
+def test_refresh_picks_up_rows_that_commit_late(index):
+    db = FakeDB()
+    db.put('a', [1.0, 0.0], 'Python', seconds=100)
+    index.refresh(db, full=True)
+
+    # Written by a transaction that started before 'a' was stamped but
+    # committed after the last refresh read it
+    db.put('b', [0.0, 1.0], 'Rust', seconds=90)
+    index.refresh(db)
+
+    assert _names(index, [0.0, 1.0]) == ['Rust']
+    assert db.filters[-1] == [('updated_at', 'gte', T0 + timedelta(seconds=40))]
+
+
+def test_refresh_reloads_when_vector_width_changes(index):
+    db = FakeDB()
+    db.put('a', [1.0, 0.0, 0.0], 'Python', seconds=100)
+    db.put('b', [0.0, 1.0, 0.0], 'Rust', seconds=100)
+    index.refresh(db, full=True)
+
+    # Table reprojected to 2 dimensions: every row is rewritten
+    db.put('a', [1.0, 0.0], 'Python', seconds=200)
+    db.put('b', [0.0, 1.0], 'Rust', seconds=200)
+    index.refresh(db)
+
+    assert index.stats()['dimensions'] == 2
+    assert _names(index, [0.0, 1.0]) == ['Rust']
+
+
+def test_refresh_rejects_mixed_widths(index):
+    db = FakeDB()
+    db.put('a', [1.0, 0.0, 0.0], 'Python', seconds=100)
+    db.put('b', [0.0, 1.0, 0.0], 'Rust', seconds=100)
+    index.refresh(db, full=True)
+
+    # Only part of the table has been reprojected so far
+    db.put('a', [1.0, 0.0], 'Python', seconds=200)
+    with pytest.raises(ValueError):
+        index.refresh(db)
+
+    # The previous snapshot keeps serving same-width queries; others raise
+    # so search_similar_* can fall back to the database
+    assert _names(index, [0.0, 1.0, 0.0]) == ['Rust']
+    with pytest.raises(ValueError):
+        index.search([0.0, 1.0])
+
+
+def test_refresh_overlap_updates_rows_in_place(index):
+    db = FakeDB()
+    db.put('a', [1.0, 0.0], 'Python', seconds=100)
+    db.put('b', [0.0, 1.0], 'Rust', seconds=100)
+    index.refresh(db, full=True)
+
+    db.put('a', [0.6, 0.8], 'Python 3', seconds=100)
+    index.refresh(db)
+    index.refresh(db)
+
+    assert index.stats()['rows'] == 2
+    assert _names(index, [0.0, 1.0]) == ['Rust', 'Python 3']
+
+
+def test_rows_from_another_model_are_not_searched(index):
+    db = FakeDB()
+    db.put('a', [1.0, 0.0], 'Python', seconds=100)
+    db.put('b', [0.0, 1.0], 'Rust', seconds=100, model='text-embedding-ada-002')
+    index.refresh(db, full=True)
+
+    assert index.stats()['rows'] == 1
+    assert _names(index, [0.0, 1.0]) == []
+
+    # Re-embedding a loaded row with another model drops it on the next refresh
+    db.put('a', [1.0, 0.0], 'Python', seconds=120, model='text-embedding-ada-002')
+    index.refresh(db)
+
+    assert index.stats()['rows'] == 0
+
+
+def test_overlap_keeps_iso_string_stamps(index):
+    assert index._overlap('2026-01-01T00:01:00Z') == '2026-01-01T00:00:00+00:00'
+    assert index._overlap(None) is None
+
+
+@pytest.mark.parametrize('precision', ['float16', 'int8'])
+def test_quantized_scores_close_to_float32(precision):
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(50, 64)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[7]
+
+    exact = similarity_scores(*quantize(matrix, 'float32'), query)
+    approx = similarity_scores(*quantize(matrix, precision), query)
+
+    assert approx.dtype == np.float32
+    assert np.abs(exact - approx).max() < 0.02
+    assert int(np.argmax(approx)) == 7
+
+
+def test_int8_quantization_uses_per_row_scale():
+    matrix = np.array([[0.5, -0.5], [0.0, 0.0]], dtype=np.float32)
+
+    encoded, scales = quantize(matrix, 'int8')
+
+    assert encoded.dtype == np.int8
+    assert encoded[0].tolist() == [127, -127]
+    assert encoded[1].tolist() == [0, 0]
+    assert scales[1] == 127.0